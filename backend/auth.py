@@ -2,7 +2,7 @@ from functools import wraps
 from flask import request, jsonify
 import jwt
 from datetime import datetime, timedelta
-from models import User, UserRole
+from models import db, User, UserRole
 
 # JWT Configuration
 # Note: In production, use environment variable for secret key
@@ -10,6 +10,8 @@ import os
 JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_DELTA = timedelta(days=7)
+# Set by /api/batch on its sub-requests; WSGI servers never create this key from HTTP headers
+BATCH_USER_ENVIRON_KEY = 'stjude.batch_user'
 
 def generate_token(user):
     """Generate JWT token for user"""
@@ -34,6 +36,11 @@ def verify_token(token):
 
 def get_current_user():
     """Get current user from JWT token"""
+    batch_user = request.environ.get(BATCH_USER_ENVIRON_KEY)
+    if batch_user is not None:
+        # Already authenticated by the batch request; attach it to this thread's session
+        return db.session.merge(batch_user, load=False)
+
     token = None
     auth_header = request.headers.get('Authorization')
     
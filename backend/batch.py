@@ -0,0 +1,134 @@
+"""
+POST /api/batch: several API calls in one HTTP request.
+
+  {"requests": [{"id": "a", "method": "GET", "path": "/api/steps/3/answers"},
+                {"id": "b", "method": "POST", "path": "/api/steps/3/answer", "body": {...}}]}
+  -> {"success": true, "responses": [{"id": "a", "status": 200, "headers": {...}, "body": {...}}, ...]}
+
+Sub-requests go through the normal routing, decorators and error handling of
+the app. The batch is authenticated once: sub-requests reuse its user instead
+of decoding the JWT and loading the user again (see auth.get_current_user).
+Every sub-request gets its own app context, so `g` (e.g. g.db_use_primary set
+by @use_primary) and the session start fresh as for a separate HTTP request.
+Requests run in order; runs of consecutive GETs execute in parallel, while
+writes run one at a time and commit, so later sub-requests see them.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, request
+from werkzeug.test import EnvironBuilder
+
+from auth import BATCH_USER_ENVIRON_KEY
+from models import db
+
+
+MAX_BATCH_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", 20))
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", 4))
+READ_METHODS = {"GET", "HEAD"}
+ALLOWED_METHODS = READ_METHODS | {"POST", "PUT", "DELETE"}
+# Per-item headers a client may set; credentials always come from the batch itself
+FORWARDED_HEADERS = {"if-none-match", "if-modified-since", "accept"}
+
+_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch")
+
+
+class BatchError(ValueError):
+  pass
+
+
+def parse(data):
+  """Validated list of sub-request dicts; raises BatchError."""
+  items = (data or {}).get("requests")
+  if not isinstance(items, list) or not items:
+    raise BatchError("requests must be a non-empty list")
+  if len(items) > MAX_BATCH_REQUESTS:
+    raise BatchError(f"At most {MAX_BATCH_REQUESTS} requests per batch")
+  parsed = []
+  for index, item in enumerate(items):
+    if not isinstance(item, dict):
+      raise BatchError(f"requests[{index}] must be an object")
+    method = str(item.get("method", "GET")).upper()
+    path = item.get("path")
+    if method not in ALLOWED_METHODS:
+      raise BatchError(f"requests[{index}]: unsupported method {method}")
+    if not isinstance(path, str) or not path.startswith("/api/") or path.split("?")[0].rstrip("/") == "/api/batch":
+      raise BatchError(f"requests[{index}]: path must be an /api/ URL other than /api/batch")
+    headers = item.get("headers") or {}
+    parsed.append({
+      "id": item.get("id", index),
+      "method": method,
+      "path": path,
+      "body": item.get("body"),
+      "headers": {k: str(v) for k, v in headers.items() if k.lower() in FORWARDED_HEADERS},
+    })
+  return parsed
+
+
+def _environ(item, user):
+  builder = EnvironBuilder(
+    path=item["path"],
+    method=item["method"],
+    base_url=request.host_url,
+    headers=item["headers"],
+    json=item["body"] if item["body"] is not None else None,
+    environ_overrides={"REMOTE_ADDR": request.remote_addr},
+  )
+  try:
+    environ = builder.get_environ()
+  finally:
+    builder.close()
+  environ[BATCH_USER_ENVIRON_KEY] = user
+  return environ
+
+
+def _result(item, response):
+  if response.mimetype == "application/json" or response.is_json:
+    body = response.get_json(silent=True)
+  else:
+    data = response.get_data()
+    try:
+      body = data.decode("utf-8")
+    except UnicodeDecodeError:
+      body = None  # binary downloads are not batchable
+  headers = {k: v for k, v in response.headers.items() if k in ("ETag", "Content-Type", "Cache-Control", "Location")}
+  return {"id": item["id"], "status": response.status_code, "headers": headers, "body": body}
+
+
+def _dispatch(app, environ, item):
+  """Run one sub-request in its own app context and session."""
+  with app.app_context(), app.request_context(environ):
+    response = app.full_dispatch_request()
+    return _result(item, response)
+
+
+def run(items, user):
+  """Execute parsed sub-requests for `user`; returns their results in order."""
+  app = current_app._get_current_object()
+  results = [None] * len(items)
+  index = 0
+  wrote = False
+  while index < len(items):
+    if wrote:
+      # A write committed in its own session; sub-requests copy the user from ours
+      db.session.refresh(user)
+      wrote = False
+    if items[index]["method"] in READ_METHODS:
+      end = index
+      while end < len(items) and items[end]["method"] in READ_METHODS:
+        end += 1
+      group = list(range(index, end))
+      if len(group) == 1:
+        results[index] = _dispatch(app, _environ(items[index], user), items[index])
+      else:
+        futures = {
+          i: _executor.submit(_dispatch, app, _environ(items[i], user), items[i]) for i in group
+        }
+        for i, future in futures.items():
+          results[i] = future.result()
+      index = end
+    else:
+      results[index] = _dispatch(app, _environ(items[index], user), items[index])
+      wrote = True
+      index += 1
+  return results
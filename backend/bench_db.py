@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the SQLite engine profiles in db_config.
+
+Several processes (like gunicorn workers), each with several threads, run a mix
+of step/question reads and answer submissions (read question, upsert answer,
+update progress, commit) against a scratch copy of the schema. Each profile is
+reported with throughput, latency percentiles and "database is locked" errors.
+
+Usage: python bench_db.py [--profiles legacy,default] [--processes 4] [--threads 4]
+                          [--seconds 5] [--write-ratio 0.3]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+import db_config
+from models import db
+
+
+STUDENTS = 200
+STEPS = 8
+QUESTIONS_PER_STEP = 6
+
+
+def make_engine(path, profile):
+  settings = db_config.load_settings(profile)
+  uri = f"sqlite:///{path}"
+  engine = create_engine(uri, **db_config.engine_options(uri, settings))
+  db_config.install_pragmas(engine, settings)
+  return engine
+
+
+def prepare(path):
+  engine = make_engine(path, "legacy")
+  db.metadata.create_all(engine)
+  with engine.begin() as conn:
+    conn.execute(text(
+      "INSERT INTO users (id, username, email, password_hash, full_name, role, is_active) "
+      "VALUES (:id, :u, :e, 'x', :u, 'STUDENT', 1)"
+    ), [{"id": i, "u": f"s{i}", "e": f"s{i}@x"} for i in range(1, STUDENTS + 1)])
+    conn.execute(text("INSERT INTO projects (id, name, is_active) VALUES (1, 'BENCH', 1)"))
+    conn.execute(text(
+      "INSERT INTO project_steps (id, project_id, order_index, title, content, is_released) "
+      "VALUES (:id, 1, :id, :t, :c, 1)"
+    ), [{"id": s, "t": f"Step {s}", "c": "x" * 2000} for s in range(1, STEPS + 1)])
+    conn.execute(text(
+      "INSERT INTO project_step_questions (id, step_id, prompt, option_a, option_b, correct_option, points) "
+      "VALUES (:id, :step, 'Q?', 'a', 'b', 'A', 5)"
+    ), [
+      {"id": (s - 1) * QUESTIONS_PER_STEP + q, "step": s}
+      for s in range(1, STEPS + 1) for q in range(1, QUESTIONS_PER_STEP + 1)
+    ])
+  engine.dispose()
+
+
+def read_op(conn, rng):
+  step_id = rng.randint(1, STEPS)
+  conn.execute(text("SELECT * FROM project_steps WHERE id = :id"), {"id": step_id}).all()
+  conn.execute(text("SELECT * FROM project_step_questions WHERE step_id = :id"), {"id": step_id}).all()
+
+
+def write_op(conn, rng):
+  student = rng.randint(1, STUDENTS)
+  question = rng.randint(1, STEPS * QUESTIONS_PER_STEP)
+  correct = conn.execute(
+    text("SELECT correct_option FROM project_step_questions WHERE id = :id"), {"id": question}
+  ).scalar()
+  choice = rng.choice("AB")
+  existing = conn.execute(
+    text("SELECT id FROM student_step_answers WHERE student_id = :s AND question_id = :q"),
+    {"s": student, "q": question},
+  ).scalar()
+  if existing:
+    conn.execute(text("UPDATE student_step_answers SET selected_option = :o, is_correct = :c WHERE id = :id"),
+                 {"o": choice, "c": choice == correct, "id": existing})
+  else:
+    conn.execute(text(
+      "INSERT INTO student_step_answers (student_id, question_id, selected_option, is_correct, points_awarded) "
+      "VALUES (:s, :q, :o, :c, 0)"
+    ), {"s": student, "q": question, "o": choice, "c": choice == correct})
+  updated = conn.execute(text(
+    "UPDATE project_progress SET progress_percentage = progress_percentage + 1 WHERE student_id = :s AND project_id = 1"
+  ), {"s": student}).rowcount
+  if not updated:
+    conn.execute(text(
+      "INSERT INTO project_progress (student_id, project_id, status, progress_percentage) VALUES (:s, 1, 'in_progress', 1)"
+    ), {"s": student})
+
+
+def worker(path, profile, threads, seconds, write_ratio, seed):
+  engine = make_engine(path, profile)
+  deadline = time.monotonic() + seconds
+  lock = threading.Lock()
+  stats = {"reads": [], "writes": [], "errors": 0}
+
+  def run(thread_seed):
+    rng = random.Random(thread_seed)
+    while time.monotonic() < deadline:
+      is_write = rng.random() < write_ratio
+      started = time.perf_counter()
+      try:
+        with engine.begin() as conn:
+          (write_op if is_write else read_op)(conn, rng)
+      except OperationalError:
+        with lock:
+          stats["errors"] += 1
+        continue
+      except IntegrityError:
+        continue  # two threads answered the same question for the same student
+      elapsed = (time.perf_counter() - started) * 1000
+      with lock:
+        stats["writes" if is_write else "reads"].append(elapsed)
+
+  pool = [threading.Thread(target=run, args=(seed * 100 + i,)) for i in range(threads)]
+  for t in pool:
+    t.start()
+  for t in pool:
+    t.join()
+  engine.dispose()
+  return stats
+
+
+def percentile(values, p):
+  if not values:
+    return 0.0
+  values = sorted(values)
+  return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def bench(profile, args):
+  with tempfile.TemporaryDirectory(prefix="bench-db-") as tmp:
+    path = os.path.join(tmp, "bench.db")
+    prepare(path)
+    with multiprocessing.get_context("fork").Pool(args.processes) as pool:
+      results = pool.starmap(worker, [
+        (path, profile, args.threads, args.seconds, args.write_ratio, i) for i in range(args.processes)
+      ])
+  reads = [v for r in results for v in r["reads"]]
+  writes = [v for r in results for v in r["writes"]]
+  errors = sum(r["errors"] for r in results)
+  return {
+    "profile": profile,
+    "ops_per_s": (len(reads) + len(writes)) / args.seconds,
+    "writes_per_s": len(writes) / args.seconds,
+    "read_p50": percentile(reads, 0.5),
+    "read_p95": percentile(reads, 0.95),
+    "write_p50": percentile(writes, 0.5),
+    "write_p95": percentile(writes, 0.95),
+    "locked_errors": errors,
+  }
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+  parser.add_argument("--profiles", default="legacy,default")
+  parser.add_argument("--processes", type=int, default=4)
+  parser.add_argument("--threads", type=int, default=4)
+  parser.add_argument("--seconds", type=float, default=5)
+  parser.add_argument("--write-ratio", type=float, default=0.3)
+  args = parser.parse_args()
+
+  print(f"{args.processes} processes x {args.threads} threads, {args.seconds}s, {int(args.write_ratio * 100)}% writes")
+  header = f"{'profile':<12}{'ops/s':>9}{'writes/s':>10}{'read p50':>10}{'read p95':>10}{'write p50':>11}{'write p95':>11}{'locked':>8}"
+  print(header)
+  print("-" * len(header))
+  for profile in args.profiles.split(","):
+    r = bench(profile.strip(), args)
+    print(f"{r['profile']:<12}{r['ops_per_s']:>9.0f}{r['writes_per_s']:>10.0f}{r['read_p50']:>8.2f}ms"
+          f"{r['read_p95']:>8.2f}ms{r['write_p50']:>9.2f}ms{r['write_p95']:>9.2f}ms{r['locked_errors']:>8}")
+
+
+if __name__ == "__main__":
+  main()
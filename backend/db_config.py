@@ -0,0 +1,284 @@
+"""
+Database engine configuration.
+
+The database is SQLite by default (backend/stjude.db, or SQLITE_PATH) and any
+SQLAlchemy URL given as DATABASE_URL, typically PostgreSQL, so several app
+nodes can share one database. Pooled server connections are pre-pinged and
+recycled so restarts and idle timeouts on the server side go unnoticed.
+
+SQLite connections get WAL journaling (readers no longer block the writer),
+a busy timeout (writers wait instead of failing with "database is locked"),
+synchronous=NORMAL and larger page/mmap caches, applied to every connection
+from a connect event. Settings come from a named profile (DB_PROFILE) and each
+value can be overridden through its own environment variable.
+
+GET requests read through a second engine (see db_routing): read-only
+connections to the same SQLite file, which in WAL mode never wait for the
+writer, or DATABASE_REPLICA_URL on PostgreSQL.
+"""
+import os
+import shutil
+import sqlite3
+from urllib.parse import quote
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+
+PROFILES = {
+  # Web serving: concurrent readers, short write transactions
+  "default": {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout_ms": 5000,
+    "cache_size_kb": 20000,
+    "mmap_size_mb": 128,
+    "temp_store": "MEMORY",
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+  },
+  # Every commit fsynced, for hosts where losing the last transactions on power loss is not acceptable
+  "durable": {
+    "journal_mode": "WAL",
+    "synchronous": "FULL",
+    "busy_timeout_ms": 10000,
+    "cache_size_kb": 20000,
+    "mmap_size_mb": 128,
+    "temp_store": "MEMORY",
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+  },
+  # Small containers
+  "low-memory": {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout_ms": 5000,
+    "cache_size_kb": 2000,
+    "mmap_size_mb": 0,
+    "temp_store": "FILE",
+    "pool_size": 4,
+    "max_overflow": 4,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+  },
+  # SQLite/SQLAlchemy defaults (rollback journal, no busy timeout); for comparisons only
+  "legacy": {
+    "journal_mode": None,
+    "synchronous": None,
+    "busy_timeout_ms": None,
+    "cache_size_kb": None,
+    "mmap_size_mb": None,
+    "temp_store": None,
+    "pool_size": 5,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+  },
+}
+
+READ_ENGINE_KEY = "stjude_read_engine"
+
+_ENV_OVERRIDES = {
+  "journal_mode": ("SQLITE_JOURNAL_MODE", str),
+  "synchronous": ("SQLITE_SYNCHRONOUS", str),
+  "busy_timeout_ms": ("SQLITE_BUSY_TIMEOUT_MS", int),
+  "cache_size_kb": ("SQLITE_CACHE_SIZE_KB", int),
+  "mmap_size_mb": ("SQLITE_MMAP_SIZE_MB", int),
+  "temp_store": ("SQLITE_TEMP_STORE", str),
+  "pool_size": ("DB_POOL_SIZE", int),
+  "max_overflow": ("DB_MAX_OVERFLOW", int),
+  "pool_timeout": ("DB_POOL_TIMEOUT", int),
+  "pool_recycle": ("DB_POOL_RECYCLE", int),
+}
+
+
+def _driver_url(url):
+  if url.startswith("postgres://"):
+    url = "postgresql://" + url[len("postgres://"):]
+  if url.startswith("postgresql://"):
+    url = "postgresql+psycopg2://" + url[len("postgresql://"):]
+  return url
+
+
+def adopt_legacy_sqlite(path, legacy_path):
+  """
+  Copy the database from before SQLITE_PATH (`legacy_path`, i.e. backend/stjude.db)
+  to `path` when `path` does not exist yet, so a deployment that moves to
+  SQLITE_PATH keeps its data instead of booting on an empty database. Safe when
+  several processes start at once. SQLITE_REQUIRE_EXISTING=1 refuses to start
+  rather than create a new database. Returns True when a copy was made.
+  """
+  if os.path.exists(path) or os.path.abspath(path) == os.path.abspath(legacy_path):
+    return False
+  if not os.path.isfile(legacy_path) or os.path.getsize(legacy_path) == 0:
+    message = f"{path} does not exist and there is no database at {legacy_path} to copy"
+    if os.environ.get("SQLITE_REQUIRE_EXISTING") == "1":
+      raise RuntimeError(message + " (SQLITE_REQUIRE_EXISTING=1)")
+    print(f"WARNING: {message}; starting with a new, empty database")
+    return False
+
+  os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+  tmp = f"{path}.adopt{os.getpid()}"
+  try:
+    # Online backup: consistent even if an old process still writes to the legacy file
+    source = sqlite3.connect(f"file:{quote(os.path.abspath(legacy_path))}?mode=ro", uri=True)
+    target = sqlite3.connect(tmp)
+    try:
+      source.backup(target)
+    finally:
+      target.close()
+      source.close()
+  except sqlite3.Error:
+    shutil.copyfile(legacy_path, tmp)
+  try:
+    os.link(tmp, path)  # fails if another process adopted it first
+  except FileExistsError:
+    return False
+  except OSError:
+    if os.path.exists(path):
+      return False
+    os.replace(tmp, path)
+  finally:
+    if os.path.exists(tmp):
+      os.remove(tmp)
+  print(f"Copied the existing database {legacy_path} to {path} (SQLITE_PATH)")
+  return True
+
+
+def database_uri(default_sqlite_path):
+  """
+  DATABASE_URL (postgres:// and postgresql:// mapped to the psycopg2 driver) or
+  the SQLite file: SQLITE_PATH, adopting the default file's data on first use
+  (see adopt_legacy_sqlite), or `default_sqlite_path`.
+  """
+  url = os.environ.get("DATABASE_URL")
+  if url:
+    return _driver_url(url)
+  path = os.environ.get("SQLITE_PATH")
+  if path:
+    adopt_legacy_sqlite(path, os.environ.get("SQLITE_LEGACY_PATH") or default_sqlite_path)
+  return f"sqlite:///{path or default_sqlite_path}"
+
+
+def read_uri(uri, settings):
+  """
+  URL of the engine for read-only requests, or None to read from the primary:
+  DATABASE_REPLICA_URL on server databases, a read-only (mode=ro) connection to
+  the same file on SQLite in WAL mode. READ_ROUTING=0 turns routing off.
+  """
+  if os.environ.get("READ_ROUTING", "1") == "0":
+    return None
+  if not uri.startswith("sqlite"):
+    replica = os.environ.get("DATABASE_REPLICA_URL")
+    return _driver_url(replica) if replica else None
+  path = make_url(uri).database
+  if not path or path == ":memory:" or path.startswith("file:"):
+    return None
+  if (settings["journal_mode"] or "").upper() != "WAL":
+    return None  # outside WAL, readers would still wait for the writer
+  return f"sqlite:///file:{quote(os.path.abspath(path))}?mode=ro&uri=true"
+
+
+def load_settings(profile=None):
+  """Settings of `profile` (default: DB_PROFILE or 'default') with environment overrides applied."""
+  name = profile or os.environ.get("DB_PROFILE", "default")
+  if name not in PROFILES:
+    raise ValueError(f"Unknown DB_PROFILE {name!r}; choose one of {', '.join(PROFILES)}")
+  settings = dict(PROFILES[name], profile=name)
+  for key, (var, cast) in _ENV_OVERRIDES.items():
+    if os.environ.get(var):
+      settings[key] = cast(os.environ[var])
+  return settings
+
+
+def pragma_statements(settings, read_only=False):
+  statements = []
+  if settings["busy_timeout_ms"] is not None:
+    # First, so the remaining pragmas already wait on a busy database
+    statements.append(f"PRAGMA busy_timeout = {int(settings['busy_timeout_ms'])}")
+  if read_only:
+    # The journal mode belongs to the primary; readers only refuse writes
+    statements.append("PRAGMA query_only = 1")
+  else:
+    if settings["journal_mode"]:
+      statements.append(f"PRAGMA journal_mode = {settings['journal_mode']}")
+    if settings["synchronous"]:
+      statements.append(f"PRAGMA synchronous = {settings['synchronous']}")
+  if settings["cache_size_kb"] is not None:
+    statements.append(f"PRAGMA cache_size = -{int(settings['cache_size_kb'])}")  # negative: KiB
+  if settings["mmap_size_mb"] is not None:
+    statements.append(f"PRAGMA mmap_size = {int(settings['mmap_size_mb']) * 1024 * 1024}")
+  if settings["temp_store"]:
+    statements.append(f"PRAGMA temp_store = {settings['temp_store']}")
+  return statements
+
+
+def engine_options(uri, settings):
+  """SQLALCHEMY_ENGINE_OPTIONS for `uri`: pool sizing, plus the lock timeout (SQLite) or pre-ping/recycle."""
+  if uri.startswith("sqlite") and ":memory:" in uri:
+    return {}
+  options = {
+    "pool_size": settings["pool_size"],
+    "max_overflow": settings["max_overflow"],
+    "pool_timeout": settings["pool_timeout"],
+  }
+  if uri.startswith("sqlite"):
+    if settings["busy_timeout_ms"] is not None:
+      # sqlite3's own lock wait, consistent with PRAGMA busy_timeout
+      options["connect_args"] = {"timeout": settings["busy_timeout_ms"] / 1000}
+  else:
+    # Server databases: drop connections the server closed, and never keep one past its idle timeout
+    options["pool_pre_ping"] = True
+    options["pool_recycle"] = settings["pool_recycle"]
+  return options
+
+
+def install_pragmas(engine, settings, read_only=False):
+  """Apply the SQLite pragmas of `settings` to every new connection of `engine`."""
+  if engine.dialect.name != "sqlite":
+    return
+  statements = pragma_statements(settings, read_only)
+  if not statements:
+    return
+
+  @event.listens_for(engine, "connect")
+  def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+      for statement in statements:
+        cursor.execute(statement)
+    finally:
+      cursor.close()
+
+
+def configure_app(app, profile=None):
+  """Set SQLALCHEMY_ENGINE_OPTIONS on `app` before db.init_app(); returns the settings used."""
+  settings = load_settings(profile)
+  options = engine_options(app.config["SQLALCHEMY_DATABASE_URI"], settings)
+  app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {})
+  app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {**options, **app.config["SQLALCHEMY_ENGINE_OPTIONS"]}
+  app.config["DB_SETTINGS"] = settings
+  return settings
+
+
+def init_engine(app, db):
+  """
+  After db.init_app(): hook the pragmas into the app's engine before its first
+  connection, and create the read engine used by db_routing for GET requests.
+  """
+  settings = app.config.get("DB_SETTINGS") or load_settings()
+  with app.app_context():
+    install_pragmas(db.engine, settings)
+  uri = read_uri(app.config["SQLALCHEMY_DATABASE_URI"], settings)
+  if uri:
+    engine = create_engine(uri, **engine_options(uri, settings))
+    install_pragmas(engine, settings, read_only=True)
+    app.extensions[READ_ENGINE_KEY] = engine
+
+
+def read_engine(app):
+  return app.extensions.get(READ_ENGINE_KEY)
@@ -0,0 +1,60 @@
+"""
+Read/write routing for db.session.
+
+Statements issued while handling a GET or HEAD request go to the read engine
+(db_config.read_engine), everything else to the primary. Once a request has
+written (an INSERT/UPDATE/DELETE or a flush), the rest of its session sticks to
+the primary, so it reads its own writes; GET handlers that create rows on
+first access (e.g. progress) keep working unchanged. Background threads and
+CLI scripts have no request and always use the primary.
+
+Endpoints that must read from the primary anyway are decorated with
+@use_primary.
+"""
+from functools import wraps
+
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+
+import db_config
+
+
+READ_METHODS = {"GET", "HEAD"}
+_READ_PREFIXES = ("SELECT", "WITH")
+
+
+def use_primary(f):
+  """Route handler decorator: this endpoint reads from the primary even on GET."""
+  @wraps(f)
+  def wrapper(*args, **kwargs):
+    g.db_use_primary = True
+    return f(*args, **kwargs)
+  return wrapper
+
+
+def _is_write(clause):
+  if isinstance(clause, sa.UpdateBase):
+    return True
+  if isinstance(clause, sa.TextClause):
+    return not clause.text.lstrip().upper().startswith(_READ_PREFIXES)
+  return False
+
+
+class RoutingSession(Session):
+  def _reader(self, clause):
+    if self._flushing or _is_write(clause):
+      self.info["wrote"] = True
+      return None
+    if self.info.get("wrote") or not has_request_context():
+      return None
+    if request.method not in READ_METHODS or g.get("db_use_primary"):
+      return None
+    return db_config.read_engine(current_app)
+
+  def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+    if bind is None:
+      reader = self._reader(clause)
+      if reader is not None:
+        return reader
+    return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
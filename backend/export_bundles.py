@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Static curriculum bundles.
+
+The curriculum (project fields, released steps, questions without their
+answers) is the same for every student, so it is exported as static files that
+nginx or a CDN serves without touching Python or the database:
+
+  BUNDLE_DIR/<project_id>.<sha256[:16]>.json   (+ .json.gz for gzip_static)
+  BUNDLE_DIR/manifest.json                     {"projects": {"<id>": "<url>"}}
+
+File names carry the content hash, so a bundle never changes once written and
+can be cached forever; the manifest is the only file that must be revalidated.
+The API hands out `bundle_url` with each project and keeps serving only
+per-student state. Bundles are exported by init_db, after every commit that
+changes steps (step_bundles hook, in a background thread) and by hand:
+
+Usage: python export_bundles.py [PROJECT_ID ...]
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+
+from flask import current_app, has_app_context, has_request_context, send_from_directory
+
+from models import Project
+import step_bundles
+
+try:
+  import fcntl
+except ImportError:  # Windows: exports are not serialized across processes
+  fcntl = None
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUNDLE_DIR = os.environ.get("BUNDLE_DIR") or os.path.join(BASE_DIR, "static", "bundles")
+BUNDLE_URL_PREFIX = os.environ.get("BUNDLE_URL_PREFIX", "/bundles/")
+MANIFEST_FILENAME = "manifest.json"
+# Older bundles stay around briefly for clients that still hold their URL
+KEEP_VERSIONS = 2
+
+
+def manifest_path():
+  return os.path.join(BUNDLE_DIR, MANIFEST_FILENAME)
+
+
+def bundle_payload(project):
+  return {"project": project.to_dict(), "steps": step_bundles.released_steps(project.id)}
+
+
+def _write_atomic(path, data):
+  tmp = f"{path}.tmp{os.getpid()}"
+  with open(tmp, "wb") as f:
+    f.write(data)
+  os.replace(tmp, path)
+
+
+def write_bundle(project, dumpb):
+  """Write one project's bundle unless a file with the same content exists. Returns its file name."""
+  body = dumpb(bundle_payload(project))
+  name = f"{project.id}.{hashlib.sha256(body).hexdigest()[:16]}.json"
+  path = os.path.join(BUNDLE_DIR, name)
+  if not os.path.exists(path):
+    _write_atomic(path + ".gz", gzip.compress(body, compresslevel=9, mtime=0))
+    _write_atomic(path, body)
+  return name
+
+
+def prune(project_id, keep):
+  """Delete all but the `keep` newest bundle files of a project."""
+  prefix = f"{project_id}."
+  files = sorted(
+    (e for e in os.scandir(BUNDLE_DIR) if e.name.startswith(prefix) and e.name.endswith(".json")),
+    key=lambda e: e.stat().st_mtime_ns,
+    reverse=True,
+  )
+  for entry in files[keep:]:
+    for path in (entry.path, entry.path + ".gz"):
+      try:
+        os.remove(path)
+      except FileNotFoundError:
+        pass
+
+
+def read_manifest():
+  try:
+    with open(manifest_path(), "rb") as f:
+      return json.loads(f.read())
+  except (FileNotFoundError, ValueError):
+    return {"projects": {}}
+
+
+class _ExportLock:
+  def __enter__(self):
+    self._file = open(os.path.join(BUNDLE_DIR, ".lock"), "w")
+    if fcntl is not None:
+      fcntl.flock(self._file, fcntl.LOCK_EX)
+    return self
+
+  def __exit__(self, *exc):
+    if fcntl is not None:
+      fcntl.flock(self._file, fcntl.LOCK_UN)
+    self._file.close()
+
+
+def export_projects(app, project_ids=None):
+  """
+  Export bundles for `project_ids` (default: every project) and update the
+  manifest; inactive or missing projects are dropped from it. Returns the
+  manifest's project map.
+  """
+  os.makedirs(BUNDLE_DIR, exist_ok=True)
+  with app.app_context(), _ExportLock():
+    query = Project.query
+    if project_ids is not None:
+      query = query.filter(Project.id.in_(list(project_ids)))
+    projects = {p.id: p for p in query.all()}
+    wanted = set(projects) if project_ids is None else set(project_ids)
+
+    manifest = read_manifest()
+    entries = {} if project_ids is None else dict(manifest.get("projects", {}))
+    for project_id in wanted:
+      project = projects.get(project_id)
+      if project is None or not project.is_active:
+        entries.pop(str(project_id), None)
+        continue
+      entries[str(project_id)] = BUNDLE_URL_PREFIX + write_bundle(project, app.json.dumpb)
+      prune(project_id, KEEP_VERSIONS)
+
+    if entries != manifest.get("projects"):
+      _write_atomic(manifest_path(), json.dumps({"projects": entries}, sort_keys=True).encode("utf-8"))
+      print(f"Exported curriculum bundles for {len(wanted)} project(s)")
+    _manifest_cache.clear()
+    return entries
+
+
+_manifest_cache = {}
+
+
+def bundle_url(project_id):
+  """URL of a project's current bundle, or None if it has not been exported."""
+  try:
+    st = os.stat(manifest_path())
+  except OSError:
+    return None
+  signature = (st.st_mtime_ns, st.st_size)
+  if _manifest_cache.get("signature") != signature:
+    _manifest_cache.update(signature=signature, projects=read_manifest().get("projects", {}))
+  return _manifest_cache["projects"].get(str(project_id))
+
+
+def serve_bundle(filename):
+  """Development fallback for nginx's /bundles/ location."""
+  response = send_from_directory(BUNDLE_DIR, filename)
+  if filename == MANIFEST_FILENAME:
+    response.cache_control.no_cache = True
+  else:
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+  return response
+
+
+@step_bundles.register_change_listener
+def export_changed(project_ids):
+  """Re-export after a commit: in a thread when a request is waiting, inline for init/watchers/CLI."""
+  if os.environ.get("BUNDLE_EXPORT", "1") == "0" or not has_app_context():
+    return
+  app = current_app._get_current_object()
+  if has_request_context():
+    threading.Thread(target=export_projects, args=(app, project_ids), daemon=True).start()
+  else:
+    export_projects(app, project_ids)
+
+
+if __name__ == "__main__":
+  from app import app
+
+  ids = [int(a) for a in sys.argv[1:]] or None
+  entries = export_projects(app, ids)
+  print(f"{len(entries)} bundle(s) in {BUNDLE_DIR}")
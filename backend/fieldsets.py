@@ -0,0 +1,52 @@
+"""
+Sparse fieldsets for list and detail endpoints.
+
+  ?fields=id,title,content   only these keys
+  ?exclude=content           every key except these
+
+Models name their large text columns in DEFERRED_COLUMNS. Columns the client
+did not ask for are deferred in the query, so SQLite never reads them, and
+to_dict(fields=...) skips them (and relationship lookups it does not need).
+Endpoints may hide keys by default (e.g. a step's full_code); those are only
+sent when `fields` names them.
+"""
+from flask import request
+from sqlalchemy.orm import defer
+
+
+def _split(value):
+  return frozenset(part.strip() for part in (value or "").split(",") if part.strip())
+
+
+class FieldSet:
+  """The keys a client asked for; supports `key in fieldset`."""
+
+  def __init__(self, include=None, exclude=frozenset()):
+    self.include = include
+    self.exclude = exclude
+
+  def __contains__(self, key):
+    if self.include is not None:
+      return key in self.include
+    return key not in self.exclude
+
+  @property
+  def cache_key(self):
+    return (self.include, self.exclude)
+
+  def filter(self, data):
+    return {k: v for k, v in data.items() if k in self}
+
+
+def from_request(default_exclude=()):
+  """FieldSet from ?fields= / ?exclude=; `default_exclude` applies unless `fields` is given."""
+  include = _split(request.args.get("fields")) or None
+  exclude = _split(request.args.get("exclude"))
+  if include is None:
+    exclude |= frozenset(default_exclude)
+  return FieldSet(include, exclude)
+
+
+def deferred(model, fields):
+  """Query options deferring `model`'s large columns that `fields` does not want."""
+  return [defer(getattr(model, name)) for name in model.DEFERRED_COLUMNS if name not in fields]
@@ -0,0 +1,169 @@
+"""
+Cache of project file contents keyed by (path, mtime, size).
+
+A lookup costs one stat(); the file is only read again when its mtime or size
+changes. Entries are evicted least-recently-used once the total cached bytes
+exceed the budget.
+
+Files larger than the budget are never kept, but describe() remembers their
+size, hash and text/binary kind under the same (mtime, size) key, so listing
+them does not re-read and re-hash them every time.
+"""
+import codecs
+import collections
+import hashlib
+import os
+import threading
+
+
+PROJECT_FILE_CACHE_BYTES = int(os.environ.get("PROJECT_FILE_CACHE_MB", 32)) * 1024 * 1024
+MAX_FILE_INFOS = 1024
+READ_BLOCK_BYTES = 1024 * 1024
+
+
+class CachedFile:
+  __slots__ = ("path", "mtime_ns", "size", "data", "text", "sha256")
+
+  def __init__(self, path, mtime_ns, size, data):
+    self.path = path
+    self.mtime_ns = mtime_ns
+    self.size = size
+    self.data = data
+    try:
+      self.text = data.decode("utf-8")
+    except UnicodeDecodeError:
+      self.text = None  # binary file
+    self.sha256 = hashlib.sha256(data).hexdigest()
+
+  @property
+  def is_text(self):
+    return self.text is not None
+
+
+class FileInfo:
+  """What describe() knows about a file too large to cache: no contents."""
+  __slots__ = ("path", "mtime_ns", "size", "sha256", "is_text")
+
+  def __init__(self, path, mtime_ns, size, sha256, is_text):
+    self.path = path
+    self.mtime_ns = mtime_ns
+    self.size = size
+    self.sha256 = sha256
+    self.is_text = is_text
+
+  @classmethod
+  def scan(cls, path, st):
+    """Hash and classify the file block by block, without holding it in memory."""
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    is_text = True
+    with open(path, "rb") as f:
+      for block in iter(lambda: f.read(READ_BLOCK_BYTES), b""):
+        digest.update(block)
+        if is_text:
+          try:
+            decoder.decode(block)
+          except UnicodeDecodeError:
+            is_text = False
+    if is_text:
+      try:
+        decoder.decode(b"", final=True)
+      except UnicodeDecodeError:
+        is_text = False
+    return cls(path, st.st_mtime_ns, st.st_size, digest.hexdigest(), is_text)
+
+
+class FileCache:
+  def __init__(self, max_bytes=PROJECT_FILE_CACHE_BYTES):
+    self.max_bytes = max_bytes
+    self._entries = collections.OrderedDict()
+    self._infos = collections.OrderedDict()
+    self._bytes = 0
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  def get(self, path, st=None):
+    """
+    Return (CachedFile, from_cache) for `path`. `st` may be a stat result the
+    caller already has (e.g. from os.scandir), saving the stat() call.
+    """
+    st = st or os.stat(path)
+    with self._lock:
+      entry = self._entries.get(path)
+      if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+        self._entries.move_to_end(path)
+        self.hits += 1
+        return entry, True
+
+    with open(path, "rb") as f:
+      data = f.read()
+    entry = CachedFile(path, st.st_mtime_ns, st.st_size, data)
+
+    with self._lock:
+      self.misses += 1
+      self._discard(path)
+      if len(data) <= self.max_bytes:
+        self._entries[path] = entry
+        self._bytes += len(data)
+        while self._bytes > self.max_bytes:
+          _, evicted = self._entries.popitem(last=False)
+          self._bytes -= len(evicted.data)
+    return entry, False
+
+  def describe(self, path, st=None):
+    """
+    Return (CachedFile or FileInfo, from_cache) with the size, sha256 and
+    is_text of `path`. Files within the budget go through get(); larger ones
+    are hashed once per (mtime, size) instead of read on every call.
+    """
+    st = st or os.stat(path)
+    if st.st_size <= self.max_bytes:
+      return self.get(path, st)
+    with self._lock:
+      info = self._infos.get(path)
+      if info is not None and info.mtime_ns == st.st_mtime_ns and info.size == st.st_size:
+        self._infos.move_to_end(path)
+        self.hits += 1
+        return info, True
+
+    info = FileInfo.scan(path, st)
+    with self._lock:
+      self.misses += 1
+      self._infos[path] = info
+      self._infos.move_to_end(path)
+      while len(self._infos) > MAX_FILE_INFOS:
+        self._infos.popitem(last=False)
+    return info, False
+
+  def _discard(self, path):
+    old = self._entries.pop(path, None)
+    if old is not None:
+      self._bytes -= len(old.data)
+
+  def invalidate(self, path_prefix):
+    """Drop every entry under `path_prefix` (a file or a directory)."""
+    prefix = os.path.abspath(path_prefix)
+
+    def under(path):
+      path = os.path.abspath(path)
+      return path == prefix or path.startswith(prefix + os.sep)
+
+    with self._lock:
+      for path in [p for p in self._entries if under(p)]:
+        self._discard(path)
+      for path in [p for p in self._infos if under(p)]:
+        del self._infos[path]
+
+  def stats(self):
+    with self._lock:
+      return {
+        "entries": len(self._entries),
+        "bytes": self._bytes,
+        "max_bytes": self.max_bytes,
+        "hits": self.hits,
+        "misses": self.misses,
+      }
+
+
+project_files = FileCache()
@@ -0,0 +1,151 @@
+"""
+Watch the top-level entries of a directory and report what changed.
+
+DirectoryWatcher keeps a snapshot {entry name: signature} and calls
+on_change(added, removed, changed) with entry names whenever it differs. With
+inotify (the optional `inotify_simple` package) only the entries named in
+events are re-examined; without it the directory is polled.
+"""
+import os
+import threading
+
+try:
+  from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # pragma: no cover - optional dependency / non-Linux
+  INotify = None
+  inotify_flags = None
+
+
+def file_signature(path):
+  """Signature of a plain file: (mtime_ns, size). None if it vanished."""
+  try:
+    st = os.stat(path)
+  except OSError:
+    return None
+  return (st.st_mtime_ns, st.st_size)
+
+
+def folder_signature(path):
+  """Signature of a folder: its files' (name, mtime_ns, size). None if it is not a folder."""
+  try:
+    with os.scandir(path) as entries:
+      return tuple(sorted(
+        (e.name, e.stat().st_mtime_ns, e.stat().st_size) for e in entries if e.is_file()
+      ))
+  except (NotADirectoryError, FileNotFoundError):
+    return None
+
+
+class DirectoryWatcher:
+  def __init__(self, root, on_change, signature=folder_signature, include=None, interval=2.0, debounce=0.5):
+    self.root = root
+    self.on_change = on_change
+    self.signature = signature
+    self.include = include or (lambda name: not name.startswith("."))
+    self.interval = interval
+    self.debounce = debounce
+    self.snapshot = {}
+    self._thread = None
+    self._stop = threading.Event()
+    self._inotify = None
+    self._root_wd = None
+
+  def scan(self, names=None):
+    """Signatures for `names` (default: every entry). Missing entries are omitted."""
+    if names is None:
+      try:
+        names = [n for n in os.listdir(self.root) if self.include(n)]
+      except FileNotFoundError:
+        names = []
+    result = {}
+    for name in names:
+      sig = self.signature(os.path.join(self.root, name))
+      if sig is not None:
+        result[name] = sig
+    return result
+
+  def diff(self, current, names=None):
+    """Diff `current` against the stored snapshot (restricted to `names` if given) and store it."""
+    scope = set(self.snapshot) | set(current) if names is None else set(names)
+    added, removed, changed = [], [], []
+    for name in sorted(scope):
+      old, new = self.snapshot.get(name), current.get(name)
+      if old is None and new is not None:
+        added.append(name)
+      elif old is not None and new is None:
+        removed.append(name)
+      elif old != new:
+        changed.append(name)
+      if new is None:
+        self.snapshot.pop(name, None)
+      else:
+        self.snapshot[name] = new
+    return added, removed, changed
+
+  def _emit(self, added, removed, changed):
+    if added or removed or changed:
+      try:
+        self.on_change(added, removed, changed)
+      except Exception as e:
+        print(f"Watcher callback failed for {self.root}: {e}")
+
+  def start(self, initial_snapshot=None):
+    """Start watching in a daemon thread. The first snapshot is taken as the in-sync baseline."""
+    if INotify is not None:
+      # Register the watch before snapshotting so nothing slips in between
+      os.makedirs(self.root, exist_ok=True)
+      self._inotify = INotify()
+      self._root_wd = self._inotify.add_watch(self.root, self._inotify_mask())
+      target = self._run_inotify
+    else:
+      target = self._run_polling
+    self.snapshot = dict(initial_snapshot) if initial_snapshot is not None else self.scan()
+    self._thread = threading.Thread(target=target, name=f"watch-{os.path.basename(self.root)}", daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    self._stop.set()
+
+  def _run_polling(self):
+    while not self._stop.wait(self.interval):
+      self._emit(*self.diff(self.scan()))
+
+  @staticmethod
+  def _inotify_mask():
+    return (
+      inotify_flags.CREATE | inotify_flags.DELETE | inotify_flags.MOVED_FROM | inotify_flags.MOVED_TO
+      | inotify_flags.CLOSE_WRITE | inotify_flags.ATTRIB
+    )
+
+  def _run_inotify(self):
+    inotify, root_wd, mask = self._inotify, self._root_wd, self._inotify_mask()
+    wd_names = {}
+
+    def watch_entry(name):
+      path = os.path.join(self.root, name)
+      if os.path.isdir(path):
+        try:
+          wd_names[inotify.add_watch(path, mask)] = name
+        except OSError:
+          pass
+
+    for name in self.snapshot:
+      watch_entry(name)
+
+    while not self._stop.is_set():
+      events = inotify.read(timeout=int(self.interval * 1000), read_delay=int(self.debounce * 1000))
+      dirty = set()
+      for event in events:
+        if event.wd == root_wd:
+          if event.name and self.include(event.name):
+            dirty.add(event.name)
+        elif event.wd in wd_names:
+          dirty.add(wd_names[event.wd])
+      if not dirty:
+        continue
+      wd_names = {wd: n for wd, n in wd_names.items() if n not in dirty}
+      current = self.scan(dirty)
+      for name in current:
+        watch_entry(name)
+      self._emit(*self.diff(current, dirty))
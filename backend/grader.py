@@ -0,0 +1,137 @@
+"""
+Auto-grading of submitted Python programs.
+
+Each project folder may carry a `tests.json` fixture file:
+
+  {
+    "timeout": 5,
+    "tests": [
+      {"name": "even", "stdin": "4\\n", "expected_stdout": "Enter an integer: Even\\n"},
+      {"name": "seeded_game", "stdin": "...", "seed": 7, "expected_stdout": "..."}
+    ]
+  }
+
+Every (submission, test) pair is an independent task on a shared thread pool;
+each task only starts a sandboxed subprocess and waits for it, so regrading a
+whole project spreads across all cores without forking the (threaded) server.
+Requests do not grade inline: grading_jobs runs it in the background.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from models import db, ProjectSubmission, SubmissionTestResult
+import sandbox
+import sandbox_slots
+
+
+PROJECTS_DIR = os.path.join(os.path.dirname(__file__), "projects")
+FIXTURE_FILENAME = "tests.json"
+GRADER_WORKERS = int(os.environ.get("GRADER_WORKERS", os.cpu_count() or 1))
+
+_pool = ThreadPoolExecutor(max_workers=GRADER_WORKERS, thread_name_prefix="grader")
+
+
+def get_pool():
+  return _pool
+
+
+def _run_case(script_path, case, limits):
+  """sandbox.run_case under the host-wide sandbox slot limit, confined to the slot's uid."""
+  with sandbox_slots.hold() as slot:
+    return sandbox.run_case(script_path, case, limits, confine_with=sandbox.confinement(slot))
+
+
+def load_fixtures(project):
+  """Return (tests, limits) for a project; ([], None) when it has no fixture file."""
+  if not project or not project.project_path:
+    return [], None
+  path = os.path.join(PROJECTS_DIR, project.project_path, FIXTURE_FILENAME)
+  if not os.path.exists(path):
+    return [], None
+  with open(path, "r", encoding="utf-8") as f:
+    data = json.load(f)
+  limits = {
+    "timeout": data.get("timeout"),
+    "cpu_seconds": data.get("cpu_seconds"),
+    "memory_bytes": data.get("memory_mb") and data["memory_mb"] * 1024 * 1024,
+  }
+  return data.get("tests", []), limits
+
+
+def is_gradable(submission):
+  return (
+    submission.project_id is not None
+    and submission.filename.lower().endswith(".py")
+    and os.path.exists(submission.file_path)
+  )
+
+
+def grade_submissions(submissions):
+  """
+  Run the project fixtures against each gradable submission and replace its
+  stored test results. Returns {submission_id: [SubmissionTestResult]}.
+  The caller is responsible for committing.
+  """
+  fixtures = {}
+  jobs = []
+  pool = get_pool()
+  for submission in submissions:
+    if not is_gradable(submission):
+      continue
+    if submission.project_id not in fixtures:
+      fixtures[submission.project_id] = load_fixtures(submission.project)
+    tests, limits = fixtures[submission.project_id]
+    for index, case in enumerate(tests, 1):
+      future = pool.submit(_run_case, submission.file_path, case, limits)
+      jobs.append((submission, case.get("name") or f"test_{index}", case, future))
+
+  graded = {}
+  try:
+    for submission, test_name, case, future in jobs:
+      result = future.result()
+      graded.setdefault(submission.id, []).append(
+        SubmissionTestResult(
+          submission_id=submission.id,
+          test_name=test_name,
+          passed=result["passed"],
+          returncode=result["returncode"],
+          timed_out=result["timed_out"],
+          stdout=result["stdout"],
+          stderr=result["stderr"],
+          expected_stdout=case.get("expected_stdout", ""),
+          duration_ms=result["duration_ms"],
+        )
+      )
+  except BaseException:
+    for _, _, _, future in jobs:
+      future.cancel()
+    raise
+
+  if graded:
+    SubmissionTestResult.query.filter(
+      SubmissionTestResult.submission_id.in_(list(graded.keys()))
+    ).delete(synchronize_session=False)
+    for results in graded.values():
+      db.session.add_all(results)
+  return graded
+
+
+def project_submission_ids(project):
+  """Ids of every Python submission for a project, oldest first."""
+  rows = (
+    ProjectSubmission.query.with_entities(ProjectSubmission.id)
+    .filter(ProjectSubmission.project_id == project.id, ProjectSubmission.filename.ilike("%.py"))
+    .order_by(ProjectSubmission.id.asc())
+    .all()
+  )
+  return [row.id for row in rows]
+
+
+def summarize(results):
+  passed = sum(1 for r in results if r.passed)
+  return {
+    "passed": passed,
+    "total": len(results),
+    "all_passed": bool(results) and passed == len(results),
+  }
@@ -0,0 +1,89 @@
+"""
+Background auto-grading.
+
+Grading runs every fixture of every submission in the sandbox; a project-wide
+regrade takes roughly submissions x tests x timeout / cores, far longer than a
+request may take (gunicorn kills workers after GUNICORN_TIMEOUT). Endpoints
+therefore only record a GradingJob and return its id. A small thread pool in
+the accepting process grades the submissions CHUNK_SIZE at a time, committing
+results and progress after each chunk, and GET /api/grading-jobs/<id> reads
+the job from the table, so any server process can answer.
+
+A job whose process died (worker recycled, deploy) stops being updated; after
+GRADING_JOB_STALE_SECONDS without progress it is reported as "interrupted" and
+can simply be submitted again.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models import db, GradingJob, ProjectSubmission
+import grader
+
+
+JOB_WORKERS = int(os.environ.get("GRADING_JOB_WORKERS", 2))
+CHUNK_SIZE = int(os.environ.get("GRADING_JOB_CHUNK_SIZE", 8))
+STALE_AFTER = timedelta(seconds=float(os.environ.get("GRADING_JOB_STALE_SECONDS", 900)))
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="grading-job")
+
+
+def submit(app, submission_ids, project_id=None, requested_by=None):
+  """Record a job for `submission_ids` and start grading it in the background. Returns the GradingJob."""
+  job = GradingJob(
+    project_id=project_id,
+    requested_by=requested_by,
+    submission_ids=json.dumps(list(submission_ids)),
+    total=len(submission_ids),
+  )
+  db.session.add(job)
+  db.session.commit()
+  _executor.submit(_run, app, job.id)
+  return job
+
+
+def status(job):
+  """The job's status, with jobs that stopped making progress reported as interrupted."""
+  if job.status in ("queued", "running") and job.updated_at and datetime.utcnow() - job.updated_at > STALE_AFTER:
+    return "interrupted"
+  return job.status
+
+
+def _run(app, job_id):
+  with app.app_context():
+    try:
+      _grade(job_id)
+    except Exception as e:
+      db.session.rollback()
+      print(f"Grading job {job_id} failed: {e}")
+      job = db.session.get(GradingJob, job_id)
+      if job is not None:
+        job.status = "failed"
+        job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+    finally:
+      db.session.remove()
+
+
+def _grade(job_id):
+  job = db.session.get(GradingJob, job_id)
+  job.status = "running"
+  job.started_at = datetime.utcnow()
+  db.session.commit()
+
+  ids = json.loads(job.submission_ids)
+  summaries = {}
+  for start in range(0, len(ids), CHUNK_SIZE):
+    chunk = ids[start:start + CHUNK_SIZE]
+    submissions = ProjectSubmission.query.filter(ProjectSubmission.id.in_(chunk)).all()
+    graded = grader.grade_submissions(submissions)
+    summaries.update({str(sid): grader.summarize(results) for sid, results in graded.items()})
+    job.graded += len(chunk)
+    job.summaries = json.dumps(summaries)
+    db.session.commit()
+
+  job.status = "finished"
+  job.finished_at = datetime.utcnow()
+  db.session.commit()
@@ -0,0 +1,51 @@
+"""
+Gunicorn settings for production (gunicorn -c gunicorn.conf.py wsgi:app).
+
+- The app is preloaded in the master and forked into workers, so imports and
+  init_db happen once; each worker then drops the inherited DB connections.
+- Threaded workers (gthread) keep serving while a request waits on the DB or
+  the sandbox pool; worker count defaults to 2 x cores + 1.
+- Each worker has its own run pool and grader, but sandboxed programs on the
+  host share SANDBOX_MAX_CONCURRENT slots (sandbox_slots.py), and runs handed
+  out for polling are stored in sandbox_runs so any worker can answer the poll.
+- Workers are recycled after max_requests (with jitter) to bound memory growth.
+- Single-process background work (run-session server, folder watchers) lives
+  in the separate run_sessions.py service, not in the forking master.
+- `kill -HUP <master>` restarts workers gracefully; with preload_app, code
+  changes need `kill -USR2` (new master) followed by `kill -WINCH`/`-TERM` of the old one.
+"""
+import multiprocessing
+import os
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+preload_app = True
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def on_starting(server):
+  """Master, before workers exist: migrate and seed once."""
+  from app import init_db
+  init_db()
+
+
+def post_fork(server, worker):
+  """Worker: never reuse DB connections opened by the master before the fork."""
+  from app import app
+  from db_config import read_engine
+  from models import db
+  with app.app_context():
+    db.engine.dispose(close=False)
+  if read_engine(app) is not None:
+    read_engine(app).dispose(close=False)
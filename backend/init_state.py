@@ -0,0 +1,91 @@
+"""
+Fingerprint of everything init_db depends on.
+
+init_db stores the fingerprint in app_meta when it finishes. On the next start
+a matching fingerprint means schema, migrations, seed files and the PDF library
+are as they were, so the whole initialisation can be skipped. Computing it
+costs a handful of stat() calls and one primary-key lookup.
+"""
+import hashlib
+import os
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+import search
+from export_bundles import manifest_path
+from migrate_db import discover
+from models import db
+from resource_indexer import BOOKS_DIR, is_book
+from seed import CURRICULUM_FILENAME, PROJECTS_DIR
+from upsert import set_meta
+
+
+FINGERPRINT_KEY = "init_fingerprint"
+# Bump to force a full init everywhere, e.g. when init_db itself changes
+INIT_VERSION = 1
+
+
+def schema_signature():
+  """Tables, columns and indexes as declared by the models, plus the search index layout."""
+  parts = []
+  for table in db.metadata.sorted_tables:
+    columns = ",".join(f"{c.name}:{c.type}:{int(c.nullable)}" for c in table.columns)
+    indexes = ",".join(sorted(i.name for i in table.indexes if i.name))
+    parts.append(f"{table.name}({columns})[{indexes}]")
+  parts.append(repr(sorted(search.INDEXES.items())))
+  return "\n".join(parts)
+
+
+def _stat(path):
+  try:
+    st = os.stat(path)
+  except OSError:
+    return "-"
+  return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def files_signature():
+  """Project folders with their curriculum file's stat, the PDFs in the library and the bundle export."""
+  parts = []
+  try:
+    folders = sorted(e.name for e in os.scandir(PROJECTS_DIR) if e.is_dir() and not e.name.startswith("."))
+  except FileNotFoundError:
+    folders = []
+  for folder in folders:
+    parts.append(f"project {folder} {_stat(os.path.join(PROJECTS_DIR, folder, CURRICULUM_FILENAME))}")
+  try:
+    books = sorted(n for n in os.listdir(BOOKS_DIR) if is_book(n))
+  except FileNotFoundError:
+    books = []
+  for name in books:
+    parts.append(f"book {name} {_stat(os.path.join(BOOKS_DIR, name))}")
+  # A missing bundle export (e.g. a fresh static volume) needs a full init
+  parts.append(f"bundles {os.path.exists(manifest_path())}")
+  return "\n".join(parts)
+
+
+def compute_fingerprint():
+  digest = hashlib.sha256()
+  migrations = ",".join(f"{m.version}:{m.name}" for m in discover())
+  for part in (f"v{INIT_VERSION}", migrations, schema_signature(), files_signature()):
+    digest.update(part.encode("utf-8"))
+    digest.update(b"\0")
+  return digest.hexdigest()
+
+
+def stored_fingerprint():
+  """The fingerprint of the last completed init, or None (also when app_meta does not exist yet)."""
+  try:
+    row = db.session.execute(
+      text("SELECT value FROM app_meta WHERE key = :key"), {"key": FINGERPRINT_KEY}
+    ).first()
+  except SQLAlchemyError:
+    db.session.rollback()
+    return None
+  return row[0] if row else None
+
+
+def store_fingerprint(value):
+  set_meta(FINGERPRINT_KEY, value)
+  db.session.commit()
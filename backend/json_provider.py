@@ -0,0 +1,114 @@
+"""
+JSON provider for the app (app.json), used by jsonify and request.get_json.
+
+orjson, when installed, serializes several times faster than the stdlib json
+module and handles datetime/date, enums and dataclasses natively; without it
+the stdlib is used with the same conventions. Output is compact (pretty-printed
+only in debug) and keys keep their insertion order instead of being sorted.
+
+stream_list() serializes large lists item by item into chunks instead of
+building the whole document as Python objects first.
+"""
+import dataclasses
+import decimal
+import enum
+import json
+import uuid
+from datetime import date, datetime, time
+
+from flask import Response, current_app
+from flask.json.provider import DefaultJSONProvider
+
+try:
+  import orjson
+except ImportError:  # optional speedup
+  orjson = None
+
+
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _default(o):
+  """Types neither serializer handles on its own (orjson covers dates, enums and dataclasses itself)."""
+  if isinstance(o, (datetime, date, time)):
+    return o.isoformat()
+  if isinstance(o, enum.Enum):
+    return o.value
+  if isinstance(o, decimal.Decimal):
+    return float(o)
+  if isinstance(o, uuid.UUID):
+    return str(o)
+  if isinstance(o, (set, frozenset)):
+    return list(o)
+  if dataclasses.is_dataclass(o) and not isinstance(o, type):
+    return dataclasses.asdict(o)
+  if hasattr(o, "__html__"):
+    return str(o.__html__())
+  raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+  sort_keys = False
+
+  def _pretty(self):
+    return self.compact is False or (self.compact is None and self._app.debug)
+
+  def dumpb(self, obj):
+    """Serialize to UTF-8 bytes, the form responses are sent in."""
+    if orjson is not None:
+      option = orjson.OPT_NON_STR_KEYS
+      if self._pretty():
+        option |= orjson.OPT_INDENT_2
+      try:
+        return orjson.dumps(obj, default=_default, option=option)
+      except TypeError:
+        pass  # e.g. integers beyond 64 bits; the stdlib copes
+    return self.dumps(obj).encode("utf-8")
+
+  def dumps(self, obj, **kwargs):
+    if orjson is not None and not kwargs:
+      try:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+      except TypeError:
+        pass
+    kwargs.setdefault("default", _default)
+    kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+    kwargs.setdefault("sort_keys", self.sort_keys)
+    if self._pretty():
+      kwargs.setdefault("indent", 2)
+    else:
+      kwargs.setdefault("separators", (",", ":"))
+    return json.dumps(obj, **kwargs)
+
+  def loads(self, s, **kwargs):
+    if orjson is not None and not kwargs:
+      return orjson.loads(s)
+    return json.loads(s, **kwargs)
+
+  def response(self, *args, **kwargs):
+    obj = self._prepare_response_obj(args, kwargs)
+    return self._app.response_class(self.dumpb(obj), mimetype=self.mimetype)
+
+
+def stream_list(key, items, serialize, **fields):
+  """
+  Response streaming {"success": true, **fields, key: [serialize(item), ...]}
+  in chunks of about 64 KiB. Items are serialized one at a time, so the list
+  of dicts is never built, but all of them before the response starts: an error
+  in `serialize` raises in the endpoint (its JSON 500) instead of cutting off
+  a 200 body mid-stream.
+  """
+  dumpb = current_app.json.dumpb
+  chunks = []
+  buffer = bytearray(dumpb({"success": True, **fields})[:-1])  # without the closing brace
+  buffer += b',"' + key.encode("utf-8") + b'":['
+  for index, item in enumerate(items):
+    if index:
+      buffer += b","
+    buffer += dumpb(serialize(item))
+    if len(buffer) >= STREAM_CHUNK_BYTES:
+      chunks.append(bytes(buffer))
+      buffer.clear()
+  buffer += b"]}"
+  chunks.append(bytes(buffer))
+  return Response(iter(chunks), mimetype=current_app.json.mimetype)
@@ -0,0 +1,145 @@
+"""
+Serving of files under uploads/ (the PDF library, thumbnails, submissions).
+
+Responses carry a strong ETag and support HTTP Range requests, so PDF viewers
+can fetch the pages they show instead of the whole book. Files are never hashed
+while serving: books use the sha256 the indexer stored in indexed_files,
+thumbnails are named after it, and anything else gets an mtime/size ETag like
+nginx's. URLs that pin the content hash (`?v=<hash prefix>`, and
+content-addressed thumbnails) are cached by browsers and proxies for a year.
+
+First-page thumbnails of books are rendered once per content hash with
+poppler's `pdftoppm` when it is installed.
+"""
+import collections
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+from flask import abort, request, send_file
+from werkzeug.security import safe_join
+
+from models import IndexedFile
+
+
+UPLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads")
+THUMBNAILS_DIR = os.path.join(UPLOADS_DIR, "thumbnails")
+BOOKS_DIR = os.path.join(UPLOADS_DIR, "books")
+BOOKS_SCOPE = "books"
+THUMBNAIL_WIDTH = int(os.environ.get("THUMBNAIL_WIDTH", 320))
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+PDFTOPPM = shutil.which("pdftoppm")
+
+
+def sha256_file(path, chunk_size=1024 * 1024):
+  digest = hashlib.sha256()
+  with open(path, "rb") as f:
+    for chunk in iter(lambda: f.read(chunk_size), b""):
+      digest.update(chunk)
+  return digest.hexdigest()
+
+
+class HashCache:
+  """Known sha256 of files keyed by (path, mtime, size); filled by the indexer and DB lookups."""
+
+  def __init__(self, max_entries=4096):
+    self.max_entries = max_entries
+    self._entries = collections.OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, path, st):
+    key = (path, st.st_mtime_ns, st.st_size)
+    with self._lock:
+      digest = self._entries.get(key)
+      if digest is not None:
+        self._entries.move_to_end(key)
+      return digest
+
+  def put(self, path, mtime_ns, size, digest):
+    with self._lock:
+      self._entries[(path, mtime_ns, size)] = digest
+      self._entries.move_to_end((path, mtime_ns, size))
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+
+content_hashes = HashCache()
+
+
+def known_hash(path, st):
+  """sha256 recorded by the indexer for this version of a book, or None. Never reads the file."""
+  digest = content_hashes.get(path, st)
+  if digest is not None or os.path.dirname(path) != BOOKS_DIR:
+    return digest
+  row = IndexedFile.query.filter_by(scope=BOOKS_SCOPE, name=os.path.basename(path)).first()
+  if row is None or not row.content_hash or (row.mtime_ns, row.size) != (st.st_mtime_ns, st.st_size):
+    return None  # not indexed yet, or changed since
+  content_hashes.put(path, row.mtime_ns, row.size, row.content_hash)
+  return row.content_hash
+
+
+def stat_etag(st):
+  return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def thumbnail_name(content_hash):
+  return f"{content_hash}.png"
+
+
+def render_thumbnail(pdf_path, content_hash):
+  """Render page 1 of a PDF to thumbnails/<hash>.png. Returns the path, or None if it cannot be rendered."""
+  target = os.path.join(THUMBNAILS_DIR, thumbnail_name(content_hash))
+  if os.path.exists(target):
+    return target
+  if PDFTOPPM is None:
+    return None
+  os.makedirs(THUMBNAILS_DIR, exist_ok=True)
+  with tempfile.TemporaryDirectory(dir=THUMBNAILS_DIR) as tmp:
+    out_base = os.path.join(tmp, "page")
+    try:
+      subprocess.run(
+        [PDFTOPPM, "-png", "-f", "1", "-l", "1", "-singlefile", "-scale-to-x", str(THUMBNAIL_WIDTH),
+         "-scale-to-y", "-1", pdf_path, out_base],
+        check=True, capture_output=True, timeout=60,
+      )
+      # Atomic so concurrent readers never see a partial image
+      os.replace(out_base + ".png", target)
+    except (subprocess.SubprocessError, OSError) as e:
+      print(f"Could not render thumbnail for {pdf_path}: {e}")
+      return None
+  return target
+
+
+def serve_upload(filename):
+  """send_file for uploads/<filename> with strong ETag, Range support and hash-aware caching."""
+  path = safe_join(UPLOADS_DIR, filename)
+  if path is None:
+    abort(404)
+  try:
+    st = os.stat(path)
+  except OSError:
+    abort(404)
+  if not os.path.isfile(path):
+    abort(404)
+
+  if os.path.dirname(path) == THUMBNAILS_DIR:
+    content_hash = os.path.splitext(os.path.basename(path))[0]  # thumbnails are named <sha256>.png
+  else:
+    content_hash = known_hash(path, st)
+  response = send_file(path, conditional=True, etag=content_hash or stat_etag(st), last_modified=st.st_mtime)
+  response.accept_ranges = "bytes"
+  pinned = request.args.get("v")
+  if os.path.dirname(path) == THUMBNAILS_DIR or (
+    content_hash and pinned and len(pinned) >= 8 and content_hash.startswith(pinned)
+  ):
+    response.cache_control.no_cache = None
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+  else:
+    # Unpinned URLs may point at a newer version tomorrow: always revalidate
+    response.cache_control.no_cache = True
+  return response
@@ -1,44 +1,158 @@
 #!/usr/bin/env python3
-"""Database migration script to add missing columns"""
-from app import app
-from sqlalchemy import text, inspect
-
-def migrate_database():
-    """Add missing columns to existing tables"""
-    with app.app_context():
-        from models import db
-        
-        inspector = inspect(db.engine)
-        
-        # Check if project_submissions table exists
-        if 'project_submissions' in inspector.get_table_names():
-            columns = [col['name'] for col in inspector.get_columns('project_submissions')]
-            
-            # Add submission_type column if it doesn't exist
-            if 'submission_type' not in columns:
-                print("Adding submission_type column to project_submissions table...")
-                try:
-                    with db.engine.connect() as conn:
-                        conn.execute(text("ALTER TABLE project_submissions ADD COLUMN submission_type VARCHAR(50) DEFAULT 'project'"))
-                        conn.commit()
-                    print("✓ Successfully added submission_type column")
-                except Exception as e:
-                    print(f"✗ Error adding submission_type column: {e}")
-            else:
-                print("✓ submission_type column already exists")
-        else:
-            print("project_submissions table doesn't exist yet (will be created on next init)")
-        
-        # Ensure notifications table exists
-        if 'notifications' not in inspector.get_table_names():
-            print("Creating notifications table...")
-            from models import Notification
-            db.create_all()
-            print("✓ Created notifications table")
-        else:
-            print("✓ notifications table already exists")
-        
-        print("\nMigration complete!")
-
-if __name__ == '__main__':
-    migrate_database()
+"""
+Versioned database migrations.
+
+Migrations live in backend/migrations as NNNN_description.py files, each with
+an `upgrade(ctx)` function. Applied versions are recorded in schema_migrations;
+the runner applies the pending ones in order, each in its own short
+transaction, so running it again is a no-op. Migrations are written to be
+idempotent as well (IF NOT EXISTS, column checks), because a fresh database gets
+the current schema from db.create_all() before the runner records them.
+
+Usage: python migrate_db.py [--status]
+"""
+import importlib.util
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+from models import db, SchemaMigration
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+BACKFILL_BATCH_SIZE = int(os.environ.get("MIGRATION_BATCH_SIZE", 500))
+_FILENAME_RE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+
+class Migration:
+  def __init__(self, version, name, path):
+    self.version = version
+    self.name = name
+    self.path = path
+
+  def load(self):
+    spec = importlib.util.spec_from_file_location(f"migration_{self.version:04d}", self.path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class MigrationContext:
+  """Helpers handed to upgrade(); every statement commits on its own to keep locks short."""
+
+  def __init__(self, engine):
+    self.engine = engine
+    self.dialect = engine.dialect.name
+
+  def has_table(self, table):
+    return inspect(self.engine).has_table(table)
+
+  def has_column(self, table, column):
+    return self.has_table(table) and column in {c["name"] for c in inspect(self.engine).get_columns(table)}
+
+  def execute(self, sql, params=None):
+    with self.engine.begin() as conn:
+      return conn.execute(text(sql), params or {})
+
+  def add_column(self, table, column, ddl):
+    """ALTER TABLE ... ADD COLUMN unless the table is missing or already has it."""
+    if self.has_table(table) and not self.has_column(table, column):
+      self.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+      print(f"  added {table}.{column}")
+
+  def create_index(self, name, table, columns, unique=False):
+    """
+    CREATE INDEX IF NOT EXISTS. On PostgreSQL the index is built CONCURRENTLY so
+    writes continue meanwhile; SQLite builds it in a single short write transaction.
+    """
+    if not self.has_table(table):
+      return
+    cols = ", ".join(columns)
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    if self.dialect == "postgresql":
+      with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {name} ON {table} ({cols})"))
+    else:
+      self.execute(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({cols})")
+
+  def backfill(self, table, assignments, where, batch_size=BACKFILL_BATCH_SIZE, pause=0.0):
+    """
+    UPDATE table SET <assignments> WHERE <where> in batches of `batch_size` rows,
+    committing after each batch so readers and writers are never blocked for long.
+    `where` must stop matching rows once they are updated. Returns rows updated.
+    """
+    if not self.has_table(table):
+      return 0
+    total = 0
+    while True:
+      result = self.execute(
+        f"UPDATE {table} SET {assignments} WHERE id IN "
+        f"(SELECT id FROM {table} WHERE {where} LIMIT :batch)",
+        {"batch": batch_size},
+      )
+      total += result.rowcount
+      if result.rowcount < batch_size:
+        return total
+      if pause:
+        time.sleep(pause)
+
+
+def discover():
+  migrations = []
+  for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+    match = _FILENAME_RE.match(filename)
+    if match:
+      migrations.append(Migration(int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+  versions = [m.version for m in migrations]
+  if len(versions) != len(set(versions)):
+    raise RuntimeError("Duplicate migration version numbers in migrations/")
+  return migrations
+
+
+def applied_versions():
+  return {row.version for row in SchemaMigration.query.all()}
+
+
+def pending_migrations():
+  done = applied_versions()
+  return [m for m in discover() if m.version not in done]
+
+
+def latest_version():
+  migrations = discover()
+  return migrations[-1].version if migrations else 0
+
+
+def run_migrations():
+  """Apply pending migrations in order. Must run inside an app context. Returns the versions applied."""
+  SchemaMigration.__table__.create(db.engine, checkfirst=True)
+  applied = []
+  ctx = MigrationContext(db.engine)
+  for migration in pending_migrations():
+    started = time.monotonic()
+    print(f"Applying migration {migration.version:04d}_{migration.name}...")
+    migration.load().upgrade(ctx)
+    db.session.add(SchemaMigration(version=migration.version, name=migration.name, applied_at=datetime.utcnow()))
+    db.session.commit()
+    applied.append(migration.version)
+    print(f"✓ {migration.version:04d}_{migration.name} ({int((time.monotonic() - started) * 1000)} ms)")
+  return applied
+
+
+if __name__ == "__main__":
+  from app import app
+
+  with app.app_context():
+    if "--status" in sys.argv[1:]:
+      SchemaMigration.__table__.create(db.engine, checkfirst=True)
+      done = applied_versions()
+      for m in discover():
+        print(f"[{'x' if m.version in done else ' '}] {m.version:04d}_{m.name}")
+    else:
+      db.create_all()
+      applied = run_migrations()
+      print(f"Applied {len(applied)} migration(s)" if applied else "Database is up to date")
@@ -0,0 +1,6 @@
+"""project_submissions.submission_type (project / final_test)."""
+
+
+def upgrade(ctx):
+  ctx.add_column("project_submissions", "submission_type", "VARCHAR(50) DEFAULT 'project'")
+  ctx.backfill("project_submissions", "submission_type = 'project'", "submission_type IS NULL")
@@ -0,0 +1,5 @@
+"""indexed_files.thumbnail: first-page thumbnail rendered for a book version."""
+
+
+def upgrade(ctx):
+  ctx.add_column("indexed_files", "thumbnail", "VARCHAR(100)")
@@ -0,0 +1,5 @@
+"""Per-project progress roll-ups (project_id, status)."""
+
+
+def upgrade(ctx):
+  ctx.create_index("ix_project_progress_project_status", "project_progress", ["project_id", "status"])
@@ -0,0 +1,14 @@
+"""Submission lists: a student's submissions per project / type, and mentor lists, newest first."""
+
+
+def upgrade(ctx):
+  ctx.create_index(
+    "ix_project_submissions_student_project_submitted", "project_submissions",
+    ["student_id", "project_id", "submitted_at"],
+  )
+  ctx.create_index(
+    "ix_project_submissions_student_type_submitted", "project_submissions",
+    ["student_id", "submission_type", "submitted_at"],
+  )
+  ctx.create_index("ix_project_submissions_project_submitted", "project_submissions", ["project_id", "submitted_at"])
+  ctx.create_index("ix_project_submissions_submitted", "project_submissions", ["submitted_at"])
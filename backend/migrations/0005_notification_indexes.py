@@ -0,0 +1,6 @@
+"""Notification feed and unread count: a user's (unread) notifications, newest first."""
+
+
+def upgrade(ctx):
+  ctx.create_index("ix_notifications_user_read_created", "notifications", ["user_id", "is_read", "created_at"])
+  ctx.create_index("ix_notifications_user_created", "notifications", ["user_id", "created_at"])
@@ -2,9 +2,13 @@ from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 import enum
+import json
 
+from db_routing import RoutingSession
 
-db = SQLAlchemy()
+
+# GET requests read through the read engine, see db_routing
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 
 class UserRole(enum.Enum):
@@ -62,17 +66,22 @@ class Project(db.Model):
   progress_records = db.relationship("ProjectProgress", backref="project", lazy=True, cascade="all, delete-orphan")
   steps = db.relationship("ProjectStep", backref="project", lazy=True, cascade="all, delete-orphan")
 
-  def to_dict(self):
-    return {
+  # Large text columns; deferred when a request's fieldset leaves them out (see fieldsets.py)
+  DEFERRED_COLUMNS = ("description",)
+
+  def to_dict(self, fields=None):
+    data = {
       "id": self.id,
       "name": self.name,
-      "description": self.description,
       "project_path": self.project_path,
       "difficulty_level": self.difficulty_level,
       "estimated_time": self.estimated_time,
       "created_at": self.created_at.isoformat() if self.created_at else None,
       "is_active": self.is_active,
     }
+    if fields is None or "description" in fields:
+      data["description"] = self.description
+    return data if fields is None else fields.filter(data)
 
 
 class ProjectProgress(db.Model):
@@ -89,7 +98,10 @@ class ProjectProgress(db.Model):
   mentor_feedback = db.Column(db.Text)
   updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-  __table_args__ = (db.UniqueConstraint("student_id", "project_id", name="unique_student_project"),)
+  __table_args__ = (
+    db.UniqueConstraint("student_id", "project_id", name="unique_student_project"),
+    db.Index("ix_project_progress_project_status", "project_id", "status"),
+  )
 
   def to_dict(self):
     return {
@@ -119,25 +131,31 @@ class ProjectStep(db.Model):
   is_released = db.Column(db.Boolean, default=False)
   created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+  # Computed in SQL from the record header, so clients learn whether there is full code without reading it
+  has_full_code = db.column_property(full_code.isnot(None))
+
   questions = db.relationship("ProjectStepQuestion", backref="step", lazy=True, cascade="all, delete-orphan")
 
   __table_args__ = (db.UniqueConstraint("project_id", "order_index", name="unique_step_order_per_project"),)
 
-  def to_dict(self, include_questions=False):
+  DEFERRED_COLUMNS = ("content", "code_snippet", "full_code")
+
+  def to_dict(self, include_questions=False, fields=None):
     data = {
       "id": self.id,
       "project_id": self.project_id,
       "order_index": self.order_index,
       "title": self.title,
-      "content": self.content,
-      "code_snippet": self.code_snippet,
-      "full_code": self.full_code,
       "is_released": self.is_released,
+      "has_full_code": bool(self.has_full_code),
       "created_at": self.created_at.isoformat() if self.created_at else None,
     }
-    if include_questions:
+    for name in self.DEFERRED_COLUMNS:
+      if fields is None or name in fields:
+        data[name] = getattr(self, name)
+    if include_questions and (fields is None or "questions" in fields):
       data["questions"] = [q.to_dict() for q in self.questions]
-    return data
+    return data if fields is None else fields.filter(data)
 
 
 class ProjectStepQuestion(db.Model):
@@ -222,6 +240,15 @@ class Resource(db.Model):
       "created_at": self.created_at.isoformat() if self.created_at else None,
       "updated_at": self.updated_at.isoformat() if self.updated_at else None,
       "is_active": self.is_active,
+      # Indexed books: content-hashed URL (cacheable forever) and first-page thumbnail
+      "url": (
+        f"{self.content}?v={self.indexed_file.content_hash[:16]}"
+        if self.indexed_file and self.indexed_file.content_hash else self.content
+      ),
+      "thumbnail_url": (
+        f"/uploads/thumbnails/{self.indexed_file.thumbnail}"
+        if self.indexed_file and self.indexed_file.thumbnail else None
+      ),
     }
 
 
@@ -243,30 +270,45 @@ class ProjectSubmission(db.Model):
   status = db.Column(db.String(50), default="submitted")  # submitted, reviewed, approved, needs_revision
   submission_type = db.Column(db.String(50), default="project")  # project, final_test
 
+  __table_args__ = (
+    db.Index("ix_project_submissions_student_project_submitted", "student_id", "project_id", "submitted_at"),
+    db.Index("ix_project_submissions_student_type_submitted", "student_id", "submission_type", "submitted_at"),
+    db.Index("ix_project_submissions_project_submitted", "project_id", "submitted_at"),
+    db.Index("ix_project_submissions_submitted", "submitted_at"),
+  )
+
   student = db.relationship("User", foreign_keys=[student_id], backref="submissions")
   project = db.relationship("Project", backref="submissions")
   reviewer = db.relationship("User", foreign_keys=[reviewed_by])
 
-  def to_dict(self):
-    return {
+  DEFERRED_COLUMNS = ("notes", "review_notes")
+
+  def to_dict(self, fields=None):
+    data = {
       "id": self.id,
       "student_id": self.student_id,
-      "student_name": self.student.full_name if self.student else None,
       "project_id": self.project_id,
-      "project_name": self.project.name if self.project else None,
       "filename": self.filename,
       "file_path": self.file_path,
       "file_size": self.file_size,
       "mime_type": self.mime_type,
-      "notes": self.notes,
       "submitted_at": self.submitted_at.isoformat() if self.submitted_at else None,
       "reviewed_at": self.reviewed_at.isoformat() if self.reviewed_at else None,
       "reviewed_by": self.reviewed_by,
-      "reviewer_name": self.reviewer.full_name if self.reviewer else None,
-      "review_notes": self.review_notes,
       "status": self.status,
       "submission_type": self.submission_type,
     }
+    for name in self.DEFERRED_COLUMNS:
+      if fields is None or name in fields:
+        data[name] = getattr(self, name)
+    # Related names only when wanted: each one is a lookup unless eager-loaded
+    if fields is None or "student_name" in fields:
+      data["student_name"] = self.student.full_name if self.student else None
+    if fields is None or "project_name" in fields:
+      data["project_name"] = self.project.name if self.project else None
+    if fields is None or "reviewer_name" in fields:
+      data["reviewer_name"] = self.reviewer.full_name if self.reviewer else None
+    return data if fields is None else fields.filter(data)
 
 
 class Notification(db.Model):
@@ -283,6 +325,11 @@ class Notification(db.Model):
   related_type = db.Column(db.String(50))  # 'submission', 'project', etc.
   related_id = db.Column(db.Integer)  # ID of related entity
 
+  __table_args__ = (
+    db.Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+    db.Index("ix_notifications_user_created", "user_id", "created_at"),
+  )
+
   user = db.relationship("User", backref="notifications")
 
   def to_dict(self):
@@ -298,3 +345,131 @@ class Notification(db.Model):
       "related_id": self.related_id,
     }
 
+
+
+class SubmissionTestResult(db.Model):
+  __tablename__ = "submission_test_results"
+
+  id = db.Column(db.Integer, primary_key=True)
+  submission_id = db.Column(db.Integer, db.ForeignKey("project_submissions.id"), nullable=False, index=True)
+  test_name = db.Column(db.String(200), nullable=False)
+  passed = db.Column(db.Boolean, default=False)
+  returncode = db.Column(db.Integer)
+  timed_out = db.Column(db.Boolean, default=False)
+  stdout = db.Column(db.Text)
+  stderr = db.Column(db.Text)
+  expected_stdout = db.Column(db.Text)
+  duration_ms = db.Column(db.Integer)
+  graded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+  submission = db.relationship(
+    "ProjectSubmission",
+    backref=db.backref("test_results", lazy=True, cascade="all, delete-orphan"),
+  )
+
+  def to_dict(self):
+    return {
+      "id": self.id,
+      "submission_id": self.submission_id,
+      "test_name": self.test_name,
+      "passed": self.passed,
+      "returncode": self.returncode,
+      "timed_out": self.timed_out,
+      "stdout": self.stdout,
+      "stderr": self.stderr,
+      "expected_stdout": self.expected_stdout,
+      "duration_ms": self.duration_ms,
+      "graded_at": self.graded_at.isoformat() if self.graded_at else None,
+    }
+
+
+class IndexedFile(db.Model):
+  """Last seen state of a file in a watched directory, so rescans only process differences."""
+  __tablename__ = "indexed_files"
+
+  id = db.Column(db.Integer, primary_key=True)
+  scope = db.Column(db.String(50), nullable=False)  # e.g. 'books'
+  name = db.Column(db.String(500), nullable=False)
+  mtime_ns = db.Column(db.BigInteger, nullable=False)
+  size = db.Column(db.BigInteger, nullable=False)
+  content_hash = db.Column(db.String(64))  # sha256 of the file contents
+  thumbnail = db.Column(db.String(100))  # file name under uploads/thumbnails, if rendered
+  resource_id = db.Column(db.Integer, db.ForeignKey("resources.id"))
+  indexed_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+  resource = db.relationship("Resource", backref=db.backref("indexed_file", uselist=False))
+
+  __table_args__ = (db.UniqueConstraint("scope", "name", name="unique_indexed_file_per_scope"),)
+
+
+class AppMeta(db.Model):
+  """Small key/value store for bookkeeping such as seed content hashes."""
+  __tablename__ = "app_meta"
+
+  key = db.Column(db.String(200), primary_key=True)
+  value = db.Column(db.Text)
+  updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class GradingJob(db.Model):
+  """Background auto-grading of one or more submissions (see grading_jobs.py)."""
+  __tablename__ = "grading_jobs"
+
+  id = db.Column(db.Integer, primary_key=True)
+  project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), index=True)
+  requested_by = db.Column(db.Integer, db.ForeignKey("users.id"))
+  status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, finished, failed
+  submission_ids = db.Column(db.Text, nullable=False)  # JSON list
+  total = db.Column(db.Integer, nullable=False, default=0)
+  graded = db.Column(db.Integer, nullable=False, default=0)
+  summaries = db.Column(db.Text)  # JSON {submission_id: summary}
+  error = db.Column(db.Text)
+  created_at = db.Column(db.DateTime, default=datetime.utcnow)
+  started_at = db.Column(db.DateTime)
+  finished_at = db.Column(db.DateTime)
+  updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+  def to_dict(self, status=None):
+    return {
+      "id": self.id,
+      "project_id": self.project_id,
+      "status": status or self.status,
+      "total": self.total,
+      "graded": self.graded,
+      "summaries": json.loads(self.summaries) if self.summaries else {},
+      "error": self.error,
+      "created_at": self.created_at.isoformat() if self.created_at else None,
+      "started_at": self.started_at.isoformat() if self.started_at else None,
+      "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+    }
+
+
+class SandboxRun(db.Model):
+  """A project run handed back for polling, so any server process can answer GET /api/runs/<id>."""
+  __tablename__ = "sandbox_runs"
+
+  id = db.Column(db.String(32), primary_key=True)
+  user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+  status = db.Column(db.String(20), nullable=False, default="queued")
+  result = db.Column(db.Text)  # JSON sandbox result once finished
+  metrics_json = db.Column(db.Text)
+  created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+  finished_at = db.Column(db.DateTime)
+
+  def metrics(self):
+    return json.loads(self.metrics_json) if self.metrics_json else {}
+
+  def result_dict(self):
+    return json.loads(self.result) if self.result else None
+
+  def to_dict(self, status=None):
+    return {"run_id": self.id, "status": status or self.status, "metrics": self.metrics()}
+
+
+class SchemaMigration(db.Model):
+  """Versions from backend/migrations that have been applied (see migrate_db.py)."""
+  __tablename__ = "schema_migrations"
+
+  version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  name = db.Column(db.String(200), nullable=False)
+  applied_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,75 @@
+"""
+Keep Project rows in step with the folders under backend/projects.
+
+A DirectoryWatcher reports added, removed and changed project folders; only
+those entries are touched: new folders are upserted as projects, removed ones
+are deactivated (their progress and submissions are kept), and caches holding
+files of changed folders are invalidated.
+"""
+import os
+
+from file_cache import project_files
+from fs_watch import DirectoryWatcher, folder_signature
+from models import db, Project
+
+
+PROJECTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "projects")
+WATCH_INTERVAL = float(os.environ.get("PROJECT_WATCH_INTERVAL", 2.0))
+
+# Callables (app, added, removed, changed) run after each sync, e.g. to drop derived caches
+listeners = []
+
+
+def register_listener(fn):
+  listeners.append(fn)
+  return fn
+
+
+def sync_projects(app, added=(), removed=(), changed=()):
+  """Apply a folder diff to the database and caches. Returns the number of rows touched."""
+  touched = 0
+  with app.app_context():
+    names = list(added) + list(removed)
+    existing = {p.name: p for p in Project.query.filter(Project.name.in_(names)).all()} if names else {}
+    for name in added:
+      project = existing.get(name)
+      if project is None:
+        db.session.add(Project(
+          name=name,
+          project_path=name,
+          description=f"Project: {name}",
+          difficulty_level="beginner",
+        ))
+        touched += 1
+        print(f"Project folder added: {name}")
+      elif not project.is_active:
+        project.is_active = True
+        touched += 1
+    for name in removed:
+      project = existing.get(name)
+      if project is not None and project.is_active:
+        project.is_active = False
+        touched += 1
+        print(f"Project folder removed: {name} (project deactivated)")
+    if touched:
+      db.session.commit()
+
+  for name in list(removed) + list(changed):
+    project_files.invalidate(os.path.join(PROJECTS_DIR, name))
+  for listener in listeners:
+    try:
+      listener(app, list(added), list(removed), list(changed))
+    except Exception as e:
+      print(f"Project sync listener {getattr(listener, '__name__', listener)} failed: {e}")
+  return touched
+
+
+def start_project_watcher(app, interval=WATCH_INTERVAL):
+  """Watch backend/projects in the background (inotify when available, polling otherwise)."""
+  watcher = DirectoryWatcher(
+    PROJECTS_DIR,
+    lambda added, removed, changed: sync_projects(app, added, removed, changed),
+    signature=folder_signature,
+    interval=interval,
+  )
+  return watcher.start()
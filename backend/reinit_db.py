@@ -4,5 +4,5 @@ from app import app, init_db
 
 if __name__ == '__main__':
     print("Reinitializing database...")
-    init_db()
+    init_db(force=True)
     print("Database reinitialization complete!")
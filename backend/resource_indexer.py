@@ -0,0 +1,162 @@
+"""
+Background indexer for the PDF library in uploads/books.
+
+The last seen (name, mtime, size) of every book is recorded in indexed_files,
+so a rescan - at startup or when the directory watcher reports a change - only
+touches the books that were added, removed or modified. GET /api/resources is
+then a plain read of active resources. Each new version of a book is hashed
+(for versioned URLs and ETags), gets a first-page thumbnail and has its text
+added to the search index.
+"""
+import os
+
+import media
+import search
+from fs_watch import DirectoryWatcher, file_signature
+from models import db, IndexedFile, Resource, User, UserRole
+
+
+BOOKS_DIR = media.BOOKS_DIR
+SCOPE = media.BOOKS_SCOPE
+WATCH_INTERVAL = float(os.environ.get("RESOURCE_WATCH_INTERVAL", 5.0))
+
+
+def is_book(name):
+  return name.lower().endswith(".pdf") and not name.startswith(".")
+
+
+def title_from_filename(filename):
+  title = filename.rsplit(".", 1)[0]  # Remove .pdf extension
+  # Clean up common filename patterns
+  return title.replace(" - libgen.li", "").replace("_", " ").strip()
+
+
+def scan_books(names=None):
+  """{name: (mtime_ns, size)} for the given book names (default: the whole directory)."""
+  if names is None:
+    try:
+      names = [n for n in os.listdir(BOOKS_DIR) if is_book(n)]
+    except FileNotFoundError:
+      names = []
+  current = {}
+  for name in names:
+    sig = file_signature(os.path.join(BOOKS_DIR, name))
+    if sig is not None and is_book(name):
+      current[name] = sig
+  return current
+
+
+def _process_version(row):
+  """Hash, thumbnail and search-index the current version of a recorded book. Caller commits."""
+  path = os.path.join(BOOKS_DIR, row.name)
+  row.content_hash = media.sha256_file(path)
+  media.content_hashes.put(path, row.mtime_ns, row.size, row.content_hash)
+  row.thumbnail = media.thumbnail_name(row.content_hash) if media.render_thumbnail(path, row.content_hash) else None
+  if row.resource_id:
+    search.index_book_text(row.resource_id, path)
+
+
+def index_books(app, names=None):
+  """
+  Bring resources in line with uploads/books. With `names`, only those entries
+  are examined (watcher events); otherwise the directory listing is diffed
+  against the recorded snapshot. Returns (added, removed, changed) names.
+  """
+  with app.app_context():
+    current = scan_books(names)
+    query = IndexedFile.query.filter_by(scope=SCOPE)
+    if names is not None:
+      query = query.filter(IndexedFile.name.in_(list(names)))
+    recorded = {row.name: row for row in query.all()}
+
+    added = [n for n in current if n not in recorded]
+    removed = [n for n in recorded if n not in current]
+    changed = [
+      n for n in current
+      if n in recorded and (recorded[n].mtime_ns, recorded[n].size) != current[n]
+    ]
+    # Books indexed before text extraction or thumbnail rendering was available
+    if names is None:
+      pending_text = search.unindexed_book_ids({row.resource_id for row in recorded.values() if row.resource_id})
+      caught_up = False
+      for row in recorded.values():
+        if row.name not in current:
+          continue
+        path = os.path.join(BOOKS_DIR, row.name)
+        if row.resource_id in pending_text:
+          search.index_book_text(row.resource_id, path)
+          caught_up = True
+        if row.thumbnail is None and row.content_hash and media.render_thumbnail(path, row.content_hash):
+          row.thumbnail = media.thumbnail_name(row.content_hash)
+          caught_up = True
+      if caught_up:
+        db.session.commit()
+
+    if not (added or removed or changed):
+      return added, removed, changed
+
+    if added:
+      creator = (
+        User.query.filter(User.role.in_([UserRole.MENTOR, UserRole.MANAGER]))
+        .order_by(User.id.asc())
+        .first()
+      )
+      paths = [f"/uploads/books/{n}" for n in added]
+      by_path = {r.content: r for r in Resource.query.filter(Resource.content.in_(paths)).all()}
+      for name in added:
+        resource_path = f"/uploads/books/{name}"
+        resource = by_path.get(resource_path)
+        if resource is None:
+          if creator is None:
+            print(f"Skipping {name}: no mentor/manager to own the resource yet")
+            continue
+          title = title_from_filename(name)
+          resource = Resource(
+            title=title,
+            content=resource_path,
+            description=f"PDF book: {title}",
+            category="Books",
+            created_by=creator.id,
+            is_active=True,
+          )
+          db.session.add(resource)
+          db.session.flush()
+          print(f"Added new resource: {title} -> {resource_path}")
+        elif not resource.is_active:
+          resource.is_active = True
+        mtime_ns, size = current[name]
+        row = IndexedFile(scope=SCOPE, name=name, mtime_ns=mtime_ns, size=size, resource_id=resource.id)
+        db.session.add(row)
+        _process_version(row)
+
+    for name in changed:
+      row = recorded[name]
+      row.mtime_ns, row.size = current[name]
+      _process_version(row)
+
+    for name in removed:
+      row = recorded[name]
+      if row.resource is not None and row.resource.is_active:
+        row.resource.is_active = False
+        print(f"Book removed, resource deactivated: {name}")
+      if row.resource_id:
+        search.remove_book_text(row.resource_id)
+      db.session.delete(row)
+
+    db.session.commit()
+    return added, removed, changed
+
+
+def start_resource_watcher(app, interval=WATCH_INTERVAL):
+  """Re-index books as files appear, change or disappear in uploads/books."""
+  watcher = DirectoryWatcher(
+    BOOKS_DIR,
+    lambda added, removed, changed: index_books(app, added + removed + changed),
+    signature=file_signature,
+    include=is_book,
+    interval=interval,
+  )
+  watcher.start(initial_snapshot=scan_books())
+  # Catch up on anything that changed between the last index and the watch being set up
+  index_books(app)
+  return watcher
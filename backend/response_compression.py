@@ -0,0 +1,211 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+gzip is always available; brotli (br) and zstd are offered when the `brotli`
+and `zstandard` packages are installed. Text-like responses (JSON, HTML, CSS,
+JS, SVG, plain text) of at least COMPRESS_MIN_SIZE bytes are compressed; files
+sent with send_file, partial content and already-encoded responses are not.
+Streamed responses are compressed chunk by chunk as they are sent.
+
+Responses with a strong ETag are the cacheable ones: their compressed bytes are
+kept in an LRU keyed by (ETag, encoding), so the same representation is only
+compressed once. Compressed responses get a weak ETag (the bytes now differ
+from the identity encoding) and Vary: Accept-Encoding.
+"""
+import collections
+import gzip
+import os
+import threading
+import zlib
+
+from flask import request
+
+try:
+  import brotli
+except ImportError:  # optional
+  brotli = None
+
+try:
+  import zstandard
+except ImportError:  # optional
+  zstandard = None
+
+
+COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 500))
+COMPRESS_LEVEL = int(os.environ.get("COMPRESS_LEVEL", 6))
+COMPRESS_CACHE_BYTES = int(os.environ.get("COMPRESS_CACHE_MB", 32)) * 1024 * 1024
+
+COMPRESSIBLE_TYPES = {
+  "application/json",
+  "application/javascript",
+  "application/xml",
+  "image/svg+xml",
+}
+
+
+def available_encodings():
+  """Supported encodings, most preferred first."""
+  encodings = []
+  if zstandard is not None:
+    encodings.append("zstd")
+  if brotli is not None:
+    encodings.append("br")
+  encodings.append("gzip")
+  return encodings
+
+
+def compress(data, encoding, level=COMPRESS_LEVEL):
+  if encoding == "gzip":
+    return gzip.compress(data, compresslevel=level, mtime=0)
+  if encoding == "br":
+    return brotli.compress(data, quality=min(level, 11))
+  if encoding == "zstd":
+    return zstandard.ZstdCompressor(level=level).compress(data)
+  raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+def compressor(encoding, level=COMPRESS_LEVEL):
+  """(compress(chunk), flush(), finish()) functions for streaming `encoding`."""
+  if encoding == "gzip":
+    obj = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    return obj.compress, lambda: obj.flush(zlib.Z_SYNC_FLUSH), obj.flush
+  if encoding == "br":
+    obj = brotli.Compressor(quality=min(level, 11))
+    return obj.process, obj.flush, obj.finish
+  if encoding == "zstd":
+    obj = zstandard.ZstdCompressor(level=level).compressobj()
+    return (
+      obj.compress,
+      lambda: obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+      lambda: obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH),
+    )
+  raise ValueError(f"Unsupported encoding {encoding!r}")
+
+
+def negotiate(accept_encodings):
+  """The best supported encoding in `accept_encodings` (request.accept_encodings), or None."""
+  best, best_q = None, 0
+  for encoding in available_encodings():
+    q = accept_encodings[encoding]
+    if q > best_q:
+      best, best_q = encoding, q
+  return best
+
+
+def is_compressible(mimetype):
+  if not mimetype:
+    return False
+  return mimetype.startswith("text/") or mimetype in COMPRESSIBLE_TYPES or mimetype.endswith("+json")
+
+
+class CompressedCache:
+  """LRU of compressed bodies keyed by (etag, encoding), bounded by total bytes."""
+
+  def __init__(self, max_bytes=COMPRESS_CACHE_BYTES):
+    self.max_bytes = max_bytes
+    self._entries = collections.OrderedDict()
+    self._bytes = 0
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  def get(self, key):
+    with self._lock:
+      data = self._entries.get(key)
+      if data is None:
+        self.misses += 1
+        return None
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return data
+
+  def put(self, key, data):
+    if len(data) > self.max_bytes:
+      return
+    with self._lock:
+      old = self._entries.pop(key, None)
+      if old is not None:
+        self._bytes -= len(old)
+      self._entries[key] = data
+      self._bytes += len(data)
+      while self._bytes > self.max_bytes:
+        _, evicted = self._entries.popitem(last=False)
+        self._bytes -= len(evicted)
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+      self._bytes = 0
+
+  def stats(self):
+    with self._lock:
+      return {
+        "entries": len(self._entries),
+        "bytes": self._bytes,
+        "max_bytes": self.max_bytes,
+        "hits": self.hits,
+        "misses": self.misses,
+      }
+
+
+compressed_bodies = CompressedCache()
+
+
+def _stream(iterable, encoding):
+  compress_chunk, flush, finish = compressor(encoding)
+  try:
+    for chunk in iterable:
+      out = compress_chunk(chunk)
+      # Flush per chunk so clients see data as soon as the app yields it
+      out += flush()
+      if out:
+        yield out
+    yield finish()
+  finally:
+    if hasattr(iterable, "close"):
+      iterable.close()
+
+
+def compress_response(response):
+  """after_request hook: compress `response` in place when the client and content allow it."""
+  if (
+    response.status_code < 200
+    or response.status_code in (204, 206, 304)
+    or response.direct_passthrough
+    or "Content-Encoding" in response.headers
+    or not is_compressible(response.mimetype)
+    or request.method == "HEAD"
+  ):
+    return response
+  response.vary.add("Accept-Encoding")
+  encoding = negotiate(request.accept_encodings)
+  if encoding is None:
+    return response
+
+  if response.is_streamed:
+    response.response = _stream(response.response, encoding)
+    response.headers.pop("Content-Length", None)
+  else:
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+      return response
+    etag, weak = response.get_etag()
+    key = (etag, encoding) if etag and not weak else None
+    body = compressed_bodies.get(key) if key else None
+    if body is None:
+      body = compress(data, encoding)
+      if key:
+        compressed_bodies.put(key, body)
+    if len(body) >= len(data):
+      return response
+    response.set_data(body)
+    if etag:
+      response.set_etag(etag, weak=True)
+
+  response.headers["Content-Encoding"] = encoding
+  return response
+
+
+def init_app(app):
+  if os.environ.get("COMPRESS_RESPONSES", "1") != "0":
+    app.after_request(compress_response)
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from models import (
   db,
   User,
@@ -11,6 +11,8 @@ from models import (
   Resource,
   ProjectSubmission,
   Notification,
+  SubmissionTestResult,
+  GradingJob,
 )
 from auth import (
   generate_token,
@@ -21,14 +23,49 @@ from auth import (
   get_current_user,
 )
 from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+from urllib.parse import quote
+import io
+import mimetypes
 import os
 import secrets
 from werkzeug.utils import secure_filename
 from flask import send_file
+import batch
+import export_bundles
+import fieldsets
+import grader
+import grading_jobs
+from json_provider import stream_list
+from file_cache import project_files
+import run_cache
+import run_pool
+import run_store
+import sandbox
+import sandbox_slots
+import search
+import seed
+import step_bundles
+from upsert import get_or_create_progress
 
 
 api = Blueprint("api", __name__)
 
+# Files in a project folder that are for the backend only (grading fixtures, curriculum with answers)
+HIDDEN_PROJECT_FILES = {grader.FIXTURE_FILENAME, seed.CURRICULUM_FILENAME}
+
+
+def _project_dir(project):
+  return os.path.join(os.path.dirname(__file__), "projects", project.project_path)
+
+
+def _file_mime(name, cached):
+  guessed = mimetypes.guess_type(name)[0]
+  if guessed:
+    return guessed
+  return "text/plain" if cached.is_text else "application/octet-stream"
+
 @api.route("/students", methods=["GET"])
 @require_mentor
 def list_students(user):
@@ -39,7 +76,7 @@ def list_students(user):
       .order_by(User.full_name.asc())
       .all()
     )
-    return jsonify({"success": True, "students": [s.to_dict() for s in students]}), 200
+    return stream_list("students", students, User.to_dict)
   except Exception as e:
     return jsonify({"success": False, "error": str(e)}), 500
 
@@ -171,61 +208,78 @@ def me(user):
   return jsonify({"success": True, "user": user.to_dict()}), 200
 
 
+def _apply_progress(prog, completed_steps, total_steps):
+  """Bring a ProjectProgress row in line with the student's step completions."""
+  calculated_percentage = int((completed_steps / total_steps) * 100) if total_steps > 0 else 0
+  if prog.progress_percentage == calculated_percentage:
+    return
+  prog.progress_percentage = calculated_percentage
+  if calculated_percentage == 100:
+    prog.status = "completed"
+    if not prog.completed_at:
+      prog.completed_at = datetime.utcnow()
+  elif calculated_percentage > 0:
+    prog.status = "in_progress"
+    if not prog.started_at:
+      prog.started_at = datetime.utcnow()
+  else:
+    prog.status = "not_started"
+
+
+def _project_list(user, fields):
+  """
+  Active projects as dicts. For students each one carries its progress,
+  recalculated from step completions (a released step with at least one
+  answer is complete). The query count does not depend on the number of
+  projects or steps.
+  """
+  projects = (
+    Project.query.filter_by(is_active=True)
+    .options(*fieldsets.deferred(Project, fields))
+    .all()
+  )
+  out = []
+  for p in projects:
+    d = p.to_dict(fields=fields)
+    # Static curriculum (steps and questions); the API only adds per-student state
+    if "bundle_url" in fields:
+      d["bundle_url"] = export_bundles.bundle_url(p.id)
+    out.append(d)
+  if user.role != UserRole.STUDENT or "progress" not in fields or not projects:
+    return out
+
+  progress = {pr.project_id: pr for pr in ProjectProgress.query.filter_by(student_id=user.id).all()}
+  total_steps = dict(
+    db.session.query(ProjectStep.project_id, func.count(ProjectStep.id))
+    .filter(ProjectStep.is_released.is_(True))
+    .group_by(ProjectStep.project_id)
+    .all()
+  )
+  completed_steps = dict(
+    db.session.query(ProjectStep.project_id, func.count(func.distinct(ProjectStep.id)))
+    .join(ProjectStepQuestion, ProjectStepQuestion.step_id == ProjectStep.id)
+    .join(StudentStepAnswer, StudentStepAnswer.question_id == ProjectStepQuestion.id)
+    .filter(StudentStepAnswer.student_id == user.id, ProjectStep.is_released.is_(True))
+    .group_by(ProjectStep.project_id)
+    .all()
+  )
+  for p, d in zip(projects, out):
+    prog = progress.get(p.id) or get_or_create_progress(user.id, p.id)
+    _apply_progress(prog, completed_steps.get(p.id, 0), total_steps.get(p.id, 0))
+    progress[p.id] = prog
+  if db.session.new or db.session.dirty:
+    db.session.flush()
+  for p, d in zip(projects, out):
+    d["progress"] = progress[p.id].to_dict()
+  db.session.commit()
+  return out
+
+
 @api.route("/projects", methods=["GET"])
 @require_auth
 def list_projects(user):
   try:
-    projects = Project.query.filter_by(is_active=True).all()
-    out = []
-    for p in projects:
-      d = p.to_dict()
-      if user.role == UserRole.STUDENT:
-        prog = ProjectProgress.query.filter_by(
-          student_id=user.id, project_id=p.id
-        ).first()
-        
-        if not prog:
-          prog = ProjectProgress(student_id=user.id, project_id=p.id)
-          db.session.add(prog)
-          db.session.commit()
-        
-        # Recalculate progress based on actual step completions (same logic as get_project_progress)
-        steps = ProjectStep.query.filter_by(
-          project_id=p.id, is_released=True
-        ).order_by(ProjectStep.order_index.asc()).all()
-        
-        completed_steps = 0
-        for step in steps:
-          has_answers = StudentStepAnswer.query.join(
-            ProjectStepQuestion
-          ).filter(
-            StudentStepAnswer.student_id == user.id,
-            ProjectStepQuestion.step_id == step.id
-          ).first() is not None
-          
-          if has_answers:
-            completed_steps += 1
-        
-        total_steps = len(steps)
-        calculated_percentage = int((completed_steps / total_steps) * 100) if total_steps > 0 else 0
-        
-        # Update progress if calculation differs
-        if prog.progress_percentage != calculated_percentage:
-          prog.progress_percentage = calculated_percentage
-          if calculated_percentage == 100:
-            prog.status = "completed"
-            if not prog.completed_at:
-              prog.completed_at = datetime.utcnow()
-          elif calculated_percentage > 0:
-            prog.status = "in_progress"
-            if not prog.started_at:
-              prog.started_at = datetime.utcnow()
-          else:
-            prog.status = "not_started"
-          db.session.commit()
-        
-        d["progress"] = prog.to_dict()
-      out.append(d)
+    out = _project_list(user, fieldsets.from_request())
     return jsonify({"success": True, "projects": out}), 200
   except Exception as e:
     db.session.rollback()
@@ -236,48 +290,96 @@ def list_projects(user):
 @require_auth
 def get_project(user, project_id):
   try:
-    project = Project.query.get_or_404(project_id)
-    d = project.to_dict()
-    if user.role == UserRole.STUDENT:
+    fields = fieldsets.from_request()
+    project = (
+      Project.query.options(*fieldsets.deferred(Project, fields))
+      .filter_by(id=project_id)
+      .first_or_404()
+    )
+    d = project.to_dict(fields=fields)
+    if "bundle_url" in fields:
+      d["bundle_url"] = export_bundles.bundle_url(project.id)
+    if user.role == UserRole.STUDENT and "progress" in fields:
       prog = ProjectProgress.query.filter_by(
         student_id=user.id, project_id=project_id
       ).first()
       d["progress"] = prog.to_dict() if prog else None
 
-    if project.project_path:
-      project_dir = os.path.join(
-        os.path.dirname(__file__), "projects", project.project_path
-      )
+    if project.project_path and ("files" in fields or "files_from_cache" in fields):
+      project_dir = _project_dir(project)
       files = []
       if os.path.exists(project_dir):
-        for name in os.listdir(project_dir):
-          path = os.path.join(project_dir, name)
-          if os.path.isfile(path):
+        with os.scandir(project_dir) as entries:
+          for entry in entries:
+            if entry.name in HIDDEN_PROJECT_FILES or not entry.is_file():
+              continue
             try:
-              with open(path, "r", encoding="utf-8") as f:
-                content = f.read()
-            except Exception:
-              content = None
-            files.append({"name": name, "content": content})
+              cached, from_cache = project_files.describe(entry.path, entry.stat())
+            except OSError:
+              continue
+            files.append({
+              "name": entry.name,
+              "size": cached.size,
+              "hash": cached.sha256,
+              "mime": _file_mime(entry.name, cached),
+              "url": f"/api/projects/{project.id}/files/{quote(entry.name)}",
+              "cached": from_cache,
+            })
+      files.sort(key=lambda f: f["name"])
+      # Manifest only: clients fetch contents they open from the files endpoint
       d["files"] = files
+      d["files_from_cache"] = [f["name"] for f in files if f["cached"]]
 
     return jsonify({"success": True, "project": d}), 200
   except Exception as e:
     return jsonify({"success": False, "error": str(e)}), 500
 
 
+@api.route("/projects/<int:project_id>/files/<path:filename>", methods=["GET"])
+@require_auth
+def get_project_file(user, project_id, filename):
+  """Serve one project file with a content-hash ETag and byte-range support"""
+  try:
+    project = Project.query.get_or_404(project_id)
+    if not project.project_path or filename in HIDDEN_PROJECT_FILES or "/" in filename or filename.startswith("."):
+      return jsonify({"success": False, "error": "File not found"}), 404
+    path = os.path.join(_project_dir(project), filename)
+    if not os.path.isfile(path):
+      return jsonify({"success": False, "error": "File not found"}), 404
+
+    cached, _ = project_files.get(path)
+    response = send_file(
+      io.BytesIO(cached.data),
+      mimetype=_file_mime(filename, cached),
+      download_name=filename,
+      conditional=True,
+      etag=cached.sha256,
+      last_modified=cached.mtime_ns / 1e9,
+      max_age=0,
+    )
+    response.headers["Accept-Ranges"] = "bytes"
+    response.cache_control.private = True
+    response.cache_control.no_cache = True  # revalidate with If-None-Match; 304s are cheap
+    return response
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+
 @api.route("/projects/<int:project_id>/steps", methods=["GET"])
 @require_student
 def list_steps(user, project_id):
   try:
-    steps = (
-      ProjectStep.query.filter_by(project_id=project_id, is_released=True)
-      .order_by(ProjectStep.order_index.asc())
-      .all()
-    )
-    return jsonify(
-      {"success": True, "steps": [s.to_dict(include_questions=True) for s in steps]}
-    ), 200
+    # Same payload for every student: cached JSON bytes, rebuilt when steps change
+    fields = fieldsets.from_request(step_bundles.DEFAULT_EXCLUDE)
+    bundle = step_bundles.get_bundle(project_id, fields)
+    if request.if_none_match.contains_weak(bundle.etag):
+      response = current_app.response_class(status=304)
+    else:
+      response = current_app.response_class(bundle.body, mimetype=current_app.json.mimetype)
+    response.set_etag(bundle.etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
   except Exception as e:
     return jsonify({"success": False, "error": str(e)}), 500
 
@@ -304,12 +406,7 @@ def update_progress(user):
       return jsonify({"success": False, "error": "project_id is required"}), 400
 
     project = Project.query.get_or_404(project_id)
-    prog = ProjectProgress.query.filter_by(
-      student_id=user.id, project_id=project.id
-    ).first()
-    if not prog:
-      prog = ProjectProgress(student_id=user.id, project_id=project.id)
-      db.session.add(prog)
+    prog = get_or_create_progress(user.id, project.id)
 
     # Calculate progress based on actual step completions
     total_steps = ProjectStep.query.filter_by(
@@ -382,14 +479,8 @@ def get_project_progress(user, project_id):
     project = Project.query.get_or_404(project_id)
     
     # Get overall progress
-    prog = ProjectProgress.query.filter_by(
-      student_id=user.id, project_id=project_id
-    ).first()
-    
-    if not prog:
-      prog = ProjectProgress(student_id=user.id, project_id=project_id)
-      db.session.add(prog)
-      db.session.commit()
+    prog = get_or_create_progress(user.id, project_id)
+    db.session.commit()
     
     # Get all steps and their completion status
     steps = ProjectStep.query.filter_by(
@@ -573,59 +664,193 @@ def answer_step(user, step_id):
     return jsonify({"success": False, "error": str(e)}), 500
 
 
+def _leaderboard(user):
+  """Students ranked by total points, with the current student's rank and points."""
+  rows = (
+    db.session.query(
+      User.id,
+      User.username,
+      User.full_name,
+      func.coalesce(func.sum(StudentStepAnswer.points_awarded), 0).label("pts"),
+    )
+    .filter(User.role == UserRole.STUDENT, User.is_active.is_(True))
+    .outerjoin(StudentStepAnswer, User.id == StudentStepAnswer.student_id)
+    .group_by(User.id, User.username, User.full_name)
+    .order_by(func.coalesce(func.sum(StudentStepAnswer.points_awarded), 0).desc())
+    .all()
+  )
+  lb = []
+  rank = 1
+  current_rank = None
+  current_points = None
+  for r in rows:
+    entry = {
+      "rank": rank,
+      "student_id": r.id,
+      "username": r.username,
+      "full_name": r.full_name,
+      "total_points": int(r.pts) if r.pts is not None else 0,
+    }
+    lb.append(entry)
+    if user.role == UserRole.STUDENT and r.id == user.id:
+      current_rank = rank
+      current_points = entry["total_points"]
+    rank += 1
+  return {
+    "leaderboard": lb,
+    "current_user_rank": current_rank,
+    "current_user_points": current_points,
+  }
+
+
 @api.route("/leaderboard", methods=["GET"])
 @require_auth
 def leaderboard(user):
-  from sqlalchemy import func
+  try:
+    return jsonify(dict(_leaderboard(user), success=True)), 200
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
 
+
+@api.route("/dashboard/student", methods=["GET"])
+@require_student
+def student_dashboard(user):
+  """
+  Everything the student dashboard needs for its first paint in one response:
+  projects with progress, leaderboard with the student's rank, the student's
+  submissions and unread notification count. About a dozen queries in total,
+  whatever the number of projects, steps or submissions.
+  """
   try:
-    rows = (
-      db.session.query(
-        User.id,
-        User.username,
-        User.full_name,
-        func.coalesce(func.sum(StudentStepAnswer.points_awarded), 0).label("pts"),
-      )
-      .filter(User.role == UserRole.STUDENT, User.is_active.is_(True))
-      .outerjoin(StudentStepAnswer, User.id == StudentStepAnswer.student_id)
-      .group_by(User.id, User.username, User.full_name)
-      .order_by(func.coalesce(func.sum(StudentStepAnswer.points_awarded), 0).desc())
+    projects = _project_list(user, fieldsets.from_request())
+    submission_fields = fieldsets.FieldSet()
+    submissions = (
+      _submission_query(submission_fields)
+      .filter_by(student_id=user.id)
+      .order_by(ProjectSubmission.submitted_at.desc())
       .all()
     )
-    lb = []
-    rank = 1
-    current_rank = None
-    current_points = None
-    for r in rows:
-      entry = {
-        "rank": rank,
-        "student_id": r.id,
-        "username": r.username,
-        "full_name": r.full_name,
-        "total_points": int(r.pts) if r.pts is not None else 0,
-      }
-      lb.append(entry)
-      if user.role == UserRole.STUDENT and r.id == user.id:
-        current_rank = rank
-        current_points = entry["total_points"]
-      rank += 1
-    return jsonify(
-      {
-        "success": True,
-        "leaderboard": lb,
-        "current_user_rank": current_rank,
-        "current_user_points": current_points,
-      }
-    ), 200
+    unread = Notification.query.filter_by(user_id=user.id, is_read=False).count()
+    return jsonify({
+      "success": True,
+      "user": user.to_dict(),
+      "projects": projects,
+      "progress": [p["progress"] for p in projects if "progress" in p],
+      **_leaderboard(user),
+      "submissions": [s.to_dict(fields=submission_fields) for s in submissions],
+      "unread_notifications": unread,
+    }), 200
   except Exception as e:
+    db.session.rollback()
     return jsonify({"success": False, "error": str(e)}), 500
 
 
+@api.route("/batch", methods=["POST"])
+@require_auth
+def run_batch(user):
+  """
+  Run several API calls in one request, authenticated once. Each entry of
+  `requests` is {"id", "method", "path", "body"?, "headers"?}; the response
+  lists {"id", "status", "headers", "body"} in the same order. Consecutive
+  GETs run in parallel; writes run in order. See batch.py.
+  """
+  try:
+    items = batch.parse(request.get_json(silent=True))
+  except batch.BatchError as e:
+    return jsonify({"success": False, "error": str(e)}), 400
+  try:
+    return jsonify({"success": True, "responses": batch.run(items, user)}), 200
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({"success": False, "error": str(e)}), 500
+
+
+MAX_STDIN_BYTES = 64 * 1024
+MAX_CODE_BYTES = 64 * 1024
+
+
+def _run_response(result, code=None, run=None, cached=False):
+  """Shape a sandbox result like the original synchronous run endpoint."""
+  body = {"cached": cached}
+  if run is not None:
+    body.update({"run_id": run.id, "status": run.status, "metrics": dict(run.metrics(), cpu_ms=result.get("cpu_ms"))})
+  if code is not None:
+    body["code"] = code
+  body.update({
+    "stderr": result["stderr"],
+    "returncode": result["returncode"],
+    "timed_out": result["timed_out"],
+    "duration_ms": result["duration_ms"],
+  })
+  if result["timed_out"]:
+    body.update({"success": False, "error": "Code execution timed out", "output": result["stdout"]})
+    return jsonify(body), 400
+  if result["returncode"] != 0:
+    body.update({"success": False, "error": result["stderr"], "output": result["stdout"]})
+    return jsonify(body), 400
+  body.update({"success": True, "output": result["stdout"]})
+  return jsonify(body), 200
+
+
+def _check_student_code(code):
+  """Compile student code in-process so syntax errors never reach the sandbox. Returns an error body or None."""
+  if not isinstance(code, str) or not code.strip():
+    return {"success": False, "error": "code must be a non-empty string"}
+  if len(code.encode("utf-8")) > MAX_CODE_BYTES:
+    return {"success": False, "error": f"code must be at most {MAX_CODE_BYTES // 1024} KB"}
+  try:
+    compile(code, "<student>", "exec")
+  except SyntaxError as e:
+    return {
+      "success": False,
+      "stage": "compile",
+      "error": f"{type(e).__name__}: {e.msg}" + (f" (line {e.lineno})" if e.lineno else ""),
+      "line": e.lineno,
+      "offset": e.offset,
+      "text": e.text,
+    }
+  except (ValueError, RecursionError, MemoryError) as e:
+    return {"success": False, "stage": "compile", "error": f"{type(e).__name__}: {e}"}
+  return None
+
+
+def _parse_run_input(data):
+  """Validate the optional stdin/seed fields of a run request. Returns (stdin, seed, error)."""
+  stdin = data.get("stdin") or ""
+  if not isinstance(stdin, str):
+    return None, None, "stdin must be a string"
+  if len(stdin.encode("utf-8")) > MAX_STDIN_BYTES:
+    return None, None, f"stdin must be at most {MAX_STDIN_BYTES // 1024} KB"
+  if stdin and not stdin.endswith("\n"):
+    stdin += "\n"
+  seed = data.get("seed")
+  if seed is not None:
+    try:
+      seed = int(seed)
+    except (TypeError, ValueError):
+      return None, None, "seed must be an integer"
+  return stdin, seed, None
+
+
 @api.route("/projects/<int:project_id>/run", methods=["POST"])
 @require_student
 def run_project(user, project_id):
+  """
+  Run the project's index.py, or the student's own attempt, in the sandbox pool.
+
+  Body (optional JSON):
+    - code: the student's program; when given it is run instead of index.py
+    - stdin: text fed to the program's input() calls
+    - seed: integer seed for `random`, making games repeatable (and cacheable)
+  """
   try:
-    import subprocess
+    data = request.get_json(silent=True) or {}
+    stdin, seed, error = _parse_run_input(data)
+    if error:
+      return jsonify({"success": False, "error": error}), 400
+
+    if "code" in data:
+      return _run_student_code(user, project_id, data["code"], stdin, seed)
 
     project = Project.query.get_or_404(project_id)
     if not project.project_path:
@@ -636,28 +861,110 @@ def run_project(user, project_id):
     pyfile = os.path.join(project_dir, "index.py")
     if not os.path.exists(pyfile):
       return jsonify({"success": False, "error": "Python file not found"}), 404
-    with open(pyfile, "r", encoding="utf-8") as f:
-      code = f.read()
+    code = project_files.get(pyfile)[0].text
+
+    cache_key = None
+    if run_cache.is_cacheable(code, seed):
+      cache_key = run_cache.make_key(run_cache.run_cache.file_digest(pyfile), stdin, seed)
+      cached = run_cache.run_cache.get(cache_key)
+      if cached is not None:
+        return _run_response(cached, code, cached=True)
+
+    pool = run_pool.get_pool()
     try:
-      result = subprocess.run(
-        ["python3", pyfile],
-        capture_output=True,
-        text=True,
-        timeout=10,
-        cwd=project_dir,
+      run, queued = pool.submit(
+        {"path": os.path.abspath(pyfile), "stdin": stdin, "seed": seed}, user_id=user.id
       )
-      if result.returncode != 0:
-        return (
-          jsonify(
-            {"success": False, "error": result.stderr, "output": result.stdout}
-          ),
-          400,
-        )
-      return jsonify(
-        {"success": True, "output": result.stdout, "code": code}
-      ), 200
-    except subprocess.TimeoutExpired:
-      return jsonify({"success": False, "error": "Code execution timed out"}), 400
+    except run_pool.PoolBusy as e:
+      return jsonify({"success": False, "status": "busy", "error": str(e)}), 503
+    run.cache_key = cache_key
+    if queued:
+      # Every worker is busy: hand back a run id to poll instead of blocking
+      return _poll_response(run, code=code)
+
+    if not run.wait(timeout=sandbox.DEFAULT_LIMITS["timeout"] + 5):
+      return _poll_response(run, code=code)
+    if cache_key is not None:
+      run_cache.run_cache.put(cache_key, run.result)
+    return _run_response(run.result, code, run=run)
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+
+def _poll_response(run, **extra):
+  """202 with a run id to poll; the run is stored so whichever server process gets the poll can answer."""
+  run_store.track(current_app._get_current_object(), run)
+  return jsonify({"success": False, "status": run.status, "run_id": run.id, **extra}), 202
+
+
+def _run_student_code(user, project_id, code, stdin, seed):
+  Project.query.get_or_404(project_id)
+  error_body = _check_student_code(code)
+  if error_body:
+    return jsonify(error_body), 400
+
+  cache_key = None
+  if run_cache.is_cacheable(code, seed):
+    cache_key = run_cache.make_key(run_cache.sha256_text(code), stdin, seed)
+    cached = run_cache.run_cache.get(cache_key)
+    if cached is not None:
+      return _run_response(cached, cached=True)
+
+  try:
+    run, queued = run_pool.get_pool().submit({"code": code, "stdin": stdin, "seed": seed}, user_id=user.id)
+  except run_pool.PoolBusy as e:
+    return jsonify({"success": False, "status": "busy", "error": str(e)}), 503
+  run.cache_key = cache_key
+  if queued:
+    return _poll_response(run)
+  if not run.wait(timeout=sandbox.DEFAULT_LIMITS["timeout"] + 5):
+    return _poll_response(run)
+  if cache_key is not None:
+    run_cache.run_cache.put(cache_key, run.result)
+  return _run_response(run.result, run=run)
+
+
+@api.route("/runs/<run_id>", methods=["GET"])
+@require_student
+def get_run(user, run_id):
+  """Poll a queued project run"""
+  try:
+    run = run_pool.find_run(run_id)
+    if run is None:
+      # Accepted by another server process
+      stored = run_store.get(run_id)
+      if not stored or stored.user_id != user.id:
+        return jsonify({"success": False, "error": "Run not found"}), 404
+      status = run_store.status(stored)
+      if status == "interrupted":
+        return jsonify(dict(stored.to_dict(status=status), success=False,
+                            error="The run was interrupted, please run it again")), 200
+      if status != "finished":
+        return jsonify(dict(stored.to_dict(), success=False)), 202
+      return _run_response(stored.result_dict(), run=stored)
+    if run.user_id != user.id:
+      return jsonify({"success": False, "error": "Run not found"}), 404
+    if run.status != "finished":
+      return jsonify(dict(run.to_dict(), success=False)), 202
+    if getattr(run, "cache_key", None) is not None:
+      run_cache.run_cache.put(run.cache_key, run.result)
+    return _run_response(run.result, run=run)
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+
+@api.route("/runs/metrics", methods=["GET"])
+@require_mentor
+def run_metrics(user):
+  """Sandbox pool utilisation, queue wait and execution time"""
+  try:
+    return jsonify({
+      "success": True,
+      "metrics": run_pool.get_pool().stats(),
+      "sandbox_slots": sandbox_slots.slots.stats(),
+      "cache": run_cache.run_cache.stats(),
+      "file_cache": project_files.stats(),
+    }), 200
   except Exception as e:
     return jsonify({"success": False, "error": str(e)}), 500
 
@@ -666,62 +973,14 @@ def run_project(user, project_id):
 @require_auth
 def list_resources(user):
   try:
-    # Scan uploads/books directory for PDF files and auto-create resources
-    # routes.py is in backend/, so dirname(__file__) gives us backend/ directory
-    # In container: /app, so books_dir will be /app/uploads/books
-    backend_dir = os.path.dirname(__file__)
-    books_dir = os.path.join(backend_dir, "uploads", "books")
-    if os.path.exists(books_dir):
-      # Get a default creator (first mentor/manager, or current user)
-      default_creator = (
-        User.query.filter(User.role.in_([UserRole.MENTOR, UserRole.MANAGER]))
-        .first()
-      ) or user
-      
-      # Get all existing resource file paths
-      existing_paths = {
-        r.content for r in Resource.query.all() 
-        if r.content and r.content.startswith("/uploads/books/")
-      }
-      
-      # Scan for PDF files
-      for filename in os.listdir(books_dir):
-        if filename.lower().endswith('.pdf'):
-          file_path = os.path.join(books_dir, filename)
-          if os.path.isfile(file_path):
-            # Check if resource already exists for this file
-            resource_path = f"/uploads/books/{filename}"
-            if resource_path not in existing_paths:
-              # Extract title from filename (remove extension and clean up)
-              title = filename.rsplit('.', 1)[0]  # Remove .pdf extension
-              # Clean up common filename patterns
-              title = title.replace(' - libgen.li', '').replace('_', ' ').strip()
-              
-              # Create new resource entry
-              new_resource = Resource(
-                title=title,
-                content=resource_path,
-                description=f"PDF book: {title}",
-                category="Books",
-                created_by=default_creator.id,
-                is_active=True
-              )
-              db.session.add(new_resource)
-              print(f"Added new resource: {title} -> {resource_path}")
-      
-      # Commit any new resources
-      db.session.commit()
-      print(f"Scanned {books_dir}, found PDFs and committed resources")
-    
-    # Return all active resources
+    # The PDF library is indexed in the background (resource_indexer)
     resources = (
       Resource.query.filter_by(is_active=True)
+      .options(selectinload(Resource.indexed_file))
       .order_by(Resource.created_at.desc())
       .all()
     )
-    return jsonify(
-      {"success": True, "resources": [r.to_dict() for r in resources]}
-    ), 200
+    return stream_list("resources", resources, Resource.to_dict)
   except Exception as e:
     db.session.rollback()
     import traceback
@@ -764,9 +1023,48 @@ def get_resource(user, resource_id):
     return jsonify({"success": False, "error": str(e)}), 500
 
 
+# Search
+@api.route("/search", methods=["GET"])
+@require_auth
+def search_content(user):
+  """Ranked full-text search: ?q=...&types=resources,projects,steps,questions,books&limit=20"""
+  try:
+    q = (request.args.get("q") or "").strip()
+    if not q:
+      return jsonify({"success": False, "error": "q is required"}), 400
+    if not search.is_supported():
+      return jsonify({"success": False, "error": "Search is not available on this database"}), 503
+    types = request.args.get("types")
+    types = [t.strip() for t in types.split(",") if t.strip()] if types else list(search.SEARCH_TYPES)
+    unknown = [t for t in types if t not in search.SEARCH_TYPES]
+    if unknown:
+      return jsonify({"success": False, "error": f"Unknown types: {', '.join(unknown)}"}), 400
+    limit = max(1, min(request.args.get("limit", type=int, default=20), 100))
+
+    results, took_ms = search.search(q, types, limit, include_hidden=user.role != UserRole.STUDENT)
+    if results is None:
+      return jsonify({"success": False, "error": "Query has no searchable terms"}), 400
+    return jsonify({"success": True, "query": q, "results": results, "took_ms": took_ms}), 200
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+
 # Project Submission Endpoints
 ALLOWED_EXTENSIONS = {'py', 'txt', 'pdf', 'doc', 'docx', 'zip', 'rar', '7z', 'jpg', 'jpeg', 'png', 'gif'}
 
+def _submission_query(fields):
+  """Submissions with unrequested text columns deferred and requested names eager-loaded."""
+  query = ProjectSubmission.query.options(*fieldsets.deferred(ProjectSubmission, fields))
+  for key, relationship in (
+    ("student_name", ProjectSubmission.student),
+    ("project_name", ProjectSubmission.project),
+    ("reviewer_name", ProjectSubmission.reviewer),
+  ):
+    if key in fields:
+      query = query.options(selectinload(relationship))
+  return query
+
+
 def allowed_file(filename):
   return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -819,11 +1117,24 @@ def submit_project(user, project_id):
     )
     db.session.add(submission)
     db.session.commit()
+
+    # Auto-grade Python submissions against the project's fixtures, in the background
+    grading = None
+    if grader.is_gradable(submission):
+      try:
+        job = grading_jobs.submit(
+          current_app._get_current_object(), [submission.id], project_id=project_id, requested_by=user.id
+        )
+        grading = {"job_id": job.id, "status": job.status}
+      except Exception as e:
+        db.session.rollback()
+        print(f"Could not queue auto-grading for submission {submission.id}: {e}")
     
     return jsonify({
       "success": True,
       "message": "Project submitted successfully",
-      "submission": submission.to_dict()
+      "submission": submission.to_dict(),
+      "grading": grading,
     }), 201
   except Exception as e:
     db.session.rollback()
@@ -840,7 +1151,8 @@ def my_project_submissions(user, project_id):
   """Get student's own submissions for a project"""
   try:
     submission_type = request.args.get('submission_type')
-    query = ProjectSubmission.query.filter_by(
+    fields = fieldsets.from_request()
+    query = _submission_query(fields).filter_by(
       student_id=user.id,
       project_id=project_id
     )
@@ -850,7 +1162,7 @@ def my_project_submissions(user, project_id):
     
     return jsonify({
       "success": True,
-      "submissions": [s.to_dict() for s in submissions]
+      "submissions": [s.to_dict(fields=fields) for s in submissions]
     }), 200
   except Exception as e:
     return jsonify({"success": False, "error": str(e)}), 500
@@ -861,13 +1173,14 @@ def my_project_submissions(user, project_id):
 def my_submissions(user):
   """Get all of student's submissions"""
   try:
-    submissions = ProjectSubmission.query.filter_by(
+    fields = fieldsets.from_request()
+    submissions = _submission_query(fields).filter_by(
       student_id=user.id
     ).order_by(ProjectSubmission.submitted_at.desc()).all()
     
     return jsonify({
       "success": True,
-      "submissions": [s.to_dict() for s in submissions]
+      "submissions": [s.to_dict(fields=fields) for s in submissions]
     }), 200
   except Exception as e:
     return jsonify({"success": False, "error": str(e)}), 500
@@ -940,6 +1253,77 @@ def download_submission(user, submission_id):
     return jsonify({"success": False, "error": str(e)}), 500
 
 
+@api.route("/submissions/<int:submission_id>/test-results", methods=["GET"])
+@require_auth
+def get_submission_test_results(user, submission_id):
+  """Get the auto-grader results for a submission"""
+  try:
+    submission = ProjectSubmission.query.get_or_404(submission_id)
+
+    if user.role == UserRole.STUDENT and submission.student_id != user.id:
+      return jsonify({"success": False, "error": "Access denied"}), 403
+
+    results = (
+      SubmissionTestResult.query.filter_by(submission_id=submission.id)
+      .order_by(SubmissionTestResult.id.asc())
+      .all()
+    )
+    return jsonify({
+      "success": True,
+      "results": [r.to_dict() for r in results],
+      "summary": grader.summarize(results),
+    }), 200
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+
+@api.route("/submissions/<int:submission_id>/grade", methods=["POST"])
+@require_mentor
+def grade_submission(user, submission_id):
+  """Queue the auto-grader for a single submission; poll /grading-jobs/<id>"""
+  try:
+    submission = ProjectSubmission.query.get_or_404(submission_id)
+    if not grader.is_gradable(submission):
+      return jsonify({"success": False, "error": "Only Python project submissions can be auto-graded"}), 400
+
+    job = grading_jobs.submit(
+      current_app._get_current_object(), [submission.id], project_id=submission.project_id, requested_by=user.id
+    )
+    return jsonify({"success": True, "job": job.to_dict()}), 202
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({"success": False, "error": str(e)}), 500
+
+
+@api.route("/admin/projects/<int:project_id>/regrade", methods=["POST"])
+@require_mentor
+def regrade_project(user, project_id):
+  """Queue a regrade of every Python submission for a project (e.g. after a fixture change)"""
+  try:
+    project = Project.query.get_or_404(project_id)
+    job = grading_jobs.submit(
+      current_app._get_current_object(), grader.project_submission_ids(project),
+      project_id=project.id, requested_by=user.id,
+    )
+    return jsonify({"success": True, "job": job.to_dict()}), 202
+  except Exception as e:
+    db.session.rollback()
+    return jsonify({"success": False, "error": str(e)}), 500
+
+
+@api.route("/grading-jobs/<int:job_id>", methods=["GET"])
+@require_auth
+def get_grading_job(user, job_id):
+  """Progress and per-submission summaries of a grading job"""
+  try:
+    job = db.session.get(GradingJob, job_id)
+    if not job or (user.role == UserRole.STUDENT and job.requested_by != user.id):
+      return jsonify({"success": False, "error": "Grading job not found"}), 404
+    return jsonify({"success": True, "job": job.to_dict(status=grading_jobs.status(job))}), 200
+  except Exception as e:
+    return jsonify({"success": False, "error": str(e)}), 500
+
+
 @api.route("/admin/submissions", methods=["GET"])
 @require_mentor
 def list_all_submissions(user):
@@ -948,7 +1332,8 @@ def list_all_submissions(user):
     project_id = request.args.get('project_id', type=int)
     student_id = request.args.get('student_id', type=int)
     
-    query = ProjectSubmission.query
+    fields = fieldsets.from_request()
+    query = _submission_query(fields)
     
     if project_id:
       query = query.filter_by(project_id=project_id)
@@ -957,10 +1342,7 @@ def list_all_submissions(user):
     
     submissions = query.order_by(ProjectSubmission.submitted_at.desc()).all()
     
-    return jsonify({
-      "success": True,
-      "submissions": [s.to_dict() for s in submissions]
-    }), 200
+    return stream_list("submissions", submissions, lambda s: s.to_dict(fields=fields))
   except Exception as e:
     return jsonify({"success": False, "error": str(e)}), 500
 
@@ -1073,14 +1455,15 @@ def submit_final_project(user):
 def my_final_project_submissions(user):
   """Get student's final project submissions"""
   try:
-    submissions = ProjectSubmission.query.filter_by(
+    fields = fieldsets.from_request()
+    submissions = _submission_query(fields).filter_by(
       student_id=user.id,
       submission_type='final_project'
     ).order_by(ProjectSubmission.submitted_at.desc()).all()
     
     return jsonify({
       "success": True,
-      "submissions": [s.to_dict() for s in submissions]
+      "submissions": [s.to_dict(fields=fields) for s in submissions]
     }), 200
   except Exception as e:
     return jsonify({"success": False, "error": str(e)}), 500
@@ -0,0 +1,100 @@
+"""
+LRU cache of project run results.
+
+Results are keyed by (sha256 of the program, sha256 of stdin, seed). Program
+hashes come from the (path, mtime, size)-keyed project file cache, so an
+edited index.py never serves stale output.
+"""
+import collections
+import hashlib
+import os
+import re
+import threading
+
+from file_cache import project_files
+
+
+RUN_CACHE_SIZE = int(os.environ.get("RUN_CACHE_SIZE", 512))
+
+# Programs importing these can print something different on every run, so
+# they are only cached when the caller pins a seed (and never for clocks).
+_SEEDABLE = {"random"}
+_UNCACHEABLE = {"time", "datetime", "secrets", "uuid", "os", "sys"}
+_IMPORT_RE = re.compile(r"^\s*(?:from\s+(\w+)|import\s+([\w\s,.]+))", re.MULTILINE)
+
+
+def sha256_text(text):
+  return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def imported_modules(code):
+  modules = set()
+  for from_mod, import_list in _IMPORT_RE.findall(code or ""):
+    if from_mod:
+      modules.add(from_mod)
+    else:
+      modules.update(part.strip().split(".")[0].split(" ")[0] for part in import_list.split(","))
+  return modules
+
+
+def is_cacheable(code, seed):
+  modules = imported_modules(code)
+  if modules & _UNCACHEABLE:
+    return False
+  if modules & _SEEDABLE and seed is None:
+    return False
+  return True
+
+
+class RunCache:
+  def __init__(self, max_entries=RUN_CACHE_SIZE):
+    self.max_entries = max_entries
+    self._results = collections.OrderedDict()
+    self._digests = {}  # path -> sha256 last seen
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+
+  def file_digest(self, path):
+    """sha256 of a file via the mtime-keyed project file cache; purges results of a replaced version."""
+    digest = project_files.get(path)[0].sha256
+    with self._lock:
+      old = self._digests.get(path)
+      self._digests[path] = digest
+      if old and old != digest:
+        self._purge_code(old)
+    return digest
+
+  def _purge_code(self, code_hash):
+    for key in [k for k in self._results if k[0] == code_hash]:
+      del self._results[key]
+
+  def get(self, key):
+    with self._lock:
+      result = self._results.get(key)
+      if result is None:
+        self.misses += 1
+        return None
+      self._results.move_to_end(key)
+      self.hits += 1
+      return result
+
+  def put(self, key, result):
+    if result.get("timed_out") or result.get("returncode") is None:
+      return  # timeouts depend on load; sandbox errors are transient
+    with self._lock:
+      self._results[key] = result
+      self._results.move_to_end(key)
+      while len(self._results) > self.max_entries:
+        self._results.popitem(last=False)
+
+  def stats(self):
+    with self._lock:
+      return {"entries": len(self._results), "capacity": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+run_cache = RunCache()
+
+
+def make_key(code_hash, stdin, seed):
+  return (code_hash, sha256_text(stdin), seed)
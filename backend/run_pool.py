@@ -0,0 +1,266 @@
+"""
+Bounded pool of pre-warmed sandbox workers for project runs.
+
+Each dispatcher thread owns one long-lived `sandbox_worker.py` process and feeds
+it jobs from a bounded queue. A run submitted while every worker is busy is
+queued (and reported as such to the client) instead of spawning another
+interpreter; once the queue itself is full new runs are rejected.
+"""
+import collections
+import json
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+
+import sandbox
+import sandbox_slots
+
+
+POOL_SIZE = int(os.environ.get("SANDBOX_POOL_SIZE", min(4, os.cpu_count() or 1)))
+QUEUE_SIZE = int(os.environ.get("SANDBOX_QUEUE_SIZE", 32))
+WORKER_MAX_JOBS = int(os.environ.get("SANDBOX_WORKER_MAX_JOBS", 500))
+FINISHED_RUNS_KEPT = 1000
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_SCRIPT = os.path.join(BACKEND_DIR, "sandbox_worker.py")
+
+
+class PoolBusy(Exception):
+  """Raised when the run queue is full."""
+
+
+class Run:
+  def __init__(self, job, user_id=None):
+    self.id = uuid.uuid4().hex
+    self.job = job
+    self.user_id = user_id
+    self.submitted_at = time.monotonic()
+    self.started_at = None
+    self.finished_at = None
+    self.result = None
+    self._done = threading.Event()
+    self._callbacks = []
+    self._callbacks_lock = threading.Lock()
+
+  @property
+  def status(self):
+    if self.finished_at is not None:
+      return "finished"
+    if self.started_at is not None:
+      return "running"
+    return "queued"
+
+  def wait(self, timeout=None):
+    return self._done.wait(timeout)
+
+  def finish(self, result):
+    self.result = result
+    self.finished_at = time.monotonic()
+    with self._callbacks_lock:
+      self._done.set()
+      callbacks, self._callbacks = self._callbacks, []
+    for fn in callbacks:
+      self._call(fn)
+
+  def add_done_callback(self, fn):
+    """Call fn(run) once the run has finished (right away if it already has)."""
+    with self._callbacks_lock:
+      if not self._done.is_set():
+        self._callbacks.append(fn)
+        return
+    self._call(fn)
+
+  def _call(self, fn):
+    try:
+      fn(self)
+    except Exception as e:
+      print(f"Run callback {getattr(fn, '__name__', fn)} failed: {e}")
+
+  def metrics(self):
+    now = time.monotonic()
+    started = self.started_at if self.started_at is not None else now
+    metrics = {"queue_wait_ms": int((started - self.submitted_at) * 1000)}
+    if self.finished_at is not None:
+      metrics["exec_ms"] = int((self.finished_at - self.started_at) * 1000)
+    return metrics
+
+  def to_dict(self):
+    return {"run_id": self.id, "status": self.status, "metrics": self.metrics()}
+
+
+class _Worker:
+  """One pre-warmed sandbox_worker.py process."""
+
+  def __init__(self):
+    self.proc = None
+    self.jobs_done = 0
+
+  def _start(self):
+    self.proc = subprocess.Popen(
+      # Same isolation as sandbox.run_python: no server environment (JWT secret,
+      # DATABASE_URL) and no backend directory on sys.path or as cwd
+      [sandbox.PYTHON, "-I", WORKER_SCRIPT],
+      stdin=subprocess.PIPE,
+      stdout=subprocess.PIPE,
+      cwd=tempfile.gettempdir(),
+      env=sandbox.sandbox_env(),
+      text=True,
+      encoding="utf-8",
+      bufsize=1,
+    )
+    self.jobs_done = 0
+
+  def ensure_started(self):
+    if self.proc is None or self.proc.poll() is not None:
+      self._start()
+
+  def stop(self):
+    if self.proc is not None and self.proc.poll() is None:
+      self.proc.kill()
+      self.proc.wait()
+    self.proc = None
+
+  def run(self, job):
+    self.ensure_started()
+    try:
+      self.proc.stdin.write(json.dumps(job) + "\n")
+      self.proc.stdin.flush()
+      line = self.proc.stdout.readline()
+      if not line:
+        raise RuntimeError("sandbox worker exited unexpectedly")
+      result = json.loads(line)
+    except Exception:
+      self.stop()
+      raise
+    self.jobs_done += 1
+    if self.jobs_done >= WORKER_MAX_JOBS:
+      self.stop()  # recycle; the next job starts a fresh worker
+    return result
+
+
+class SandboxPool:
+  def __init__(self, size=POOL_SIZE, queue_size=QUEUE_SIZE):
+    self.size = size
+    self._queue = queue.Queue(maxsize=queue_size)
+    self._runs = collections.OrderedDict()
+    self._lock = threading.Lock()
+    self._idle = size
+    self._stats = {"submitted": 0, "completed": 0, "rejected": 0, "failed": 0}
+    self._recent = collections.deque(maxlen=200)
+    self._threads = []
+    self._workers = []
+    for i in range(size):
+      worker = _Worker()
+      worker.ensure_started()  # pre-warm
+      self._workers.append(worker)
+      t = threading.Thread(target=self._dispatch, args=(worker,), name=f"sandbox-{i}", daemon=True)
+      t.start()
+      self._threads.append(t)
+
+  def submit(self, job, user_id=None):
+    """
+    Queue a job. Returns (run, queued): `queued` is True when no worker was idle
+    at submission time. Raises PoolBusy when the queue is full.
+    """
+    run = Run(job, user_id=user_id)
+    with self._lock:
+      queued = self._idle <= self._queue.qsize()
+      try:
+        self._queue.put_nowait(run)
+      except queue.Full:
+        self._stats["rejected"] += 1
+        raise PoolBusy("All sandbox workers are busy, please try again shortly")
+      self._stats["submitted"] += 1
+      self._runs[run.id] = run
+      self._trim_runs()
+    return run, queued
+
+  def get(self, run_id):
+    with self._lock:
+      return self._runs.get(run_id)
+
+  def _trim_runs(self):
+    while len(self._runs) > FINISHED_RUNS_KEPT:
+      oldest_id, oldest = next(iter(self._runs.items()))
+      if oldest.finished_at is None:
+        break
+      del self._runs[oldest_id]
+
+  def worker_pids(self):
+    return [w.proc.pid for w in self._workers if w.proc is not None]
+
+  def shutdown(self):
+    """Stop the dispatcher threads and their workers (tests, clean exits)."""
+    for _ in self._threads:
+      self._queue.put(None)
+    for t in self._threads:
+      t.join()
+
+  def _dispatch(self, worker):
+    while True:
+      run = self._queue.get()
+      if run is None:
+        worker.stop()
+        return
+      with self._lock:
+        self._idle -= 1
+      try:
+        with sandbox_slots.hold() as slot:
+          job = dict(run.job, confine=sandbox.confinement(slot))
+          run.started_at = time.monotonic()
+          result = worker.run(job)
+      except Exception as e:
+        result = {"returncode": None, "stdout": "", "stderr": f"Sandbox error: {e}", "timed_out": False,
+                  "output_truncated": False, "duration_ms": 0, "cpu_ms": 0}
+        with self._lock:
+          self._stats["failed"] += 1
+      if run.started_at is None:
+        run.started_at = time.monotonic()
+      run.finish(result)
+      with self._lock:
+        self._idle += 1
+        self._stats["completed"] += 1
+        self._recent.append(run.metrics())
+
+  def stats(self):
+    with self._lock:
+      recent = list(self._recent)
+      data = dict(self._stats)
+      data.update({
+        "pool_size": self.size,
+        "busy_workers": self.size - self._idle,
+        "queue_depth": self._queue.qsize(),
+        "queue_capacity": self._queue.maxsize,
+      })
+    for key in ("queue_wait_ms", "exec_ms"):
+      values = sorted(m[key] for m in recent if key in m)
+      data[f"avg_{key}"] = int(sum(values) / len(values)) if values else 0
+      data[f"p95_{key}"] = values[min(len(values) - 1, int(len(values) * 0.95))] if values else 0
+    return data
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def find_run(run_id):
+  """A run submitted to this process's pool, without starting the pool."""
+  return _pool.get(run_id) if _pool is not None else None
+
+
+def get_pool():
+  """
+  Process-wide pool, started on first use (so each server worker gets its own).
+  Sandboxed programs across all pools still share the host-wide sandbox_slots
+  limit, and runs handed out for polling are stored by run_store.
+  """
+  global _pool
+  if _pool is None:
+    with _pool_lock:
+      if _pool is None:
+        _pool = SandboxPool()
+  return _pool
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Interactive run sessions over WebSocket.
+
+Games like NUMBER-GUESSING-GAME loop over input(), so they need output streamed
+as it is printed and stdin fed turn by turn. All sessions share one asyncio
+event loop: each program's stdout/stderr are non-blocking pipes read by
+coroutines, so hundreds of open sessions do not need hundreds of threads.
+
+Protocol (JSON text frames):
+
+  client -> {"type": "start", "token": "<JWT>", "project_id": 3, "seed": 7}
+  server -> {"type": "started", "session_id": "..."}
+  server -> {"type": "stdout", "data": "Enter the Lower Bound: "}
+  client -> {"type": "stdin", "data": "1"}
+  client -> {"type": "eof"} | {"type": "stop"}
+  server -> {"type": "exit", "returncode": 0, "reason": "finished" | "stopped" | "idle" | "output_limit" | "lifetime"}
+  server -> {"type": "error", "error": "..."}
+
+Run standalone with `python run_sessions.py`, or in-process via start_in_thread(app).
+"""
+import asyncio
+import codecs
+import json
+import os
+import signal
+import tempfile
+import threading
+import time
+import uuid
+
+import sandbox
+
+
+SESSIONS_HOST = os.environ.get("RUN_SESSIONS_HOST", "0.0.0.0")
+SESSIONS_PORT = int(os.environ.get("RUN_SESSIONS_PORT", 5001))
+MAX_SESSIONS = int(os.environ.get("RUN_SESSIONS_MAX", 200))
+MAX_SESSIONS_PER_USER = int(os.environ.get("RUN_SESSIONS_PER_USER", 2))
+IDLE_TIMEOUT = float(os.environ.get("RUN_SESSIONS_IDLE_TIMEOUT", 120))
+MAX_LIFETIME = float(os.environ.get("RUN_SESSIONS_MAX_LIFETIME", 900))
+START_TIMEOUT = 10
+READ_CHUNK = 4096
+
+
+class SessionRejected(Exception):
+  pass
+
+
+class SessionManager:
+  def __init__(self, app):
+    self.app = app
+    self.sessions = {}
+    self.per_user = {}
+
+  def _resolve(self, token, project_id):
+    """Runs in a thread: JWT + DB lookups. Returns (user_id, script_path)."""
+    from auth import verify_token
+    from models import User, Project, UserRole
+
+    payload = verify_token(token or "")
+    if not payload:
+      raise SessionRejected("Authentication required")
+    with self.app.app_context():
+      user = User.query.get(payload["user_id"])
+      if not user or not user.is_active:
+        raise SessionRejected("Account is inactive")
+      if user.role != UserRole.STUDENT:
+        raise SessionRejected("Insufficient permissions")
+      project = Project.query.get(project_id) if project_id is not None else None
+      if not project or not project.project_path:
+        raise SessionRejected("Project not found")
+      path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "projects", project.project_path, "index.py")
+      if not os.path.exists(path):
+        raise SessionRejected("Python file not found")
+      return user.id, path
+
+  def _admit(self, user_id):
+    if len(self.sessions) >= MAX_SESSIONS:
+      raise SessionRejected("Too many sessions running, please try again shortly")
+    if self.per_user.get(user_id, 0) >= MAX_SESSIONS_PER_USER:
+      raise SessionRejected(f"At most {MAX_SESSIONS_PER_USER} interactive sessions per student")
+    self.per_user[user_id] = self.per_user.get(user_id, 0) + 1
+
+  def _release(self, user_id, session_id):
+    self.sessions.pop(session_id, None)
+    self.per_user[user_id] = self.per_user.get(user_id, 1) - 1
+    if self.per_user[user_id] <= 0:
+      del self.per_user[user_id]
+
+  async def handle(self, websocket):
+    try:
+      start = json.loads(await asyncio.wait_for(websocket.recv(), START_TIMEOUT))
+      if start.get("type") != "start":
+        raise SessionRejected("First message must be a start message")
+      seed = start.get("seed")
+      seed = int(seed) if seed is not None else None
+      loop = asyncio.get_running_loop()
+      user_id, path = await loop.run_in_executor(None, self._resolve, start.get("token"), start.get("project_id"))
+      self._admit(user_id)
+    except (SessionRejected, ValueError, TypeError) as e:
+      await websocket.send(json.dumps({"type": "error", "error": str(e)}))
+      await websocket.close()
+      return
+    except asyncio.TimeoutError:
+      await websocket.close()
+      return
+
+    session_id = uuid.uuid4().hex
+    self.sessions[session_id] = websocket
+    try:
+      await Session(session_id, websocket, path, seed).run()
+    finally:
+      self._release(user_id, session_id)
+
+
+class Session:
+  def __init__(self, session_id, websocket, path, seed):
+    self.id = session_id
+    self.websocket = websocket
+    self.path = path
+    self.seed = seed
+    self.limits = sandbox.merge_limits()
+    self.last_activity = time.monotonic()
+    self.output_bytes = 0
+    self.reason = None
+    self.proc = None
+
+  async def _send(self, message):
+    try:
+      await self.websocket.send(json.dumps(message))
+    except Exception:
+      self._kill("disconnected")
+
+  def _kill(self, reason):
+    if self.reason is None:
+      self.reason = reason
+    if self.proc is not None and self.proc.returncode is None:
+      try:
+        os.killpg(self.proc.pid, signal.SIGKILL)
+      except ProcessLookupError:
+        pass
+
+  async def _pump(self, stream, kind):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+      chunk = await stream.read(READ_CHUNK)
+      if not chunk:
+        break
+      self.last_activity = time.monotonic()
+      self.output_bytes += len(chunk)
+      if self.output_bytes > self.limits["max_output_bytes"]:
+        self._kill("output_limit")
+        break
+      text = decoder.decode(chunk)
+      if text:
+        await self._send({"type": kind, "data": text})
+
+  async def _read_client(self):
+    async for raw in self.websocket:
+      self.last_activity = time.monotonic()
+      try:
+        message = json.loads(raw)
+      except ValueError:
+        continue
+      kind = message.get("type")
+      if kind == "stdin" and self.proc.stdin and not self.proc.stdin.is_closing():
+        data = str(message.get("data", ""))
+        if not data.endswith("\n"):
+          data += "\n"
+        self.proc.stdin.write(data.encode("utf-8"))
+        try:
+          await self.proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+          pass
+      elif kind == "eof" and self.proc.stdin:
+        self.proc.stdin.close()
+      elif kind == "stop":
+        self._kill("stopped")
+        return
+    self._kill("disconnected")
+
+  async def _watchdog(self):
+    started = time.monotonic()
+    while True:
+      await asyncio.sleep(1)
+      now = time.monotonic()
+      if now - self.last_activity > IDLE_TIMEOUT:
+        self._kill("idle")
+        return
+      if now - started > MAX_LIFETIME:
+        self._kill("lifetime")
+        return
+
+  async def run(self):
+    limits = self.limits
+    with tempfile.TemporaryDirectory(prefix="session-") as workdir:
+      self.proc = await asyncio.create_subprocess_exec(
+        sandbox.PYTHON, "-u", "-I", "-c", sandbox.BOOTSTRAP,
+        "" if self.seed is None else str(self.seed), self.path,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=workdir,
+        env=sandbox.sandbox_env(),
+        start_new_session=True,
+        preexec_fn=lambda: sandbox.apply_limits(limits),
+      )
+      await self._send({"type": "started", "session_id": self.id})
+      helpers = [
+        asyncio.ensure_future(self._read_client()),
+        asyncio.ensure_future(self._watchdog()),
+      ]
+      returncode = None
+      try:
+        await asyncio.gather(
+          self._pump(self.proc.stdout, "stdout"),
+          self._pump(self.proc.stderr, "stderr"),
+        )
+        returncode = await self.proc.wait()
+      finally:
+        for task in helpers:
+          task.cancel()
+        self._kill(self.reason or "finished")
+        if self.proc.returncode is None:
+          await self.proc.wait()
+    await self._send({"type": "exit", "returncode": returncode, "reason": self.reason or "finished"})
+    try:
+      await self.websocket.close()
+    except Exception:
+      pass
+
+
+async def serve(app, host=SESSIONS_HOST, port=SESSIONS_PORT):
+  from websockets.asyncio.server import serve as ws_serve
+
+  manager = SessionManager(app)
+  async with ws_serve(manager.handle, host, port, max_size=64 * 1024):
+    print(f"Interactive run sessions listening on ws://{host}:{port}")
+    await asyncio.Future()
+
+
+def start_in_thread(app):
+  """Run the session server on its own event loop thread. Returns the thread, or None without websockets."""
+  try:
+    import websockets  # noqa: F401
+  except ImportError:
+    print("websockets not installed; interactive run sessions disabled")
+    return None
+  thread = threading.Thread(target=asyncio.run, args=(serve(app),), name="run-sessions", daemon=True)
+  thread.start()
+  return thread
+
+
+if __name__ == "__main__":
+  from app import app, start_background_services
+
+  # Standalone service next to gunicorn: also hosts the folder watchers, which
+  # must run in exactly one process
+  start_background_services(app, sessions=False)
+  asyncio.run(serve(app))
@@ -0,0 +1,54 @@
+"""
+Shared state for project runs that clients poll.
+
+A run lives in the pool of the server process that accepted it, but the next
+GET /api/runs/<id> may reach any gunicorn worker. Runs handed back as 202 are
+therefore recorded in the sandbox_runs table, and the owning process writes
+the result there when the run finishes. Rows older than RUN_RETENTION_HOURS
+are pruned as new ones are added.
+
+If the owning process dies first (worker recycled, deploy), nobody finishes
+the row; after RUN_STALE_SECONDS it is reported as "interrupted" so clients
+stop polling and can simply run the program again.
+"""
+import json
+import os
+from datetime import datetime, timedelta
+
+from models import db, SandboxRun
+
+
+RETENTION = timedelta(hours=float(os.environ.get("RUN_RETENTION_HOURS", 24)))
+STALE_AFTER = timedelta(seconds=float(os.environ.get("RUN_STALE_SECONDS", 300)))
+
+
+def _write_result(app, run):
+  with app.app_context():
+    row = db.session.get(SandboxRun, run.id)
+    if row is None:
+      return
+    row.status = run.status
+    row.result = json.dumps(run.result)
+    row.metrics_json = json.dumps(run.metrics())
+    row.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def track(app, run):
+  """Record a run_pool.Run for polling; its result is stored when it finishes."""
+  SandboxRun.query.filter(SandboxRun.created_at < datetime.utcnow() - RETENTION).delete(synchronize_session=False)
+  db.session.add(SandboxRun(id=run.id, user_id=run.user_id, status=run.status, metrics_json=json.dumps(run.metrics())))
+  db.session.commit()
+  run.add_done_callback(lambda finished: _write_result(app, finished))
+
+
+def get(run_id):
+  """The stored SandboxRun, or None. Unfinished rows report the last known status."""
+  return db.session.get(SandboxRun, run_id)
+
+
+def status(row):
+  """The stored run's status, with runs nobody finished in time reported as interrupted."""
+  if row.status != "finished" and row.created_at and datetime.utcnow() - row.created_at > STALE_AFTER:
+    return "interrupted"
+  return row.status
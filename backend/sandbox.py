@@ -0,0 +1,334 @@
+"""
+Resource-limited execution of Python programs (reference projects and student code).
+
+Besides rlimits, a program is confined when the server runs as root: each
+host-wide slot (sandbox_slots) has its own unprivileged uid, SANDBOX_UID_BASE +
+slot, capped at SANDBOX_MAX_PROCESSES processes, and the program runs in
+private mount and network namespaces where the backend directory (code,
+database, uploads) and the database directory are empty read-only tmpfs mounts
+and no network interface is up. After each program every process left under
+the slot's uid is killed, so daemonized grandchildren cannot outlive the slot.
+
+SANDBOX_CONFINEMENT: "auto" (default) confines as far as the host allows and
+warns once otherwise, "require" refuses to run programs it cannot confine
+(containers need CAP_SYS_ADMIN), "off" runs them as the server's own user.
+"""
+import ctypes
+import os
+import resource
+import shutil
+import signal
+import stat
+import subprocess
+import tempfile
+import time
+
+
+PYTHON = os.environ.get("SANDBOX_PYTHON", "python3")
+
+DEFAULT_LIMITS = {
+  "timeout": float(os.environ.get("SANDBOX_TIMEOUT", 10)),  # wall clock seconds
+  "cpu_seconds": int(os.environ.get("SANDBOX_CPU_SECONDS", 5)),
+  "memory_bytes": int(os.environ.get("SANDBOX_MEMORY_MB", 256)) * 1024 * 1024,
+  "max_output_bytes": int(os.environ.get("SANDBOX_MAX_OUTPUT_KB", 256)) * 1024,
+}
+
+CONFINEMENT = os.environ.get("SANDBOX_CONFINEMENT", "auto")
+UID_BASE = int(os.environ.get("SANDBOX_UID_BASE", 61000))
+MAX_PROCESSES = int(os.environ.get("SANDBOX_MAX_PROCESSES", 16))
+REAP_SECONDS = 2
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CLONE_NEWNS = 0x00020000
+CLONE_NEWNET = 0x40000000
+MS_RDONLY, MS_NOSUID, MS_NODEV, MS_NOEXEC = 0x1, 0x2, 0x4, 0x8
+MS_REC = 0x4000
+MS_PRIVATE = 0x40000
+
+_libc = ctypes.CDLL(None, use_errno=True)
+_support = None
+
+# Runs the target script as __main__, optionally seeding `random` first so that
+# games like NUMBER-GUESSING-GAME produce repeatable output.
+BOOTSTRAP = (
+  "import random, sys\n"
+  "seed, path = sys.argv[1], sys.argv[2]\n"
+  "del sys.argv[1]\n"
+  "if seed:\n"
+  "  random.seed(int(seed))\n"
+  "with open(path, encoding='utf-8') as f:\n"
+  "  code = compile(f.read(), path, 'exec')\n"
+  "exec(code, {'__name__': '__main__', '__file__': path, '__builtins__': __builtins__})\n"
+)
+
+
+def merge_limits(limits=None):
+  merged = dict(DEFAULT_LIMITS)
+  if limits:
+    merged.update({k: v for k, v in limits.items() if v is not None})
+  return merged
+
+
+def apply_limits(limits):
+  """Apply rlimits to the current process. Called in the child before exec."""
+  cpu = int(limits["cpu_seconds"])
+  resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+  mem = int(limits["memory_bytes"])
+  resource.setrlimit(resource.RLIMIT_AS, (mem, mem))
+  # stdout/stderr are regular files, so RLIMIT_FSIZE also caps program output
+  out = int(limits["max_output_bytes"])
+  resource.setrlimit(resource.RLIMIT_FSIZE, (out, out))
+  resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+class ConfinementError(RuntimeError):
+  pass
+
+
+def slot_uid(slot):
+  return UID_BASE + int(slot)
+
+
+def hidden_paths():
+  """Directories untrusted programs must not see: the backend, the database's and SANDBOX_HIDE_PATHS."""
+  paths = [BACKEND_DIR]
+  if os.environ.get("SQLITE_PATH"):
+    paths.append(os.path.dirname(os.path.abspath(os.environ["SQLITE_PATH"])))
+  paths += [p for p in os.environ.get("SANDBOX_HIDE_PATHS", "").split(os.pathsep) if p]
+  return sorted({os.path.abspath(p) for p in paths})
+
+
+def _world_reachable(path):
+  """Whether another uid can open `path`: every directory above it is world-searchable."""
+  path = os.path.realpath(path)
+  while True:
+    parent = os.path.dirname(path)
+    if parent == path:
+      return True
+    path = parent
+    if not os.stat(path).st_mode & stat.S_IXOTH:
+      return False
+
+
+def _unshare_works():
+  pid = os.fork()
+  if pid == 0:
+    os._exit(0 if _libc.unshare(CLONE_NEWNS | CLONE_NEWNET) == 0 else 1)
+  return os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) == 0
+
+
+def _check_support():
+  """None when programs can be confined on this host, else the reason they cannot."""
+  if not hasattr(os, "setuid") or os.geteuid() != 0:
+    return "the server does not run as root"
+  python = shutil.which(PYTHON)
+  if python is None or not _world_reachable(python):
+    return f"the sandbox interpreter {python or PYTHON} is not reachable by other users (set SANDBOX_PYTHON)"
+  if not _unshare_works():
+    return "mount/network namespaces are not permitted (containers need CAP_SYS_ADMIN)"
+  return None
+
+
+def confinement(slot):
+  """
+  How to confine a program running in sandbox slot `slot`, passed on to confine()
+  and reap(); None when confinement is off or, with "auto", not possible here.
+  """
+  global _support
+  if CONFINEMENT == "off":
+    return None
+  if _support is None:
+    _support = [_check_support()]
+    if _support[0] and CONFINEMENT != "require":
+      print(f"Sandbox confinement disabled: {_support[0]}")
+  if _support[0]:
+    if CONFINEMENT == "require":
+      raise ConfinementError(f"SANDBOX_CONFINEMENT=require, but {_support[0]}")
+    return None
+  return {"uid": slot_uid(slot), "hide": hidden_paths()}
+
+
+def _mount(source, target, fstype, flags, data=None):
+  if _libc.mount(source, target, fstype, flags, data) != 0:
+    errno = ctypes.get_errno()
+    raise OSError(errno, f"mount {target.decode()}: {os.strerror(errno)}")
+
+
+def confine(conf, workdir):
+  """
+  Confine the current process as described by confinement(). Called as root in
+  the child, after anything it needs from the hidden paths has been read.
+  """
+  if not conf:
+    return
+  try:
+    if _libc.unshare(CLONE_NEWNS | CLONE_NEWNET) != 0:
+      errno = ctypes.get_errno()
+      raise OSError(errno, f"unshare: {os.strerror(errno)}")
+    _mount(b"none", b"/", None, MS_REC | MS_PRIVATE)
+    workdir = os.path.realpath(workdir)
+    for path in conf["hide"]:
+      # A directory holding the workdir (e.g. SQLITE_PATH in /tmp) cannot be covered
+      if os.path.isdir(path) and os.path.commonpath([path, workdir]) != path:
+        _mount(b"tmpfs", path.encode(), b"tmpfs", MS_RDONLY | MS_NOSUID | MS_NODEV | MS_NOEXEC, b"size=4k,mode=755")
+  except OSError as e:
+    raise ConfinementError(f"Cannot confine the program: {e}") from e
+  uid = conf["uid"]
+  os.chown(workdir, uid, uid)
+  resource.setrlimit(resource.RLIMIT_NPROC, (MAX_PROCESSES, MAX_PROCESSES))
+  os.setgroups([])
+  os.setgid(uid)
+  os.setuid(uid)
+
+
+def _has_processes(uid):
+  """Whether a process other than this one runs as `uid` (Linux /proc; False elsewhere)."""
+  try:
+    pids = [p for p in os.listdir("/proc") if p.isdigit() and int(p) != os.getpid()]
+  except OSError:
+    return False
+  for pid in pids:
+    try:
+      if os.stat(f"/proc/{pid}").st_uid == uid:
+        return True
+    except OSError:
+      pass
+  return False
+
+
+def reap(conf):
+  """Kill every process still running under the confined uid (e.g. a daemonized grandchild)."""
+  if not conf:
+    return
+  pid = os.fork()
+  if pid == 0:
+    try:
+      os.setgid(conf["uid"])
+      os.setuid(conf["uid"])
+      # Every process this uid may signal, except ourselves; repeated until the
+      # killed ones are gone (reaped by init), as they still count against RLIMIT_NPROC
+      deadline = time.monotonic() + REAP_SECONDS
+      os.kill(-1, signal.SIGKILL)
+      while _has_processes(conf["uid"]) and time.monotonic() < deadline:
+        time.sleep(0.005)
+        os.kill(-1, signal.SIGKILL)
+    except BaseException:
+      pass
+    os._exit(0)
+  os.waitpid(pid, 0)
+
+
+def sandbox_env():
+  return {
+    "PATH": os.environ.get("PATH", "/usr/local/bin:/usr/bin:/bin"),
+    "PYTHONIOENCODING": "utf-8",
+    "PYTHONHASHSEED": "0",
+    "PYTHONDONTWRITEBYTECODE": "1",
+  }
+
+
+def _read_capped(f, limit):
+  f.seek(0)
+  data = f.read(limit)
+  # Python ignores SIGXFSZ, so a program that hits RLIMIT_FSIZE sees EFBIG and
+  # stops; a file filled to the limit is how we recognise it.
+  return data.decode("utf-8", errors="replace"), len(data) >= limit
+
+
+def run_python(script_path, stdin="", cwd=None, seed=None, limits=None, confine_with=None):
+  """
+  Run `script_path` in a fresh interpreter with CPU, memory and output limits.
+  Without an explicit `cwd` the program runs in an empty temporary directory.
+  `confine_with` is a confinement() result; the script is then copied into the
+  workdir first, since its own directory may be hidden.
+
+  Returns a dict with returncode, stdout, stderr, timed_out, output_truncated
+  and duration_ms. Never raises for program failures.
+  """
+  limits = merge_limits(limits)
+
+  with tempfile.TemporaryDirectory(prefix="sandbox-") as workdir, \
+      tempfile.TemporaryFile() as f_in, tempfile.TemporaryFile() as f_out, tempfile.TemporaryFile() as f_err:
+    script_path = os.path.abspath(script_path)
+    if confine_with:
+      script_path = shutil.copy(script_path, os.path.join(workdir, os.path.basename(script_path)))
+    argv = [PYTHON, "-I", "-c", BOOTSTRAP, "" if seed is None else str(int(seed)), script_path]
+
+    def preexec():
+      apply_limits(limits)
+      confine(confine_with, cwd or workdir)
+
+    f_in.write((stdin or "").encode("utf-8"))
+    f_in.seek(0)
+    started = time.monotonic()
+    proc = subprocess.Popen(
+      argv,
+      stdin=f_in,
+      stdout=f_out,
+      stderr=f_err,
+      cwd=cwd or workdir,
+      env=sandbox_env(),
+      start_new_session=True,
+      preexec_fn=preexec,
+    )
+    timed_out = False
+    try:
+      proc.wait(timeout=limits["timeout"])
+    except subprocess.TimeoutExpired:
+      timed_out = True
+      try:
+        os.killpg(proc.pid, signal.SIGKILL)
+      except ProcessLookupError:
+        pass
+      proc.wait()
+    finally:
+      reap(confine_with)
+    duration_ms = int((time.monotonic() - started) * 1000)
+
+    stdout, out_truncated = _read_capped(f_out, limits["max_output_bytes"])
+    stderr, err_truncated = _read_capped(f_err, limits["max_output_bytes"])
+
+  returncode = proc.returncode
+  if out_truncated or err_truncated:
+    stderr += "\nOutput limit exceeded"
+  if returncode == -signal.SIGXCPU or (returncode == -signal.SIGKILL and not timed_out):
+    stderr += "\nCPU time limit exceeded"
+  if timed_out:
+    stderr += "\nCode execution timed out"
+
+  return {
+    "returncode": returncode,
+    "stdout": stdout,
+    "stderr": stderr,
+    "timed_out": timed_out,
+    "output_truncated": out_truncated or err_truncated,
+    "duration_ms": duration_ms,
+  }
+
+
+def normalize_output(text):
+  """Compare outputs ignoring trailing whitespace on lines and trailing blank lines."""
+  lines = [line.rstrip() for line in (text or "").replace("\r\n", "\n").split("\n")]
+  while lines and not lines[-1]:
+    lines.pop()
+  return "\n".join(lines)
+
+
+def run_case(script_path, case, limits=None, confine_with=None):
+  """Run one grading fixture against `script_path`. Top-level so process pools can pickle it."""
+  result = run_python(
+    script_path,
+    stdin=case.get("stdin", ""),
+    seed=case.get("seed"),
+    limits=limits,
+    confine_with=confine_with,
+  )
+  expected = case.get("expected_stdout", "")
+  passed = (
+    not result["timed_out"]
+    and result["returncode"] == 0
+    and normalize_output(result["stdout"]) == normalize_output(expected)
+  )
+  result["name"] = case.get("name")
+  result["passed"] = passed
+  return result
@@ -0,0 +1,101 @@
+"""
+Host-wide limit on concurrently running sandboxed programs.
+
+Every gunicorn worker has its own run pool and grader, so a per-process limit
+multiplies with the worker count. Instead, a program only starts once it holds
+one of SANDBOX_MAX_CONCURRENT slots: lock files under SANDBOX_SLOT_DIR taken
+with flock, which every process on the host shares. The kernel releases a
+slot when its holder exits, so a worker killed mid-run cannot leak one.
+"""
+import contextlib
+import os
+import tempfile
+import threading
+import time
+
+try:
+  import fcntl
+except ImportError:  # Windows: no host-wide limit
+  fcntl = None
+
+
+MAX_CONCURRENT = int(os.environ.get("SANDBOX_MAX_CONCURRENT", os.cpu_count() or 1))
+SLOT_DIR = os.environ.get("SANDBOX_SLOT_DIR") or os.path.join(tempfile.gettempdir(), "stjude-sandbox-slots")
+POLL_SECONDS = 0.01
+
+
+class _Slots:
+  def __init__(self, directory=SLOT_DIR, count=MAX_CONCURRENT):
+    self.directory = directory
+    self.count = count
+    self._files = None
+    self._held = set()
+    self._lock = threading.Lock()
+
+  def _open(self):
+    # Opened per process: flock locks belong to the open file, so a descriptor
+    # inherited across fork would share its lock with the parent
+    if self._files is None or self._files[0] != os.getpid():
+      os.makedirs(self.directory, exist_ok=True)
+      files = [open(os.path.join(self.directory, f"slot{i}.lock"), "a+") for i in range(self.count)]
+      self._files = (os.getpid(), files)
+      self._held = set()
+    return self._files[1]
+
+  def _try_acquire(self):
+    with self._lock:
+      for index, f in enumerate(self._open()):
+        if index in self._held:
+          continue
+        try:
+          fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+          continue
+        self._held.add(index)
+        return index
+    return None
+
+  def _release(self, index):
+    with self._lock:
+      self._held.discard(index)
+      fcntl.flock(self._open()[index], fcntl.LOCK_UN)
+
+  @contextlib.contextmanager
+  def hold(self):
+    """
+    Block until a slot is free and keep it for the duration of the `with` block.
+    Yields the slot index, which also picks the job's sandbox uid (sandbox.slot_uid).
+    """
+    if fcntl is None:
+      yield 0
+      return
+    index = self._try_acquire()
+    while index is None:
+      time.sleep(POLL_SECONDS)
+      index = self._try_acquire()
+    try:
+      yield index
+    finally:
+      self._release(index)
+
+  def stats(self):
+    """Slots in use across the host (a moment's snapshot)."""
+    if fcntl is None:
+      return {"capacity": None, "busy": None}
+    busy = 0
+    with self._lock:
+      for index, f in enumerate(self._open()):
+        if index in self._held:
+          busy += 1
+          continue
+        try:
+          fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+          busy += 1
+        else:
+          fcntl.flock(f, fcntl.LOCK_UN)
+    return {"capacity": self.count, "busy": busy}
+
+
+slots = _Slots()
+hold = slots.hold
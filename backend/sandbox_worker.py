@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Pre-warmed sandbox worker process.
+
+Started and owned by run_pool.SandboxPool. The interpreter is already up, so a
+run only costs a fork: each job (a script `path` or student `code`) arrives as
+one JSON line on stdin, is executed in a forked child with the sandbox rlimits
+and the job's `confine` settings (sandbox.confinement) applied, and the result is written back as one JSON line on stdout.
+"""
+import json
+import os
+import random
+import select
+import signal
+import sys
+import tempfile
+import time
+import traceback
+import types
+
+# Started with -I from outside the backend directory, so the backend is not on
+# sys.path; put it there just long enough to import the sandbox helpers.
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+import sandbox
+sys.path[:] = [p for p in sys.path if p not in ("", BACKEND_DIR)]
+
+
+STUDENT_FILENAME = "<student>"
+
+
+def _isolate(path):
+  """Strip what the worker process knows about the server before running `path`."""
+  os.environ.clear()
+  os.environ.update(sandbox.sandbox_env())
+  sys.path[:] = [p for p in sys.path if p not in ("", BACKEND_DIR)]
+  sys.argv[:] = [path]
+  sys.modules.pop("sandbox", None)
+  main = types.ModuleType("__main__")
+  main.__file__ = path
+  sys.modules["__main__"] = main
+  return main.__dict__
+
+
+def _child(job, workdir, f_in, f_out, f_err):
+  """Runs in the forked child; never returns."""
+  try:
+    os.setsid()
+    os.dup2(f_in.fileno(), 0)
+    os.dup2(f_out.fileno(), 1)
+    os.dup2(f_err.fileno(), 2)
+    # The inherited sys.std* objects may still buffer protocol traffic
+    sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+    sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+    sys.stderr = open(2, "w", encoding="utf-8", closefd=False)
+    os.chdir(workdir)
+    sandbox.apply_limits(job["limits"])
+    if job.get("seed") is not None:
+      random.seed(int(job["seed"]))
+    else:
+      random.seed()
+    if job.get("code") is not None:
+      path = STUDENT_FILENAME
+      source = job["code"]
+    else:
+      path = job["path"]
+      with open(path, "r", encoding="utf-8") as f:
+        source = f.read()
+    code = compile(source, path, "exec")
+    sandbox.confine(job.get("confine"), workdir)
+    namespace = _isolate(path)
+  except BaseException:
+    traceback.print_exc()
+    sys.stderr.flush()
+    os._exit(1)
+
+  status = 0
+  try:
+    exec(code, namespace)
+  except SystemExit as e:
+    if e.code is None:
+      status = 0
+    elif isinstance(e.code, int):
+      status = e.code
+    else:
+      print(e.code, file=sys.stderr)
+      status = 1
+  except BaseException:
+    traceback.print_exc()
+    status = 1
+  try:
+    sys.stdout.flush()
+    sys.stderr.flush()
+  except BaseException:
+    pass
+  os._exit(status & 0xFF)
+
+
+def _wait(pid, timeout):
+  """Wait for `pid` up to `timeout` seconds. Returns (status, rusage) or None on timeout."""
+  deadline = time.monotonic() + timeout
+  pidfd = os.pidfd_open(pid) if hasattr(os, "pidfd_open") else None
+  try:
+    while True:
+      done_pid, status, rusage = os.wait4(pid, os.WNOHANG)
+      if done_pid:
+        return status, rusage
+      remaining = deadline - time.monotonic()
+      if remaining <= 0:
+        return None
+      if pidfd is not None:
+        select.select([pidfd], [], [], remaining)
+      else:
+        time.sleep(min(remaining, 0.005))
+  finally:
+    if pidfd is not None:
+      os.close(pidfd)
+
+
+def run_job(job):
+  limits = sandbox.merge_limits(job.get("limits"))
+  job["limits"] = limits
+  with tempfile.TemporaryDirectory(prefix="sandbox-") as workdir, \
+      tempfile.TemporaryFile() as f_in, tempfile.TemporaryFile() as f_out, tempfile.TemporaryFile() as f_err:
+    f_in.write((job.get("stdin") or "").encode("utf-8"))
+    f_in.seek(0)
+    started = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+      _child(job, workdir, f_in, f_out, f_err)
+
+    waited = _wait(pid, limits["timeout"])
+    timed_out = waited is None
+    if timed_out:
+      try:
+        os.killpg(pid, signal.SIGKILL)
+      except ProcessLookupError:
+        pass
+      _, status, rusage = os.wait4(pid, 0)
+    else:
+      status, rusage = waited
+    sandbox.reap(job.get("confine"))
+    duration_ms = int((time.monotonic() - started) * 1000)
+
+    stdout, out_truncated = sandbox._read_capped(f_out, limits["max_output_bytes"])
+    stderr, err_truncated = sandbox._read_capped(f_err, limits["max_output_bytes"])
+
+  returncode = os.waitstatus_to_exitcode(status)
+  if out_truncated or err_truncated:
+    stderr += "\nOutput limit exceeded"
+  if returncode == -signal.SIGXCPU or (returncode == -signal.SIGKILL and not timed_out):
+    stderr += "\nCPU time limit exceeded"
+  if timed_out:
+    stderr += "\nCode execution timed out"
+
+  return {
+    "returncode": returncode,
+    "stdout": stdout,
+    "stderr": stderr,
+    "timed_out": timed_out,
+    "output_truncated": out_truncated or err_truncated,
+    "duration_ms": duration_ms,
+    "cpu_ms": int((rusage.ru_utime + rusage.ru_stime) * 1000),
+  }
+
+
+def main():
+  protocol_out = sys.stdout
+  for line in sys.stdin:
+    if not line.strip():
+      continue
+    job = json.loads(line)
+    try:
+      result = run_job(job)
+    except Exception as e:
+      result = {"returncode": None, "stdout": "", "stderr": f"Sandbox error: {e}", "timed_out": False,
+                "output_truncated": False, "duration_ms": 0, "cpu_ms": 0}
+    result["id"] = job.get("id")
+    protocol_out.write(json.dumps(result) + "\n")
+    protocol_out.flush()
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,234 @@
+"""
+Full-text search over resources, projects, project steps, step questions and
+the text of the PDFs in uploads/books.
+
+Each searchable table has an SQLite FTS5 external-content index kept in sync
+by triggers, so the ORM and raw SQL writers need no extra calls. Book text is
+extracted with the optional `pypdf` package when resource_indexer picks up a
+PDF and stored one row per page in search_books.
+"""
+import re
+import time
+
+from sqlalchemy import text
+
+from models import db
+
+try:
+  from pypdf import PdfReader
+except ImportError:  # pragma: no cover - optional dependency
+  PdfReader = None
+
+
+HIGHLIGHT_OPEN = "<mark>"
+HIGHLIGHT_CLOSE = "</mark>"
+SNIPPET_TOKENS = 16
+MAX_QUERY_TERMS = 10
+MAX_BOOK_PAGES = 2000
+
+# name -> (source table, indexed columns)
+INDEXES = {
+  "search_resources": ("resources", ("title", "description", "category")),
+  "search_projects": ("projects", ("name", "description")),
+  "search_steps": ("project_steps", ("title", "content", "code_snippet")),
+  "search_questions": ("project_step_questions", ("prompt", "option_a", "option_b", "option_c", "option_d")),
+}
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_supported():
+  return db.engine.dialect.name == "sqlite"
+
+
+def _table_exists(name):
+  return db.session.execute(
+    text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": name}
+  ).first() is not None
+
+
+def _trigger_sql(index, table, columns):
+  cols = ", ".join(columns)
+  new_vals = ", ".join(f"new.{c}" for c in columns)
+  old_vals = ", ".join(f"old.{c}" for c in columns)
+  delete = f"INSERT INTO {index}({index}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});"
+  insert = f"INSERT INTO {index}(rowid, {cols}) VALUES (new.id, {new_vals});"
+  return [
+    f"CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {table} BEGIN {insert} END",
+    f"CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {table} BEGIN {delete} END",
+    f"CREATE TRIGGER IF NOT EXISTS {index}_au AFTER UPDATE ON {table} BEGIN {delete} {insert} END",
+  ]
+
+
+def ensure_search_index():
+  """Create the FTS5 tables and sync triggers if missing; new indexes are built from existing rows."""
+  if not is_supported():
+    print("Full-text search needs SQLite FTS5; search is disabled for this database")
+    return
+  for index, (table, columns) in INDEXES.items():
+    created = not _table_exists(index)
+    db.session.execute(text(
+      f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+      f"{', '.join(columns)}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    ))
+    for sql in _trigger_sql(index, table, columns):
+      db.session.execute(text(sql))
+    if created:
+      db.session.execute(text(f"INSERT INTO {index}({index}) VALUES ('rebuild')"))
+      print(f"Built search index {index}")
+  db.session.execute(text(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_books USING fts5("
+    "body, resource_id UNINDEXED, page UNINDEXED, tokenize='unicode61 remove_diacritics 2')"
+  ))
+  db.session.commit()
+
+
+# ---------------------------------------------------------------------------
+# Book text
+# ---------------------------------------------------------------------------
+
+def extract_pdf_pages(path):
+  """[(page number, text)] for a PDF, or None when pypdf is not installed."""
+  if PdfReader is None:
+    return None
+  pages = []
+  try:
+    reader = PdfReader(path)
+    for number, page in enumerate(reader.pages[:MAX_BOOK_PAGES], start=1):
+      body = (page.extract_text() or "").strip()
+      if body:
+        pages.append((number, body))
+  except Exception as e:
+    print(f"Could not extract text from {path}: {e}")
+  return pages
+
+
+def index_book_text(resource_id, path):
+  """Replace the indexed text of one book. Caller commits."""
+  if not is_supported():
+    return
+  pages = extract_pdf_pages(path)
+  if pages is None:
+    return
+  remove_book_text(resource_id)
+  # A page 0 marker records that the book was processed even if it has no text layer
+  rows = [{"body": body, "rid": resource_id, "page": number} for number, body in pages] or \
+         [{"body": "", "rid": resource_id, "page": 0}]
+  db.session.execute(text("INSERT INTO search_books(body, resource_id, page) VALUES (:body, :rid, :page)"), rows)
+
+
+def remove_book_text(resource_id):
+  if not is_supported():
+    return
+  db.session.execute(text("DELETE FROM search_books WHERE resource_id = :rid"), {"rid": resource_id})
+
+
+def unindexed_book_ids(resource_ids):
+  """Those of `resource_ids` that have no text in search_books yet (e.g. pypdf was installed later)."""
+  if not resource_ids or not is_supported() or PdfReader is None:
+    return set()
+  done = {row[0] for row in db.session.execute(text("SELECT DISTINCT resource_id FROM search_books"))}
+  return {rid for rid in resource_ids if rid not in done}
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def build_match(query):
+  """Turn free text into an FTS5 MATCH expression: every term required, the last one as a prefix."""
+  terms = _TERM_RE.findall(query or "")[:MAX_QUERY_TERMS]
+  if not terms:
+    return None
+  quoted = [f'"{t}"' for t in terms]
+  quoted[-1] += "*"
+  return " ".join(quoted)
+
+
+def _hl(index, column):
+  return f"highlight({index}, {column}, '{HIGHLIGHT_OPEN}', '{HIGHLIGHT_CLOSE}')"
+
+
+def _snip(index, column=-1):
+  return f"snippet({index}, {column}, '{HIGHLIGHT_OPEN}', '{HIGHLIGHT_CLOSE}', '…', {SNIPPET_TOKENS})"
+
+
+# type -> (SQL selecting id, title, snippet, rank [, extra...]; extra result keys)
+_QUERIES = {
+  "resources": (
+    f"""SELECT r.id, {_hl('search_resources', 0)}, {_snip('search_resources')},
+               bm25(search_resources, 10.0, 3.0, 1.0) AS rank, r.category, r.content
+        FROM search_resources JOIN resources r ON r.id = search_resources.rowid
+        WHERE search_resources MATCH :match {{visible}}
+        ORDER BY rank LIMIT :limit""",
+    ("category", "url"),
+    "AND r.is_active = 1",
+  ),
+  "projects": (
+    f"""SELECT p.id, {_hl('search_projects', 0)}, {_snip('search_projects', 1)},
+               bm25(search_projects, 10.0, 3.0) AS rank
+        FROM search_projects JOIN projects p ON p.id = search_projects.rowid
+        WHERE search_projects MATCH :match {{visible}}
+        ORDER BY rank LIMIT :limit""",
+    (),
+    "AND p.is_active = 1",
+  ),
+  "steps": (
+    f"""SELECT s.id, {_hl('search_steps', 0)}, {_snip('search_steps')},
+               bm25(search_steps, 8.0, 3.0, 1.0) AS rank, s.project_id, p.name, s.order_index
+        FROM search_steps
+        JOIN project_steps s ON s.id = search_steps.rowid
+        JOIN projects p ON p.id = s.project_id
+        WHERE search_steps MATCH :match {{visible}}
+        ORDER BY rank LIMIT :limit""",
+    ("project_id", "project_name", "order_index"),
+    "AND s.is_released = 1 AND p.is_active = 1",
+  ),
+  "questions": (
+    f"""SELECT q.id, {_hl('search_questions', 0)}, {_snip('search_questions')},
+               bm25(search_questions, 5.0, 1.0, 1.0, 1.0, 1.0) AS rank, s.id, s.project_id, p.name
+        FROM search_questions
+        JOIN project_step_questions q ON q.id = search_questions.rowid
+        JOIN project_steps s ON s.id = q.step_id
+        JOIN projects p ON p.id = s.project_id
+        WHERE search_questions MATCH :match {{visible}}
+        ORDER BY rank LIMIT :limit""",
+    ("step_id", "project_id", "project_name"),
+    "AND s.is_released = 1 AND p.is_active = 1",
+  ),
+  "books": (
+    f"""SELECT r.id, r.title, {_snip('search_books', 0)}, bm25(search_books) AS rank, search_books.page, r.content
+        FROM search_books JOIN resources r ON r.id = search_books.resource_id
+        WHERE search_books MATCH :match {{visible}}
+        ORDER BY rank LIMIT :limit""",
+    ("page", "url"),
+    "AND r.is_active = 1",
+  ),
+}
+
+SEARCH_TYPES = tuple(_QUERIES)
+
+
+def search(query, types=SEARCH_TYPES, limit=20, include_hidden=False):
+  """
+  Ranked results across `types`, best first. Students (include_hidden=False)
+  only see active resources/projects and released steps. Returns
+  (results, took_ms); results is None when the query has no searchable terms.
+  """
+  started = time.perf_counter()
+  match = build_match(query)
+  if match is None:
+    return None, 0
+  results = []
+  for kind in types:
+    sql, extra_keys, visible = _QUERIES[kind]
+    rows = db.session.execute(
+      text(sql.format(visible="" if include_hidden else visible)),
+      {"match": match, "limit": limit},
+    )
+    for row in rows:
+      item = {"type": kind, "id": row[0], "title": row[1], "snippet": row[2], "rank": round(row[3], 4)}
+      item.update(zip(extra_keys, row[4:]))
+      results.append(item)
+  results.sort(key=lambda r: r["rank"])
+  return results[:limit], round((time.perf_counter() - started) * 1000, 2)
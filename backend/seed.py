@@ -0,0 +1,205 @@
+"""
+Seed engine for the curriculum.
+
+Each project folder under backend/projects may carry a curriculum.json:
+
+  {"name": ..., "description": ..., "difficulty_level": ..., "estimated_time": ...,
+   "steps": [{"order_index": 1, "title": ..., "content": ..., "code_snippet": ...,
+              "full_code": ..., "is_released": true,
+              "questions": [{"prompt": ..., "option_a": ..., "option_b": ...,
+                             "option_c": ..., "option_d": ..., "correct_option": "B",
+                             "points": 5}]}]}
+
+The sha256 of the file is stored in app_meta once it is loaded, so unchanged
+projects are skipped without touching their rows. A changed file is applied in
+one transaction: steps are matched by order_index and questions by position,
+existing rows are updated in place (student answers stay attached) and new rows
+are bulk-inserted.
+
+Usage: python seed.py [--force] [PROJECT ...]
+"""
+import hashlib
+import json
+import os
+import sys
+
+from sqlalchemy import insert, update
+
+from models import db, AppMeta, Project, ProjectStep, ProjectStepQuestion
+from project_sync import register_listener
+import step_bundles
+from upsert import set_meta
+
+
+PROJECTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "projects")
+CURRICULUM_FILENAME = "curriculum.json"
+META_PREFIX = "seed:"
+
+PROJECT_FIELDS = ("description", "difficulty_level", "estimated_time")
+STEP_FIELDS = ("title", "content", "code_snippet", "full_code", "is_released")
+QUESTION_FIELDS = ("prompt", "option_a", "option_b", "option_c", "option_d", "correct_option", "points")
+
+
+def curriculum_path(folder):
+  return os.path.join(PROJECTS_DIR, folder, CURRICULUM_FILENAME)
+
+
+def read_curriculum(folder):
+  """(data, sha256) of a project's curriculum file, or (None, None) if it has none."""
+  try:
+    with open(curriculum_path(folder), "rb") as f:
+      raw = f.read()
+  except FileNotFoundError:
+    return None, None
+  return json.loads(raw), hashlib.sha256(raw).hexdigest()
+
+
+def _changes(obj, values, fields):
+  return {f: values.get(f) for f in fields if getattr(obj, f) != values.get(f)}
+
+
+def apply_curriculum(folder, data):
+  """Upsert one project's steps and questions. Caller commits. Returns the Project."""
+  name = data.get("name") or folder
+  project = Project.query.filter_by(name=name).first()
+  if project is None:
+    project = Project(name=name, project_path=folder)
+    db.session.add(project)
+  project.project_path = folder
+  project.is_active = True
+  for field, value in _changes(project, data, PROJECT_FIELDS).items():
+    setattr(project, field, value)
+  db.session.flush()
+
+  steps = {s.order_index: s for s in ProjectStep.query.filter_by(project_id=project.id).all()}
+  questions = {}
+  if steps:
+    for q in (
+      ProjectStepQuestion.query.filter(ProjectStepQuestion.step_id.in_([s.id for s in steps.values()]))
+      .order_by(ProjectStepQuestion.id.asc())
+      .all()
+    ):
+      questions.setdefault(q.step_id, []).append(q)
+
+  step_updates, new_steps = [], []
+  for step_data in data.get("steps", []):
+    existing = steps.get(step_data["order_index"])
+    values = {f: step_data.get(f) for f in STEP_FIELDS}
+    values["is_released"] = bool(step_data.get("is_released", True))
+    if existing is None:
+      new_steps.append(dict(values, project_id=project.id, order_index=step_data["order_index"]))
+    else:
+      changed = _changes(existing, values, STEP_FIELDS)
+      if changed:
+        step_updates.append(dict(changed, id=existing.id))
+
+  step_ids = {order: s.id for order, s in steps.items()}
+  if new_steps:
+    inserted = db.session.execute(
+      insert(ProjectStep).returning(ProjectStep.id, ProjectStep.order_index, sort_by_parameter_order=True),
+      new_steps,
+    ).all()
+    step_ids.update({order: step_id for step_id, order in inserted})
+  if step_updates:
+    db.session.execute(update(ProjectStep), step_updates)
+
+  question_updates, new_questions = [], []
+  wanted_orders = set()
+  for step_data in data.get("steps", []):
+    wanted_orders.add(step_data["order_index"])
+    step_id = step_ids[step_data["order_index"]]
+    existing = questions.get(step_id, [])
+    wanted = step_data.get("questions", [])
+    for position, question_data in enumerate(wanted):
+      values = {f: question_data.get(f) for f in QUESTION_FIELDS}
+      if position < len(existing):
+        changed = _changes(existing[position], values, QUESTION_FIELDS)
+        if changed:
+          question_updates.append(dict(changed, id=existing[position].id))
+      else:
+        new_questions.append(dict(values, step_id=step_id))
+    for stale in existing[len(wanted):]:
+      db.session.delete(stale)
+
+  if new_questions:
+    db.session.execute(insert(ProjectStepQuestion), new_questions)
+  if question_updates:
+    db.session.execute(update(ProjectStepQuestion), question_updates)
+
+  # Steps no longer in the file go away with their questions and answers
+  for order, step in steps.items():
+    if order not in wanted_orders:
+      db.session.delete(step)
+  # Bulk statements bypass the flush hooks of the step-bundle cache
+  step_bundles.mark_changed(project.id)
+  return project
+
+
+def seed_projects(app, names=None, force=False):
+  """
+  Load curriculum files for `names` (default: every project folder), skipping
+  files whose hash matches the last load unless `force`. Folders without a
+  curriculum file just get a Project row. Returns the names that were (re)seeded.
+  """
+  with app.app_context():
+    if names is None:
+      try:
+        names = sorted(e.name for e in os.scandir(PROJECTS_DIR) if e.is_dir() and not e.name.startswith("."))
+      except FileNotFoundError:
+        names = []
+    names = [n for n in names if os.path.isdir(os.path.join(PROJECTS_DIR, n))]
+    if not names:
+      return []
+
+    seeded_hashes = {
+      m.key[len(META_PREFIX):]: m.value
+      for m in AppMeta.query.filter(AppMeta.key.in_([META_PREFIX + n for n in names])).all()
+    }
+    existing = {
+      p.project_path: p for p in Project.query.filter(Project.project_path.in_(names)).all()
+    }
+
+    seeded = []
+    for folder in names:
+      data, digest = read_curriculum(folder)
+      if data is None:
+        if folder not in existing:
+          db.session.add(Project(
+            name=folder,
+            project_path=folder,
+            description=f"Project: {folder}",
+            difficulty_level="beginner",
+          ))
+          db.session.commit()
+        continue
+      if not force and seeded_hashes.get(folder) == digest and folder in existing:
+        continue
+      try:
+        apply_curriculum(folder, data)
+        set_meta(META_PREFIX + folder, digest)
+        db.session.commit()
+        seeded.append(folder)
+        print(f"Seeded curriculum for {folder}")
+      except Exception as e:
+        db.session.rollback()
+        print(f"Seeding {folder} failed: {e}")
+    return seeded
+
+
+@register_listener
+def reseed_changed_projects(app, added, removed, changed):
+  """Project watcher hook: reload curriculum files of new or modified folders."""
+  if added or changed:
+    seed_projects(app, list(added) + list(changed))
+
+
+if __name__ == "__main__":
+  from app import app
+
+  args = sys.argv[1:]
+  force = "--force" in args
+  projects = [a for a in args if a != "--force"] or None
+  with app.app_context():
+    db.create_all()
+  done = seed_projects(app, projects, force=force)
+  print(f"Seeded {len(done)} project(s)")
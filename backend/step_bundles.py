@@ -0,0 +1,177 @@
+"""
+Pre-serialized released-steps payloads for GET /api/projects/<id>/steps.
+
+The payload is the same for every student, so it is built once per project
+and fieldset (steps and questions in two queries) and kept as ready-to-send
+JSON bytes with a strong ETag. Serving it is a dictionary lookup.
+
+Invalidation:
+- Any flush that adds, changes or deletes a ProjectStep or ProjectStepQuestion
+  marks its project; bulk writers (the seed engine) call mark_changed().
+- On commit every marked project gets a new version in app_meta
+  ("steps:<project_id>") and its bundle is dropped in this process.
+- Other processes (gunicorn workers, the sessions service) compare their
+  bundle's version with app_meta at most every STEP_BUNDLE_RECHECK_SECONDS.
+"""
+import collections
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, selectinload
+
+import fieldsets
+from models import db, AppMeta, ProjectStep, ProjectStepQuestion
+from upsert import set_meta
+
+
+VERSION_PREFIX = "steps:"
+RECHECK_SECONDS = float(os.environ.get("STEP_BUNDLE_RECHECK_SECONDS", 5))
+MAX_BUNDLES = int(os.environ.get("STEP_BUNDLE_MAX_ENTRIES", 256))
+# full_code is only sent when asked for (?fields=...,full_code)
+DEFAULT_EXCLUDE = ("full_code",)
+DEFAULT_FIELDS = fieldsets.FieldSet(exclude=frozenset(DEFAULT_EXCLUDE))
+_CHANGED_KEY = "step_bundles_changed"
+
+
+class StepBundle:
+  __slots__ = ("project_id", "version", "body", "etag", "checked_at")
+
+  def __init__(self, project_id, version, body):
+    self.project_id = project_id
+    self.version = version
+    self.body = body
+    self.etag = hashlib.sha256(body).hexdigest()[:32]
+    self.checked_at = time.monotonic()
+
+
+_bundles = collections.OrderedDict()  # (project_id, fieldset) -> StepBundle, LRU
+_lock = threading.Lock()
+
+
+def stored_version(project_id):
+  row = db.session.get(AppMeta, VERSION_PREFIX + str(project_id))
+  return row.value if row else None
+
+
+def released_steps(project_id, fields=DEFAULT_FIELDS):
+  """The released steps of a project as dicts with their questions (two queries at most)."""
+  query = (
+    ProjectStep.query.filter_by(project_id=project_id, is_released=True)
+    .options(*fieldsets.deferred(ProjectStep, fields))
+    .order_by(ProjectStep.order_index.asc())
+  )
+  with_questions = "questions" in fields
+  if with_questions:
+    query = query.options(selectinload(ProjectStep.questions))
+  payload = []
+  for step in query.all():
+    data = step.to_dict(fields=fields)
+    if with_questions:
+      data["questions"] = [q.to_dict() for q in sorted(step.questions, key=lambda q: q.id)]
+    payload.append(data)
+  return payload
+
+
+def build(project_id, fields=DEFAULT_FIELDS):
+  """Serialize the released steps of a project with their questions."""
+  return current_app.json.dumpb({"success": True, "steps": released_steps(project_id, fields)})
+
+
+def get_bundle(project_id, fields=DEFAULT_FIELDS):
+  """The current StepBundle of a project and fieldset, rebuilt when its version moved on."""
+  key = (project_id, fields.cache_key)
+  with _lock:
+    bundle = _bundles.get(key)
+    if bundle is not None:
+      _bundles.move_to_end(key)
+  now = time.monotonic()
+  if bundle is not None and now - bundle.checked_at < RECHECK_SECONDS:
+    return bundle
+
+  version = stored_version(project_id)
+  if bundle is not None and bundle.version == version:
+    bundle.checked_at = now
+    return bundle
+
+  bundle = StepBundle(project_id, version, build(project_id, fields))
+  with _lock:
+    _bundles[key] = bundle
+    while len(_bundles) > MAX_BUNDLES:
+      _bundles.popitem(last=False)
+  return bundle
+
+
+def invalidate(project_ids=None):
+  """Drop the bundles of `project_ids` (default: all) in this process."""
+  with _lock:
+    if project_ids is None:
+      _bundles.clear()
+    else:
+      for key in [k for k in _bundles if k[0] in project_ids]:
+        del _bundles[key]
+
+
+def mark_changed(project_id, session=None):
+  """Record that a project's steps changed in `session`; its version is bumped on commit."""
+  (session or db.session).info.setdefault(_CHANGED_KEY, set()).add(project_id)
+
+
+def _project_of(session, obj):
+  if isinstance(obj, ProjectStep):
+    return obj.project_id
+  if obj.step is not None:
+    return obj.step.project_id
+  step = session.get(ProjectStep, obj.step_id) if obj.step_id is not None else None
+  return step.project_id if step else None
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_changes(session, flush_context, instances):
+  with session.no_autoflush:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+      if not isinstance(obj, (ProjectStep, ProjectStepQuestion)):
+        continue
+      if obj in session.dirty and not session.is_modified(obj, include_collections=False):
+        continue
+      project_id = _project_of(session, obj)
+      if project_id is not None:
+        mark_changed(project_id, session)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session):
+  if session.new or session.dirty or session.deleted:
+    session.flush()  # commit would flush after this hook; collect its step changes now
+  for project_id in session.info.get(_CHANGED_KEY, ()):
+    set_meta(VERSION_PREFIX + str(project_id), uuid.uuid4().hex)
+
+
+_change_listeners = []
+
+
+def register_change_listener(fn):
+  """Call fn(project_ids) after a commit that changed those projects' steps. Returns fn."""
+  _change_listeners.append(fn)
+  return fn
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_changed(session):
+  changed = session.info.pop(_CHANGED_KEY, None)
+  if changed:
+    invalidate(changed)
+    for fn in _change_listeners:
+      try:
+        fn(set(changed))
+      except Exception as e:
+        print(f"Step change listener {fn.__name__} failed: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session):
+  session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+  sys.path.insert(0, BACKEND_DIR)
+
+# Keep the committed stjude.db, static/bundles and the host's sandbox slots untouched
+_TMP = tempfile.mkdtemp(prefix="stjude-tests-")
+# The suite drops and rewrites its database: never the one DATABASE_URL points
+# the server at, but a temporary SQLite file or the throwaway one from --db
+os.environ.pop("DATABASE_URL", None)
+os.environ["SQLITE_PATH"] = os.path.join(_TMP, "stjude.db")
+os.environ["SQLITE_LEGACY_PATH"] = os.path.join(_TMP, "no-legacy.db")  # start empty, not from the committed db
+os.environ["BUNDLE_DIR"] = os.path.join(_TMP, "bundles")
+os.environ["SANDBOX_SLOT_DIR"] = os.path.join(_TMP, "slots")
+os.environ["INIT_DB_FORCE"] = "1"
+
+
+def pytest_addoption(parser):
+  parser.addoption(
+    "--db", default=os.environ.get("TEST_DATABASE_URL"),
+    help="Run against this database (e.g. a PostgreSQL test database) instead of a temporary "
+         "SQLite file; all of its tables are dropped first. Default: TEST_DATABASE_URL.",
+  )
+
+
+def pytest_configure(config):
+  # Before collection: test modules import models/app, which read DATABASE_URL
+  if config.getoption("--db"):
+    os.environ["DATABASE_URL"] = config.getoption("--db")
+
+
+@pytest.fixture(scope="session")
+def app():
+  import app as app_module
+  from sqlalchemy import MetaData
+  from models import db
+  if os.environ.get("DATABASE_URL"):
+    with app_module.app.app_context():
+      tables = MetaData()
+      tables.reflect(db.engine)
+      tables.drop_all(db.engine)
+  app_module.init_db()
+  return app_module.app
+
+
+@pytest.fixture
+def client(app):
+  return app.test_client()
+
+
+def _token(client, username, password):
+  response = client.post("/api/login", json={"username": username, "password": password})
+  return {"Authorization": "Bearer " + response.get_json()["token"]}
+
+
+@pytest.fixture(scope="session")
+def student(app):
+  from models import db, User, UserRole
+  with app.app_context():
+    user = User.query.filter_by(username="test_student").first()
+    if user is None:
+      user = User(username="test_student", email="student@test", full_name="Test Student", role=UserRole.STUDENT)
+      user.set_password("pw")
+      db.session.add(user)
+      db.session.commit()
+    return user.id
+
+
+@pytest.fixture
+def student_headers(client, student):
+  return _token(client, "test_student", "pw")
+
+
+@pytest.fixture
+def admin_headers(client):
+  return _token(client, "admin", "admin123")
@@ -0,0 +1,41 @@
+"""POST /api/batch: every sub-request runs like a separate request."""
+import flask
+
+from models import Project
+
+
+def test_sub_requests_get_their_own_app_context(app, client, student_headers):
+  contexts = []
+
+  def record(sender, **extra):
+    contexts.append(flask.g._get_current_object())
+
+  flask.request_started.connect(record, app)
+  try:
+    response = client.post("/api/batch", headers=student_headers, json={"requests": [
+      {"id": "read", "method": "GET", "path": "/api/progress"},
+      {"id": "write", "method": "POST", "path": "/api/does-not-exist"},
+      {"id": "again", "method": "GET", "path": "/api/progress"},
+    ]})
+  finally:
+    flask.request_started.disconnect(record, app)
+  assert response.status_code == 200
+  assert [r["status"] for r in response.get_json()["responses"]] == [200, 404, 200]
+  # The batch request itself plus one fresh `g` per sub-request
+  assert len(contexts) == 4
+  assert len({id(g) for g in contexts}) == 4
+
+
+def test_later_sub_requests_see_earlier_writes(app, client, student_headers):
+  with app.app_context():
+    project_id = Project.query.first().id
+  response = client.post("/api/batch", headers=student_headers, json={"requests": [
+    {"id": "save", "method": "POST", "path": "/api/progress", "body": {"project_id": project_id, "progress_percentage": 40}},
+    {"id": "list", "method": "GET", "path": "/api/progress"},
+    {"id": "me", "method": "GET", "path": "/api/me"},
+  ]})
+  saved, listed, me = response.get_json()["responses"]
+  assert saved["status"] == 200
+  assert me["status"] == 200
+  progress = {p["project_id"]: p for p in listed["body"]["progress"]}
+  assert progress[project_id]["progress_percentage"] == saved["body"]["progress"]["progress_percentage"]
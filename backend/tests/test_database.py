@@ -0,0 +1,105 @@
+"""Dialect-specific writes: ON CONFLICT upserts, online migrations and RETURNING inserts. Run with --db for PostgreSQL."""
+import threading
+
+import pytest
+
+from migrate_db import MigrationContext, run_migrations
+from models import db, AppMeta, Project, ProjectProgress, ProjectStep, ProjectStepQuestion
+import seed
+from upsert import get_or_create_progress, set_meta
+
+
+def test_set_meta_updates_the_existing_row(app):
+  with app.app_context():
+    set_meta("test:upsert", "one")
+    db.session.commit()
+    set_meta("test:upsert", "two")
+    db.session.commit()
+    assert [m.value for m in AppMeta.query.filter_by(key="test:upsert").all()] == ["two"]
+
+
+def test_concurrent_get_or_create_progress_makes_one_row(app, student):
+  with app.app_context():
+    project_id = Project.query.first().id
+    ProjectProgress.query.filter_by(student_id=student, project_id=project_id).delete()
+    db.session.commit()
+
+  barrier = threading.Barrier(4)
+  ids, errors = [], []
+
+  def create():
+    with app.app_context():
+      try:
+        barrier.wait()
+        ids.append(get_or_create_progress(student, project_id).id)
+        db.session.commit()
+      except Exception as e:
+        errors.append(e)
+
+  threads = [threading.Thread(target=create) for _ in range(4)]
+  for t in threads:
+    t.start()
+  for t in threads:
+    t.join()
+  assert not errors
+  assert len(set(ids)) == 1
+  with app.app_context():
+    assert ProjectProgress.query.filter_by(student_id=student, project_id=project_id).count() == 1
+
+
+@pytest.fixture
+def scratch_table(app):
+  with app.app_context():
+    ctx = MigrationContext(db.engine)
+    ctx.execute("CREATE TABLE migration_scratch (id INTEGER PRIMARY KEY, name VARCHAR(20), flag INTEGER)")
+    for i in range(1, 8):
+      ctx.execute("INSERT INTO migration_scratch (id, name, flag) VALUES (:id, :name, 0)", {"id": i, "name": f"n{i}"})
+    yield ctx
+    ctx.execute("DROP TABLE migration_scratch")
+
+
+def test_migration_helpers(app, scratch_table):
+  ctx = scratch_table
+  assert ctx.backfill("migration_scratch", "flag = 1", "flag = 0", batch_size=3) == 7
+  assert ctx.execute("SELECT COUNT(*) FROM migration_scratch WHERE flag = 1").scalar() == 7
+  # CONCURRENTLY on PostgreSQL; running it twice is a no-op
+  ctx.create_index("ix_migration_scratch_name", "migration_scratch", ["name"], unique=True)
+  ctx.create_index("ix_migration_scratch_name", "migration_scratch", ["name"], unique=True)
+  ctx.add_column("migration_scratch", "note", "VARCHAR(20)")
+  assert ctx.has_column("migration_scratch", "note")
+  with pytest.raises(Exception):
+    ctx.execute("INSERT INTO migration_scratch (id, name, flag) VALUES (8, 'n1', 0)")
+  with app.app_context():
+    assert run_migrations() == []
+
+
+def _curriculum(steps):
+  return {
+    "name": "Database Test Project",
+    "description": "Seeded by tests",
+    "steps": [
+      {"order_index": order, "title": f"Step {order}", "content": "...",
+       "questions": [{"prompt": f"Q{order}.{i}", "option_a": "a", "option_b": "b",
+                      "correct_option": "A", "points": 1} for i in range(order)]}
+      for order in steps
+    ],
+  }
+
+
+def test_apply_curriculum_links_questions_to_returned_step_ids(app):
+  with app.app_context():
+    try:
+      project = seed.apply_curriculum("database-test-project", _curriculum([3, 1, 2]))
+      db.session.flush()
+      first_ids = {s.order_index: s.id for s in ProjectStep.query.filter_by(project_id=project.id)}
+
+      project = seed.apply_curriculum("database-test-project", _curriculum([1, 2, 3, 5, 4]))
+      db.session.flush()
+      steps = {s.order_index: s for s in ProjectStep.query.filter_by(project_id=project.id)}
+      assert sorted(steps) == [1, 2, 3, 4, 5]
+      assert {order: steps[order].id for order in first_ids} == first_ids  # updated in place
+      for order, step in steps.items():
+        prompts = sorted(q.prompt for q in ProjectStepQuestion.query.filter_by(step_id=step.id))
+        assert prompts == [f"Q{order}.{i}" for i in range(order)]
+    finally:
+      db.session.rollback()
@@ -0,0 +1,56 @@
+"""Moving to SQLITE_PATH keeps the data of the old backend/stjude.db."""
+import sqlite3
+
+import pytest
+
+import db_config
+
+
+def _make_db(path, rows):
+  conn = sqlite3.connect(path)
+  conn.execute("CREATE TABLE users (name TEXT)")
+  conn.executemany("INSERT INTO users VALUES (?)", [(r,) for r in rows])
+  conn.commit()
+  conn.close()
+
+
+def _rows(path):
+  conn = sqlite3.connect(path)
+  try:
+    return [r[0] for r in conn.execute("SELECT name FROM users ORDER BY name")]
+  finally:
+    conn.close()
+
+
+def test_missing_sqlite_path_adopts_the_legacy_database(tmp_path, monkeypatch):
+  legacy = tmp_path / "stjude.db"
+  _make_db(legacy, ["admin", "student"])
+  target = tmp_path / "instance" / "stjude.db"
+  monkeypatch.setenv("SQLITE_PATH", str(target))
+  monkeypatch.delenv("SQLITE_LEGACY_PATH", raising=False)
+  monkeypatch.delenv("DATABASE_URL", raising=False)
+
+  assert db_config.database_uri(str(legacy)) == f"sqlite:///{target}"
+  assert _rows(target) == ["admin", "student"]
+  assert _rows(legacy) == ["admin", "student"]
+  assert [p.name for p in target.parent.iterdir()] == ["stjude.db"]
+
+
+def test_existing_sqlite_path_is_left_alone(tmp_path):
+  legacy = tmp_path / "legacy.db"
+  target = tmp_path / "current.db"
+  _make_db(legacy, ["old"])
+  _make_db(target, ["current"])
+  assert db_config.adopt_legacy_sqlite(str(target), str(legacy)) is False
+  assert _rows(target) == ["current"]
+
+
+def test_no_legacy_database_warns_or_fails_when_required(tmp_path, monkeypatch, capsys):
+  target = tmp_path / "instance" / "stjude.db"
+  missing = tmp_path / "missing.db"
+  assert db_config.adopt_legacy_sqlite(str(target), str(missing)) is False
+  assert "new, empty database" in capsys.readouterr().out
+
+  monkeypatch.setenv("SQLITE_REQUIRE_EXISTING", "1")
+  with pytest.raises(RuntimeError):
+    db_config.adopt_legacy_sqlite(str(target), str(missing))
@@ -0,0 +1,44 @@
+"""Project file metadata for files larger than the file-cache budget."""
+import hashlib
+import os
+
+import file_cache
+
+
+def test_large_files_are_hashed_once_per_version(tmp_path, monkeypatch):
+  path = tmp_path / "data.bin"
+  path.write_bytes(b"\xff" * 100)
+  cache = file_cache.FileCache(max_bytes=10)
+  scans = []
+  scan = file_cache.FileInfo.scan
+
+  def counting_scan(cls, p, st):
+    scans.append(p)
+    return scan(p, st)
+
+  monkeypatch.setattr(file_cache.FileInfo, "scan", classmethod(counting_scan))
+
+  info, from_cache = cache.describe(str(path))
+  assert not from_cache
+  assert info.sha256 == hashlib.sha256(b"\xff" * 100).hexdigest()
+  assert info.size == 100 and not info.is_text
+  assert cache.describe(str(path)) == (info, True)
+  assert cache.stats()["bytes"] == 0  # contents are not kept
+  assert len(scans) == 1
+
+  path.write_text("x" * 120)
+  info, from_cache = cache.describe(str(path))
+  assert not from_cache and info.is_text and info.size == 120
+  assert len(scans) == 2
+
+  cache.invalidate(str(tmp_path))
+  assert not cache.describe(str(path))[1]
+
+
+def test_small_files_still_go_through_the_content_cache(tmp_path):
+  path = tmp_path / "index.py"
+  path.write_text("print('hi')\n")
+  cache = file_cache.FileCache(max_bytes=1024)
+  entry, _ = cache.describe(str(path))
+  assert entry.data == b"print('hi')\n"
+  assert cache.get(str(path), os.stat(path)) == (entry, True)
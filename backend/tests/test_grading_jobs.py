@@ -0,0 +1,114 @@
+"""Grading runs as a background job: the request returns at once, the job reports progress and failures."""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import grader
+from models import db, GradingJob, Project, ProjectSubmission, SubmissionTestResult
+
+
+CASES = [{"name": "greets", "stdin": "", "expected_stdout": "hi\n"}]
+
+
+@pytest.fixture
+def project_id(app):
+  with app.app_context():
+    return Project.query.filter(Project.project_path.isnot(None)).first().id
+
+
+@pytest.fixture
+def fixtures(monkeypatch):
+  def use(cases=CASES, **limits):
+    monkeypatch.setattr(grader, "load_fixtures", lambda project: (cases, limits or None))
+  use()
+  return use
+
+
+@pytest.fixture
+def make_submission(app, tmp_path, project_id, student):
+  def make(code):
+    path = tmp_path / f"submission{len(list(tmp_path.iterdir()))}.py"
+    path.write_text(code)
+    with app.app_context():
+      submission = ProjectSubmission(
+        student_id=student, project_id=project_id, filename="index.py", file_path=str(path),
+        file_size=len(code), mime_type="text/x-python", status="submitted",
+      )
+      db.session.add(submission)
+      db.session.commit()
+      return submission.id
+  return make
+
+
+def _wait_for_job(client, headers, job_id, timeout=20):
+  deadline = time.monotonic() + timeout
+  while True:
+    job = client.get(f"/api/grading-jobs/{job_id}", headers=headers).get_json()["job"]
+    if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+      return job
+    time.sleep(0.05)
+
+
+def test_regrade_returns_a_job_and_grades_in_the_background(
+  client, admin_headers, fixtures, make_submission, project_id,
+):
+  fixtures(timeout=1)  # other tests' submissions of this project are regraded too
+  good = make_submission("print('hi')")
+  bad = make_submission("print('bye')")
+  response = client.post(f"/api/admin/projects/{project_id}/regrade", headers=admin_headers)
+  assert response.status_code == 202
+  job_id = response.get_json()["job"]["id"]
+
+  job = _wait_for_job(client, admin_headers, job_id)
+  assert job["status"] == "finished"
+  assert job["graded"] == job["total"]
+  assert job["summaries"][str(good)]["all_passed"] is True
+  assert job["summaries"][str(bad)]["all_passed"] is False
+  results = client.get(f"/api/submissions/{good}/test-results", headers=admin_headers).get_json()
+  assert results["summary"] == {"passed": 1, "total": 1, "all_passed": True}
+
+
+def test_case_timeout_is_recorded_without_holding_the_request(app, client, admin_headers, fixtures, make_submission):
+  fixtures(timeout=0.5)
+  submission_id = make_submission("while True:\n  pass\n")
+  started = time.monotonic()
+  response = client.post(f"/api/submissions/{submission_id}/grade", headers=admin_headers)
+  assert response.status_code == 202
+  assert time.monotonic() - started < 0.5
+
+  job = _wait_for_job(client, admin_headers, response.get_json()["job"]["id"])
+  assert job["status"] == "finished"
+  assert job["summaries"][str(submission_id)]["all_passed"] is False
+  with app.app_context():
+    result = SubmissionTestResult.query.filter_by(submission_id=submission_id).one()
+    assert result.timed_out and not result.passed
+
+
+def test_grader_error_marks_the_job_failed(client, admin_headers, fixtures, make_submission, monkeypatch):
+  def broken(submissions):
+    raise RuntimeError("fixture file is corrupt")
+  monkeypatch.setattr(grader, "grade_submissions", broken)
+  submission_id = make_submission("print('hi')")
+  response = client.post(f"/api/submissions/{submission_id}/grade", headers=admin_headers)
+  job = _wait_for_job(client, admin_headers, response.get_json()["job"]["id"])
+  assert job["status"] == "failed"
+  assert job["error"] == "fixture file is corrupt"
+  assert job["finished_at"] is not None
+
+
+def test_job_without_progress_is_reported_interrupted(app, client, admin_headers):
+  with app.app_context():
+    job = GradingJob(status="running", submission_ids="[]", updated_at=datetime.utcnow() - timedelta(days=1))
+    db.session.add(job)
+    db.session.commit()
+    job_id = job.id
+  job = client.get(f"/api/grading-jobs/{job_id}", headers=admin_headers).get_json()["job"]
+  assert job["status"] == "interrupted"
+
+
+def test_students_only_see_their_own_jobs(app, client, admin_headers, student_headers, fixtures, make_submission):
+  submission_id = make_submission("print('hi')")
+  job_id = client.post(f"/api/submissions/{submission_id}/grade", headers=admin_headers).get_json()["job"]["id"]
+  _wait_for_job(client, admin_headers, job_id)
+  assert client.get(f"/api/grading-jobs/{job_id}", headers=student_headers).status_code == 404
@@ -0,0 +1,36 @@
+"""stream_list responses: complete JSON documents, or the endpoint's error."""
+import json
+
+import pytest
+
+import json_provider
+from models import User
+
+
+def test_stream_list_sends_the_whole_list_in_chunks(app, monkeypatch):
+  monkeypatch.setattr(json_provider, "STREAM_CHUNK_BYTES", 64)
+  with app.test_request_context():
+    response = json_provider.stream_list("items", range(100), lambda i: {"n": i}, total=100)
+    assert response.is_streamed
+    body = json.loads(response.get_data())
+  assert body == {"success": True, "total": 100, "items": [{"n": i} for i in range(100)]}
+
+
+def test_stream_list_raises_before_the_response_starts(app):
+  def serialize(i):
+    if i == 50:
+      raise ValueError("bad row")
+    return {"n": i}
+
+  with app.test_request_context(), pytest.raises(ValueError):
+    json_provider.stream_list("items", range(100), serialize)
+
+
+def test_serialization_error_is_a_json_500(client, admin_headers, student, monkeypatch):
+  def broken(self, *args, **kwargs):
+    raise RuntimeError("to_dict failed")
+
+  monkeypatch.setattr(User, "to_dict", broken)
+  response = client.get("/api/students", headers=admin_headers)
+  assert response.status_code == 500
+  assert response.get_json() == {"success": False, "error": "to_dict failed"}
@@ -0,0 +1,56 @@
+"""Uploads are served without hashing the file in the request."""
+import os
+
+import pytest
+
+import media
+from models import db, IndexedFile
+
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+  books = tmp_path / "books"
+  books.mkdir()
+  monkeypatch.setattr(media, "UPLOADS_DIR", str(tmp_path))
+  monkeypatch.setattr(media, "BOOKS_DIR", str(books))
+  monkeypatch.setattr(media, "THUMBNAILS_DIR", str(tmp_path / "thumbnails"))
+  monkeypatch.setattr(media, "content_hashes", media.HashCache())
+
+  def no_hashing(path, chunk_size=None):
+    raise AssertionError(f"{path} was hashed while serving")
+  monkeypatch.setattr(media, "sha256_file", no_hashing)
+  return tmp_path
+
+
+def test_indexed_book_uses_the_stored_hash(app, client, uploads):
+  book = uploads / "books" / "stored-hash.pdf"
+  book.write_bytes(b"%PDF-1.4 " + b"x" * 4096)
+  st = os.stat(book)
+  digest = "ab" * 32
+  with app.app_context():
+    db.session.add(IndexedFile(scope=media.BOOKS_SCOPE, name=book.name, mtime_ns=st.st_mtime_ns, size=st.st_size,
+                               content_hash=digest))
+    db.session.commit()
+
+  response = client.get(f"/uploads/books/{book.name}?v={digest[:16]}")
+  assert response.status_code == 200
+  assert response.get_etag() == (digest, False)
+  assert response.cache_control.immutable
+
+  partial = client.get(f"/uploads/books/{book.name}", headers={"Range": "bytes=0-7", "If-Range": f'"{digest}"'})
+  assert partial.status_code == 206
+  assert partial.data == b"%PDF-1.4"
+
+
+def test_unindexed_or_changed_file_gets_a_stat_etag(app, client, uploads):
+  book = uploads / "books" / "changed.pdf"
+  book.write_bytes(b"%PDF-1.4 new version")
+  with app.app_context():
+    db.session.add(IndexedFile(scope=media.BOOKS_SCOPE, name=book.name, mtime_ns=1, size=1, content_hash="cd" * 32))
+    db.session.commit()
+
+  response = client.get(f"/uploads/books/{book.name}?v={'cd' * 8}")
+  assert response.status_code == 200
+  assert response.get_etag() == (media.stat_etag(os.stat(book)), False)
+  assert response.cache_control.no_cache  # the pinned hash is stale, so no immutable caching
+  assert client.get(f"/uploads/books/{book.name}", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
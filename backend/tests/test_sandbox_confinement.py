@@ -0,0 +1,127 @@
+"""Confined student code cannot reach the database, the network or outlive its run."""
+import json
+import os
+import shutil
+import socket
+import time
+
+import pytest
+
+import grader
+import run_pool
+import sandbox
+
+
+PROBE = """
+import json, os, socket, sys, time
+db_path, port = sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else None
+result = {"uid": os.getuid(), "backend": None}
+
+def attempt(key, action):
+  try:
+    action()
+    result[key] = "ok"
+  except OSError as e:
+    result[key] = type(e).__name__
+
+attempt("db_read", lambda: open(db_path, "rb").read(1))
+attempt("db_write", lambda: open(db_path, "ab").write(b"x"))
+attempt("network", lambda: socket.create_connection(("127.0.0.1", port), timeout=2).close())
+result["backend"] = os.listdir(BACKEND_DIR) if os.path.isdir(BACKEND_DIR) else None
+
+daemon = os.fork()
+if daemon == 0:
+  os.setsid()
+  time.sleep(60)
+  os._exit(0)
+result["daemon"] = daemon
+forks = 0
+try:
+  for _ in range(100):
+    if os.fork() == 0:
+      os.setsid()
+      time.sleep(60)
+      os._exit(0)
+    forks += 1
+except OSError:
+  pass
+result["forks"] = forks
+print(json.dumps(result))
+"""
+
+
+@pytest.fixture
+def confined(app, monkeypatch):
+  if not hasattr(os, "geteuid") or os.geteuid() != 0:
+    pytest.skip("confinement needs the tests to run as root")
+  candidates = (sandbox.PYTHON, "/usr/local/bin/python3", "/usr/bin/python3")
+  python = next((p for p in candidates if shutil.which(p) and sandbox._world_reachable(shutil.which(p))), None)
+  if python is None:
+    pytest.skip("no Python interpreter reachable by the sandbox uids")
+  monkeypatch.setattr(sandbox, "PYTHON", python)
+  monkeypatch.setattr(sandbox, "CONFINEMENT", "require")
+  monkeypatch.setattr(sandbox, "_support", None)
+  reason = sandbox._check_support()
+  if reason:
+    pytest.skip(reason)
+
+
+@pytest.fixture
+def listener():
+  server = socket.socket()
+  server.bind(("127.0.0.1", 0))
+  server.listen()
+  yield server.getsockname()[1]
+  server.close()
+
+
+def _probe_source(port):
+  db_path = os.environ["SQLITE_PATH"]
+  return (f"import sys\nsys.argv[1:] = [{db_path!r}, {str(port)!r}]\nBACKEND_DIR = {sandbox.BACKEND_DIR!r}\n"
+          + PROBE)
+
+
+def _alive(pid):
+  try:
+    with open(f"/proc/{pid}/stat") as f:
+      return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+  except FileNotFoundError:
+    return False
+
+
+def _assert_confined(result):
+  assert result["returncode"] == 0, result["stderr"]
+  probe = json.loads(result["stdout"])
+  assert probe["uid"] >= sandbox.UID_BASE
+  assert probe["db_read"] != "ok"
+  assert probe["db_write"] != "ok"
+  assert probe["network"] != "ok"
+  assert probe["backend"] in (None, [])
+  assert probe["forks"] < sandbox.MAX_PROCESSES
+  deadline = time.monotonic() + 5
+  while _alive(probe["daemon"]) and time.monotonic() < deadline:
+    time.sleep(0.05)
+  assert not _alive(probe["daemon"])
+
+
+def test_pool_run_is_confined(confined, listener):
+  pool = run_pool.SandboxPool(size=1, queue_size=2)
+  try:
+    run, _ = pool.submit({"code": _probe_source(listener), "stdin": "", "seed": None})
+    assert run.wait(30)
+  finally:
+    pool.shutdown()
+  _assert_confined(run.result)
+
+
+def test_graded_run_is_confined(confined, listener, tmp_path):
+  script = tmp_path / "submission.py"
+  script.write_text(_probe_source(listener))
+  _assert_confined(grader._run_case(str(script), {"stdin": ""}, None))
+
+
+def test_require_refuses_unconfined_runs(monkeypatch):
+  monkeypatch.setattr(sandbox, "CONFINEMENT", "require")
+  monkeypatch.setattr(sandbox, "_support", ["the server does not run as root"])
+  with pytest.raises(sandbox.ConfinementError):
+    sandbox.confinement(0)
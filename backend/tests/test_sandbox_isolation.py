@@ -0,0 +1,73 @@
+"""Student code run by the sandbox must not see the server's environment or source."""
+import json
+
+import pytest
+
+import run_pool
+import sandbox
+
+
+PROBE = """
+import json, os, sys
+result = {"env": dict(os.environ), "cwd": os.getcwd(), "path": sys.path, "argv": sys.argv}
+for name in ("models", "auth", "sandbox", "run_pool"):
+  try:
+    __import__(name)
+    result[name] = "imported"
+  except ImportError:
+    result[name] = "blocked"
+import __main__
+result["main_globals"] = sorted(k for k in vars(__main__) if not k.startswith("__"))
+print(json.dumps(result))
+"""
+
+
+@pytest.fixture
+def server_secrets(monkeypatch):
+  monkeypatch.setenv("JWT_SECRET_KEY", "server-jwt-secret")
+  monkeypatch.setenv("DATABASE_URL", "postgresql://stjude:secret@db/stjude")
+
+
+@pytest.fixture
+def pool(server_secrets):
+  pool = run_pool.SandboxPool(size=1, queue_size=2)
+  yield pool
+  pool.shutdown()
+
+
+def _assert_isolated(probe):
+  assert "JWT_SECRET_KEY" not in probe["env"]
+  assert "DATABASE_URL" not in probe["env"]
+  # LC_CTYPE comes from the interpreter's own C locale coercion (PEP 538)
+  assert set(probe["env"]) - {"LC_CTYPE"} <= set(sandbox.sandbox_env())
+  for name in ("models", "auth", "sandbox", "run_pool"):
+    assert probe[name] == "blocked", name
+  assert not any(p in ("", run_pool.BACKEND_DIR) for p in probe["path"])
+  assert not probe["cwd"].startswith(run_pool.BACKEND_DIR)
+  assert run_pool.BACKEND_DIR not in " ".join(probe["argv"])
+
+
+def test_pool_worker_hides_server_env_and_modules(pool):
+  run, _ = pool.submit({"code": PROBE, "stdin": "", "seed": None})
+  assert run.wait(30)
+  assert run.result["returncode"] == 0, run.result["stderr"]
+  probe = json.loads(run.result["stdout"])
+  _assert_isolated(probe)
+  assert probe["main_globals"] == ["json", "name", "os", "result", "sys"]
+
+
+def test_worker_process_starts_without_server_env(pool):
+  worker_pid = pool.worker_pids()[0]
+  with open(f"/proc/{worker_pid}/environ", "rb") as f:
+    environ = f.read()
+  assert b"server-jwt-secret" not in environ
+  assert b"DATABASE_URL" not in environ
+
+
+def test_run_python_hides_server_env_and_modules(server_secrets, tmp_path):
+  script = tmp_path / "probe.py"
+  script.write_text(PROBE)
+  result = sandbox.run_python(str(script))
+  assert result["returncode"] == 0, result["stderr"]
+  probe = json.loads(result["stdout"])
+  _assert_isolated(probe)
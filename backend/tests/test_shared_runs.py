@@ -0,0 +1,92 @@
+"""Runs polled from another server process, and the host-wide sandbox slot limit."""
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+import run_pool
+import run_store
+import sandbox_slots
+from models import db, Project, SandboxRun
+
+
+@pytest.fixture
+def project_id(app):
+  with app.app_context():
+    return Project.query.filter(Project.project_path.isnot(None)).first().id
+
+
+def test_poll_reaches_a_process_that_did_not_run_it(app, client, student_headers, project_id, monkeypatch):
+  monkeypatch.setattr(run_pool.SandboxPool, "submit", _always_queued(run_pool.SandboxPool.submit))
+  response = client.post(
+    f"/api/projects/{project_id}/run", json={"code": "import time\ntime.sleep(0.2)\nprint('hi')"},
+    headers=student_headers,
+  )
+  assert response.status_code == 202
+  run_id = response.get_json()["run_id"]
+
+  # This "process" never saw the run: only the sandbox_runs table can answer
+  monkeypatch.setattr(run_pool, "find_run", lambda run_id: None)
+  deadline = time.monotonic() + 15
+  while True:
+    response = client.get(f"/api/runs/{run_id}", headers=student_headers)
+    if response.status_code != 202 or time.monotonic() > deadline:
+      break
+    time.sleep(0.1)
+  assert response.status_code == 200
+  body = response.get_json()
+  assert body["status"] == "finished"
+  assert body["output"].strip() == "hi"
+
+
+def test_poll_of_unknown_run_is_404(client, student_headers):
+  assert client.get("/api/runs/doesnotexist", headers=student_headers).status_code == 404
+
+
+def test_run_abandoned_by_its_process_is_reported_interrupted(app, client, student, student_headers, monkeypatch):
+  with app.app_context():
+    db.session.add(SandboxRun(id="abandoned", user_id=student, status="queued", created_at=datetime.utcnow()))
+    db.session.commit()
+  monkeypatch.setattr(run_pool, "find_run", lambda run_id: None)
+  assert client.get("/api/runs/abandoned", headers=student_headers).status_code == 202
+
+  monkeypatch.setattr(run_store, "STALE_AFTER", run_store.STALE_AFTER * 0)
+  response = client.get("/api/runs/abandoned", headers=student_headers)
+  assert response.status_code == 200
+  body = response.get_json()
+  assert body["status"] == "interrupted"
+  assert body["success"] is False
+
+
+def _always_queued(submit):
+  def wrapper(self, job, user_id=None):
+    run, _ = submit(self, job, user_id=user_id)
+    return run, True
+  return wrapper
+
+
+def test_slots_are_shared_between_processes(tmp_path):
+  holder = subprocess.Popen(
+    [sys.executable, "-c", (
+      "import fcntl, sys, time\n"
+      "f = open(sys.argv[1], 'a+')\n"
+      "fcntl.flock(f, fcntl.LOCK_EX)\n"
+      "print('held', flush=True)\n"
+      "time.sleep(30)\n"
+    ), str(tmp_path / "slot0.lock")],
+    stdout=subprocess.PIPE, text=True,
+  )
+  try:
+    assert holder.stdout.readline().strip() == "held"
+    slots = sandbox_slots._Slots(str(tmp_path), 1)
+    assert slots.stats() == {"capacity": 1, "busy": 1}
+    assert slots._try_acquire() is None
+  finally:
+    holder.kill()
+    holder.wait()
+  # The kernel dropped the dead holder's lock
+  with slots.hold():
+    assert slots.stats()["busy"] == 1
+  assert slots.stats()["busy"] == 0
@@ -0,0 +1,68 @@
+"""
+Dialect-aware INSERT ... ON CONFLICT for SQLite and PostgreSQL.
+
+A select-then-insert races with other workers (and other app nodes on a shared
+PostgreSQL): both see no row and the second insert hits the unique constraint.
+upsert() lets the database resolve the conflict in a single statement.
+"""
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import db, AppMeta, ProjectProgress
+
+
+_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def upsert(model, rows, conflict_columns, update_columns=()):
+  """
+  Insert `rows` (dicts) into `model`'s table. Rows that collide on
+  `conflict_columns` (a unique constraint) update `update_columns` from the new
+  values, or are left alone when there are none. Caller commits.
+  """
+  if not rows:
+    return
+  dialect = db.session.get_bind().dialect.name
+  insert = _INSERTS.get(dialect)
+  if insert is None:
+    # Other databases: portable but racy fallback
+    for row in rows:
+      key = {c: row[c] for c in conflict_columns}
+      existing = model.query.filter_by(**key).first()
+      if existing is None:
+        db.session.add(model(**row))
+      else:
+        for column in update_columns:
+          setattr(existing, column, row[column])
+    db.session.flush()
+    return
+
+  stmt = insert(model).values(rows)
+  if update_columns:
+    stmt = stmt.on_conflict_do_update(
+      index_elements=list(conflict_columns),
+      set_={column: stmt.excluded[column] for column in update_columns},
+    )
+  else:
+    stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+  db.session.execute(stmt)
+
+
+def set_meta(key, value):
+  """Store an app_meta value. Caller commits."""
+  upsert(AppMeta, [{"key": key, "value": value, "updated_at": datetime.utcnow()}], ["key"], ["value", "updated_at"])
+
+
+def get_or_create_progress(student_id, project_id):
+  """The student's ProjectProgress row for a project, created if missing. Caller commits."""
+  # Plain read first: the common case stays off the write lock (and on the read engine)
+  prog = ProjectProgress.query.filter_by(student_id=student_id, project_id=project_id).first()
+  if prog is not None:
+    return prog
+  upsert(
+    ProjectProgress,
+    [{"student_id": student_id, "project_id": project_id, "status": "not_started", "progress_percentage": 0}],
+    ["student_id", "project_id"],
+  )
+  return ProjectProgress.query.filter_by(student_id=student_id, project_id=project_id).one()
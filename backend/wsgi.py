@@ -0,0 +1,7 @@
+"""
+WSGI entry point for production: gunicorn -c gunicorn.conf.py wsgi:app
+
+Database initialisation and the single-process background services are run by
+the gunicorn master (hooks in gunicorn.conf.py), not by each worker.
+"""
+from app import app  # noqa: F401
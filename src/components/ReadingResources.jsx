@@ -87,6 +87,14 @@ export default function ReadingResources() {
         ) : (
           filteredResources.map((resource) => (
             <div key={resource.id} className="bg-white rounded-xl p-6 shadow-lg hover:shadow-xl transition-shadow">
+              {resource.thumbnail_url && (
+                <img
+                  src={`${API_URL}${resource.thumbnail_url}`}
+                  alt=""
+                  loading="lazy"
+                  className="w-full h-40 object-cover object-top rounded-lg mb-4 bg-gray-100"
+                />
+              )}
               <div className="flex justify-between items-start mb-2">
                 <h3 className="text-xl font-bold text-gray-800">{resource.title}</h3>
                 {resource.category && (
@@ -149,7 +157,7 @@ export default function ReadingResources() {
                     This resource is a PDF document.
                   </p>
                   <a
-                    href={selectedResource.content.startsWith('http') ? selectedResource.content : `${API_URL}${selectedResource.content}`}
+                    href={selectedResource.content.startsWith('http') ? selectedResource.content : `${API_URL}${selectedResource.url || selectedResource.content}`}
                     target="_blank"
                     rel="noopener noreferrer"
                     className="bg-indigo-600 text-white px-8 py-3 rounded-xl font-bold hover:bg-indigo-700 transition-colors shadow-lg shadow-indigo-200 flex items-center gap-2"
@@ -4,6 +4,8 @@ import { toast } from 'react-toastify'
 import ReadingResources from './ReadingResources'
 
 const API_URL = import.meta.env.VITE_API_URL || 'https://stjude.beetletz.online'
+// Stop polling a queued project run after this long
+const RUN_POLL_TIMEOUT_MS = 2 * 60 * 1000
 
 export default function StudentDashboard() {
   const { token, user } = useAuth()
@@ -21,9 +23,7 @@ export default function StudentDashboard() {
   const [showReviewBanner, setShowReviewBanner] = useState(false)
 
   useEffect(() => {
-    fetchProjects()
-    fetchLeaderboard()
-    fetchReviewedSubmissions()
+    fetchDashboard()
     // Refresh leaderboard every 5 seconds for real-time updates
     const interval = setInterval(fetchLeaderboard, 5000)
     // Check for new reviews every 10 seconds
@@ -34,6 +34,33 @@ export default function StudentDashboard() {
     }
   }, [])
 
+  // First paint: projects, leaderboard and submissions in one request
+  const fetchDashboard = async () => {
+    try {
+      const response = await fetch(`${API_URL}/api/dashboard/student`, {
+        headers: {
+          'Authorization': `Bearer ${token}`
+        }
+      })
+      const data = await response.json()
+      if (data.success) {
+        setProjects(data.projects)
+        setLeaderboard(data.leaderboard || [])
+        setMyRank(data.current_user_rank)
+        setMyPoints(data.current_user_points || 0)
+        applySubmissions(data.submissions || [])
+        setLoading(false)
+        return
+      }
+    } catch (error) {
+      console.error('Error fetching dashboard:', error)
+    }
+    // Older backends: the individual endpoints
+    fetchProjects()
+    fetchLeaderboard()
+    fetchReviewedSubmissions()
+  }
+
   const fetchProjects = async () => {
     try {
       const response = await fetch(`${API_URL}/api/projects`, {
@@ -80,37 +107,40 @@ export default function StudentDashboard() {
       })
       const data = await response.json()
       if (data.success) {
-        const submissions = data.submissions || []
-        // Count reviewed submissions (status is not 'submitted')
-        const reviewed = submissions.filter(s => 
-          s.status && s.status !== 'submitted' && s.review_notes
-        )
-        setReviewedSubmissionsCount(reviewed.length)
-        
-        // Check for new reviews (recently reviewed)
-        const recentlyReviewed = reviewed
-          .filter(s => s.reviewed_at)
-          .sort((a, b) => new Date(b.reviewed_at) - new Date(a.reviewed_at))[0]
-        
-        if (recentlyReviewed && recentlyReviewed.reviewed_at) {
-          const reviewTime = new Date(recentlyReviewed.reviewed_at)
-          const now = new Date()
-          const minutesAgo = (now - reviewTime) / 60000
-          
-          // Show banner if reviewed in last 5 minutes and not already shown
-          if (minutesAgo < 5 && (!recentReview || recentReview.id !== recentlyReviewed.id)) {
-            setRecentReview(recentlyReviewed)
-            setShowReviewBanner(true)
-            // Auto-hide after 10 seconds
-            setTimeout(() => setShowReviewBanner(false), 10000)
-          }
-        }
+        applySubmissions(data.submissions || [])
       }
     } catch (error) {
       console.error('Error fetching reviewed submissions:', error)
     }
   }
 
+  const applySubmissions = (submissions) => {
+    // Count reviewed submissions (status is not 'submitted')
+    const reviewed = submissions.filter(s => 
+      s.status && s.status !== 'submitted' && s.review_notes
+    )
+    setReviewedSubmissionsCount(reviewed.length)
+    
+    // Check for new reviews (recently reviewed)
+    const recentlyReviewed = reviewed
+      .filter(s => s.reviewed_at)
+      .sort((a, b) => new Date(b.reviewed_at) - new Date(a.reviewed_at))[0]
+    
+    if (recentlyReviewed && recentlyReviewed.reviewed_at) {
+      const reviewTime = new Date(recentlyReviewed.reviewed_at)
+      const now = new Date()
+      const minutesAgo = (now - reviewTime) / 60000
+      
+      // Show banner if reviewed in last 5 minutes and not already shown
+      if (minutesAgo < 5 && (!recentReview || recentReview.id !== recentlyReviewed.id)) {
+        setRecentReview(recentlyReviewed)
+        setShowReviewBanner(true)
+        // Auto-hide after 10 seconds
+        setTimeout(() => setShowReviewBanner(false), 10000)
+      }
+    }
+  }
+
   const updateProgress = async (projectId, status, percentage) => {
     try {
       const response = await fetch(`${API_URL}/api/progress`, {
@@ -399,6 +429,7 @@ function ProjectModal({ project, onClose, onUpdate, token, onLeaderboardUpdate }
   const [submitting, setSubmitting] = useState(false)
   const [projectOutput, setProjectOutput] = useState(null)
   const [loadingOutput, setLoadingOutput] = useState(false)
+  const [programInput, setProgramInput] = useState('')
   const [showOutput, setShowOutput] = useState(false)
   const [showFullCode, setShowFullCode] = useState(false)
   const [showQuiz, setShowQuiz] = useState(false)
@@ -408,6 +439,19 @@ function ProjectModal({ project, onClose, onUpdate, token, onLeaderboardUpdate }
   useEffect(() => {
     const fetchSteps = async () => {
       try {
+        // Static curriculum bundle first (served by nginx, cached forever); the API is the fallback
+        if (project.bundle_url) {
+          try {
+            const bundleRes = await fetch(`${API_URL}${project.bundle_url}`)
+            if (bundleRes.ok) {
+              const bundle = await bundleRes.json()
+              setSteps(bundle.steps || [])
+              return
+            }
+          } catch (bundleErr) {
+            console.warn('Curriculum bundle unavailable, using the API', bundleErr)
+          }
+        }
         const res = await fetch(`${API_URL}/api/projects/${project.id}/steps`, {
           headers: {
             Authorization: `Bearer ${token}`,
@@ -429,7 +473,7 @@ function ProjectModal({ project, onClose, onUpdate, token, onLeaderboardUpdate }
 
     fetchSteps()
     fetchProjectProgress()
-  }, [project.id, token])
+  }, [project.id, project.bundle_url, token])
 
   // Set current step to first incomplete step when steps and progress are loaded
   useEffect(() => {
@@ -454,6 +498,27 @@ function ProjectModal({ project, onClose, onUpdate, token, onLeaderboardUpdate }
     }
   }, [steps, stepProgress])
 
+  // full_code is left out of step payloads; load it the first time it is shown
+  const toggleFullCode = async () => {
+    if (!showFullCode && steps.some((s) => s.has_full_code && s.full_code === undefined)) {
+      try {
+        const res = await fetch(`${API_URL}/api/projects/${project.id}/steps?fields=id,full_code`, {
+          headers: {
+            Authorization: `Bearer ${token}`,
+          },
+        })
+        const data = await res.json()
+        if (data.success) {
+          const fullCode = Object.fromEntries((data.steps || []).map((s) => [s.id, s.full_code]))
+          setSteps((prev) => prev.map((s) => ({ ...s, full_code: fullCode[s.id] ?? s.full_code })))
+        }
+      } catch (err) {
+        console.error('Error fetching full code', err)
+      }
+    }
+    setShowFullCode(!showFullCode)
+  }
+
   const fetchProjectProgress = async () => {
     try {
       const res = await fetch(`${API_URL}/api/projects/${project.id}/progress`, {
@@ -634,9 +699,26 @@ function ProjectModal({ project, onClose, onUpdate, token, onLeaderboardUpdate }
         method: 'POST',
         headers: {
           Authorization: `Bearer ${token}`,
+          'Content-Type': 'application/json',
         },
+        body: JSON.stringify({ stdin: programInput }),
       })
-      const data = await res.json()
+      let data = await res.json()
+      // All sandbox workers busy: poll the queued run until it finishes
+      const deadline = Date.now() + RUN_POLL_TIMEOUT_MS
+      while (data.status === 'queued' || data.status === 'running') {
+        if (Date.now() > deadline) {
+          data = { success: false, error: 'The run is taking too long, please try again later' }
+          break
+        }
+        await new Promise(resolve => setTimeout(resolve, 500))
+        const pollRes = await fetch(`${API_URL}/api/runs/${data.run_id}`, {
+          headers: {
+            Authorization: `Bearer ${token}`,
+          },
+        })
+        data = await pollRes.json()
+      }
       if (data.success) {
         setProjectOutput(data.output)
       } else {
@@ -667,6 +749,18 @@ function ProjectModal({ project, onClose, onUpdate, token, onLeaderboardUpdate }
           </button>
         </div>
 
+        <div className="mb-4">
+          <label className="block text-sm font-semibold text-gray-700 mb-1">
+            Program input (one answer per line, used by input())
+          </label>
+          <textarea
+            value={programInput}
+            onChange={(e) => setProgramInput(e.target.value)}
+            rows={2}
+            className="w-full border border-gray-300 rounded-lg p-2 font-mono text-sm"
+          />
+        </div>
+
         {showOutput && projectOutput && (
           <div className="mb-4 p-4 bg-gray-900 rounded-lg">
             <h4 className="text-white font-semibold mb-2">Program Output:</h4>
@@ -766,10 +860,10 @@ function ProjectModal({ project, onClose, onUpdate, token, onLeaderboardUpdate }
                       ))}
                       
                       {/* Full Code Preview Button */}
-                      {currentStep.full_code && (
+                      {(currentStep.full_code || currentStep.has_full_code) && (
                         <div className="mt-4">
                           <button
-                            onClick={() => setShowFullCode(!showFullCode)}
+                            onClick={toggleFullCode}
                             className="bg-indigo-600 text-white px-4 py-2 rounded-lg hover:bg-indigo-700 text-sm font-semibold"
                           >
                             {showFullCode ? '🔽 Hide Full Code' : '👁️ Preview Full Code'}